@@ -1,12 +1,13 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+client = get_client('openai')
 
 try:
     models = client.models.list()
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+import aiohttp
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.benchmark import latency_percentiles
+from common.chat_server import ChatServer, start_server
+from common.fake_openai import FakeOpenAI
+
+# Load test server chat (mode --serve di project_day1.py): banyak sesi streaming bersamaan,
+# tiap sesi mengirim beberapa pesan berurutan. Tanpa --url, server + endpoint OpenAI palsu
+# dijalankan di proses ini (tanpa API key).
+# Pemakaian:
+#   python DAY1/load_test_server.py --sessions 300 --messages 3
+#   python DAY1/load_test_server.py --url http://127.0.0.1:8080 --sessions 50
+
+
+async def read_sse(response):
+    """Event SSE dari response: yield (event, data)"""
+    event = None
+    async for raw in response.content:
+        line = raw.decode('utf-8').rstrip('\n')
+        if line.startswith('event: '):
+            event = line[len('event: '):]
+        elif line.startswith('data: '):
+            yield event, json.loads(line[len('data: '):])
+            event = None
+
+
+async def run_session(http, url, n_messages, results):
+    async with http.post(f'{url}/sessions') as response:
+        session_id = (await response.json())['session_id']
+
+    for i in range(n_messages):
+        start = time.perf_counter()
+        ttft = None
+        status = 'ok'
+        async with http.post(f'{url}/sessions/{session_id}/messages',
+                             json={'content': f'Pertanyaan ke-{i + 1}, tolong jelaskan singkat.'}) as response:
+            if response.status != 200:
+                status = f'http {response.status}'
+            else:
+                async for event, data in read_sse(response):
+                    if event == 'error':
+                        status = 'upstream error'
+                    elif 'delta' in data and ttft is None:
+                        ttft = time.perf_counter() - start
+        results.append({'status': status, 'ttft': ttft, 'total': time.perf_counter() - start})
+
+
+async def run_load(url, sessions, messages):
+    results = []
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_session(http, url, messages, results) for _ in range(sessions)))
+        elapsed = time.perf_counter() - start
+        async with http.get(f'{url}/stats') as response:
+            stats = await response.json()
+    return results, elapsed, stats
+
+
+def report(results, elapsed, stats):
+    ok = [row for row in results if row['status'] == 'ok']
+    ttft = latency_percentiles([row['ttft'] for row in ok if row['ttft'] is not None])
+    total = latency_percentiles([row['total'] for row in ok])
+    print(f'{len(results)} request, {len(results) - len(ok)} gagal, {elapsed:.2f}s, '
+          f'{len(results) / elapsed:.1f} request/s')
+    print(f"TTFT    p50 {ttft['p50']:>8.1f} ms   p99 {ttft['p99']:>8.1f} ms")
+    print(f"total   p50 {total['p50']:>8.1f} ms   p99 {total['p99']:>8.1f} ms")
+    print(f"server: {stats['sessions']} sesi, {stats['rejected']} ditolak (429), {stats['errors']} error upstream")
+    if stats.get('upstream'):
+        print(f"upstream: {stats['upstream']['requests']} request, {stats['upstream']['new_connections']} koneksi baru")
+
+
+async def main(args):
+    if args.url:
+        return await run_load(args.url.rstrip('/'), args.sessions, args.messages)
+
+    fake = FakeOpenAI(args.first_token_ms / 1000, args.token_ms / 1000, args.tokens)
+    upstream_url = await fake.start()
+    runner, url = await start_server(ChatServer('fake-model', 'You are a helpful assistant.', base_url=upstream_url))
+    try:
+        results, elapsed, stats = await run_load(url, args.sessions, args.messages)
+    finally:
+        await runner.cleanup()
+        await fake.stop()
+    print(f'upstream palsu: maks {fake.max_active} stream bersamaan')
+    return results, elapsed, stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load generator untuk server chat SSE')
+    parser.add_argument('--url', default=None, help='server yang sudah jalan; kosong = server + upstream palsu lokal')
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=3, help='pesan berurutan per sesi')
+    parser.add_argument('--first-token-ms', type=float, default=200, help='upstream palsu: jeda token pertama')
+    parser.add_argument('--token-ms', type=float, default=10, help='upstream palsu: jeda antar token')
+    parser.add_argument('--tokens', type=int, default=40, help='upstream palsu: panjang jawaban')
+    args = parser.parse_args()
+
+    report(*asyncio.run(main(args)))
@@ -1,19 +1,19 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+from common.memory import ConversationMemory, make_summarizer
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+client = get_client('openai', 'chat')
 
 SYSTEM_PROMPT = "You're a helpful assistant"
-MAX_HISTORY = 12 * 2 + 1
 
-history = [
-    {'role':'system', 'content': SYSTEM_PROMPT}
-]
+# history dibatasi token (bukan jumlah pesan); pesan lama diringkas di background
+memory = ConversationMemory(SYSTEM_PROMPT, summarize_fn=make_summarizer(client))
 
 while True:
     user_chat = input('You: ')
@@ -22,23 +22,14 @@ while True:
     if user_chat == '/exit':
         break
 
-    history.append({'role':'user', 'content':user_chat})
+    memory.add('user', user_chat)
 
     # client.chat.completions.create()
     response = client.chat.completions.create(
         model='gpt-4o-mini',
-        messages=history
+        messages=memory.messages()
     )
 
-    history.append({'role':'assistant', 'content': response.choices[0].message.content})
-
-    # if len(history) > MAX_HISTORY:
-    #     # summarize
-    #     response = client.chat.completions.create(
-    #         model='gpt-4o-mini',
-    #         messages=[]# tolong summrry history ini
-    #     )
-    #     new_history = history[0]
-    #     history = new_history
+    memory.add('assistant', response.choices[0].message.content)
 
     print(f"AI: {response.choices[0].message.content}")
\ No newline at end of file
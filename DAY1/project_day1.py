@@ -1,33 +1,87 @@
 import os
-import json
+import sys
 import time
+import argparse
 from dotenv import load_dotenv
-from openai import OpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client, make_client, print_connection_stats
+from common.streaming import stream_to_terminal, print_stream_stats
+from common.memory import ConversationMemory, make_summarizer
+from common.journal import ChatJournal
 
 load_dotenv()  # load .env
 
-client = OpenAI(
-    base_url='https://openrouter.ai/api/v1',   
-    api_key=os.getenv('OPENROUTER_API_KEY') 
-)
+client = get_client('openrouter', 'chat')
 
 MODEL_NAME = "openai/gpt-4o-mini" 
 
-chat_history = [
-    { "role": "system", "content": "You are a helpful AI assistant for beginners. Jawab dengan bahasa sederhana, ramah, dan jangan terlalu teknis kalau tidak diminta."}
-]
+SYSTEM_PROMPT = "You are a helpful AI assistant for beginners. Jawab dengan bahasa sederhana, ramah, dan jangan terlalu teknis kalau tidak diminta."
+
+# satu file JSONL per sesi, setiap pesan langsung di-append (tidak hilang kalau crash)
+SESSIONS_DIR = "chat_sessions"
+# fsync setiap N pesan: 1 = paling aman, 0 = serahkan ke OS
+FSYNC_EVERY = int(os.getenv("CHAT_FSYNC_EVERY", "20"))
+
+
+def session_path(session_id):
+    return os.path.join(SESSIONS_DIR, f"{session_id}.jsonl")
+
+
+# dibuka di main(), mode server tidak memakai journal
+journal = None
+
+# yang dikirim ke API: ringkasan + pesan terbaru, dibatasi token; ringkasan ikut dicatat di journal
+memory = ConversationMemory(
+    SYSTEM_PROMPT,
+    summarize_fn=make_summarizer(client, MODEL_NAME),
+    on_summary=lambda summary, folded: journal.add_summary(summary, folded)
+)
 
 # Streaming mode ON/OFF
 stream_mode = True 
 
 
-def save_history_to_file(filename="chat_history.json"):
-    data_to_save = chat_history[1:] if len(chat_history) > 1 else []
+def save_history_to_file():
+    # pesan sudah ditulis per turn, /save cukup memastikan semuanya sampai ke disk
+    journal.sync()
+    print(f"\n[System] Chat history saved to {journal.path}\n")
 
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data_to_save, f, indent=2, ensure_ascii=False)
 
-    print(f"\n[System] Chat history saved to {filename}\n")
+def list_sessions():
+    """Id sesi tersimpan, terbaru dulu (file kosong dilewati)"""
+    if not os.path.isdir(SESSIONS_DIR):
+        return []
+    paths = [
+        os.path.join(SESSIONS_DIR, name) for name in os.listdir(SESSIONS_DIR)
+        if name.endswith(".jsonl") and os.path.getsize(os.path.join(SESSIONS_DIR, name))
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    return [os.path.basename(path)[:-len(".jsonl")] for path in paths]
+
+
+def resume_session(session_id=None):
+    """Lanjutkan sesi lama: hanya ujung journal (ringkasan terakhir + pesan sesudahnya) yang dibaca"""
+    global journal
+
+    candidates = [s for s in list_sessions() if session_path(s) != journal.path]
+    if session_id is None:
+        session_id = candidates[0] if candidates else None
+    if session_id is None or session_id not in candidates:
+        print("[System] Sesi tidak ditemukan. Ketik /sessions untuk melihat daftar.\n")
+        return
+
+    memory.wait()
+    journal.close()
+    if os.path.getsize(journal.path) == 0:
+        os.remove(journal.path)
+
+    journal = ChatJournal(session_path(session_id), fsync_every=FSYNC_EVERY)
+    state = journal.resume()
+    memory.restore(state["summary"], state["first_n"], state["messages"])
+
+    print(f"[System] Sesi {session_id} dilanjutkan: {len(state['messages'])} pesan terakhir"
+          + (", plus ringkasan percakapan sebelumnya" if state["summary"] else "") + "\n")
 
 
 # 3. HELPER: GET RESPONSE TANPA STREAM
@@ -45,40 +99,24 @@ def get_response_normal(messages):
 
 # 4. HELPER: GET RESPONSE DENGAN STREAM
 def get_response_stream(messages):
-    full_answer = ""
-
-    # panggil streaming API
-    stream = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=messages,
-        temperature=0.7,
-        stream=True
-    )
-
-    for chunk in stream:
-        if chunk.choices[0].delta.content is not None:
-            content = chunk.choices[0].delta.content
-            print(content, end='', flush=True)
-            full_answer += content
-
-
-        elif chunk.type == "message.completed":
-            print() 
-        elif chunk.type == "error":
-            print(f"\n[Error] {chunk.error}")
-
-    return full_answer
+    # async streaming: ditulis ke terminal per frame, TTFT & token/detik dicatat
+    return stream_to_terminal(messages, MODEL_NAME, provider='openrouter', temperature=0.7)
 
 
 # 5. MAIN CHAT LOOP
 def main():
-    global stream_mode
+    global stream_mode, journal
+
+    journal = ChatJournal(session_path(time.strftime("%Y%m%d-%H%M%S")), fsync_every=FSYNC_EVERY)
 
     print(" Welcome to Your First AI Chatbot on Terminal\n")
     print("Commands:")
     print("  /stream on   -> aktifkan streaming mode")
     print("  /stream off  -> matikan streaming mode (jawab langsung)")
-    print("  /save        -> simpan riwayat chat ke chat_history.json")
+    print("  /save        -> pastikan riwayat chat tersimpan ke disk")
+    print("  /sessions    -> daftar sesi tersimpan")
+    print("  /resume [id] -> lanjutkan sesi tersimpan (default: yang terakhir)")
+    print("  /stats       -> statistik streaming (TTFT, token/detik)")
     print("  /exit        -> keluar\n")
 
     while True:
@@ -86,12 +124,31 @@ def main():
 
         if user_input.lower() == "/exit":
             print("AI: Byee 👋")
+            memory.wait()  # ringkasan yang sedang dibuat ikut tersimpan
+            journal.close()
+            print_stream_stats()
+            print_connection_stats()
             break
 
+        if user_input.lower() == "/stats":
+            print_stream_stats()
+            continue
+
         if user_input.lower() == "/save":
             save_history_to_file()
             continue
 
+        if user_input.lower() == "/sessions":
+            for session_id in list_sessions()[:20]:
+                print(f"  {session_id}")
+            print()
+            continue
+
+        if user_input.lower().startswith("/resume"):
+            parts = user_input.split(maxsplit=1)
+            resume_session(parts[1] if len(parts) > 1 else None)
+            continue
+
         if user_input.lower() == "/stream on":
             stream_mode = True
             print("[System] Streaming mode: ON (jawaban akan muncul real-time)\n")
@@ -108,26 +165,50 @@ def main():
 
         # minta ai untuk analisa dulu
 
-        chat_history.append({
-            "role": "user",
-            "content": user_input
-        })
+        journal.add_message("user", user_input)
+        memory.add("user", user_input)
 
         print("AI: ", end="", flush=True)
 
         if stream_mode:
-            ai_reply = get_response_stream(chat_history)
+            ai_reply = get_response_stream(memory.messages())
         else:
-            ai_reply = get_response_normal(chat_history)
+            ai_reply = get_response_normal(memory.messages())
             print(ai_reply)  # kalau non-stream, baru print sekali
 
-        chat_history.append({
-            "role": "assistant",
-            "content": ai_reply
-        })
+        journal.add_message("assistant", ai_reply)
+        memory.add("assistant", ai_reply)
 
         print()  
 
 
+# 6. MODE SERVER: banyak sesi sekaligus lewat HTTP + SSE
+def serve(host, port):
+    # import di sini: aiohttp hanya dibutuhkan untuk mode server
+    from common.chat_server import ChatServer, run_server
+
+    # mis. http://127.0.0.1:9000/v1 untuk endpoint palsu / self-hosted
+    upstream_url = os.getenv("CHAT_UPSTREAM_URL") or None
+    # ringkasan (jalan di thread) memakai client sinkron ke upstream yang sama
+    summary_client = make_client("openrouter", upstream_url) if upstream_url else client
+    server = ChatServer(
+        MODEL_NAME, SYSTEM_PROMPT,
+        provider="openrouter",
+        base_url=upstream_url,
+        summarize_fn=make_summarizer(summary_client, MODEL_NAME),
+        temperature=0.7,
+    )
+    run_server(server, host, port)
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="AI chatbot di terminal, atau server HTTP dengan --serve")
+    parser.add_argument("--serve", action="store_true", help="jalankan sebagai server multi-sesi (SSE)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.host, args.port)
+    else:
+        main()
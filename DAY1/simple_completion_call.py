@@ -1,12 +1,21 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+from common.response_cache import CachedClient, print_cache_stats
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+# RESPONSE_CACHE=1: prompt selalu sama + temperature 0 -> jawaban diambil dari cache di run berikutnya
+RESPONSE_CACHE = os.getenv('RESPONSE_CACHE') == '1'
+
+client = get_client('openai', 'chat')
+sampling = {}
+if RESPONSE_CACHE:
+    client = CachedClient(client, 'openai')
+    sampling = {'temperature': 0}
 
 # client.chat.completions.create()
 response = client.chat.completions.create(
@@ -14,7 +23,10 @@ response = client.chat.completions.create(
     messages=[
         {'role':'system', 'content':'You are a helpful assistant.'},
         {'role':'user', 'content':'Jelaskan kepada saya tentang quantum computing.'},
-    ]
+    ],
+    **sampling,
 )
 
-print(response.choices[0].message.content)
\ No newline at end of file
+print(response.choices[0].message.content)
+if RESPONSE_CACHE:
+    print_cache_stats(client.cache)
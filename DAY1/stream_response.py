@@ -1,30 +1,19 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+import sys
 
-load_dotenv()
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.streaming import stream_to_terminal, print_stream_stats
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+load_dotenv()
 
-# client.chat.completions.create()
-response = client.chat.completions.create(
-    model='gpt-4o-mini',
-    messages=[
+# stream=True di belakang layar; delta ditulis per frame, bukan print(flush=True) per token
+full_response = stream_to_terminal(
+    [
         {'role':'system', 'content':'You are a helpful assistant.'},
         {'role':'user', 'content':'Jelaskan kepada saya tentang quantum computing.'},
     ],
-    stream=True, # default -> false
+    'gpt-4o-mini',
 )
-
-full_response = ''
-
-# chunk.choices[0].delta.content
-for chunk in response:
-    if chunk.choices[0].delta.content is not None:
-        content = chunk.choices[0].delta.content
-        print(content, end='', flush=True) # end='\n'
-        full_response += content
-    
-
+print()
+print_stream_stats()
@@ -1,14 +1,15 @@
-from openai import OpenAI
 import os
+import sys
 from dotenv import load_dotenv
 import requests
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+client = get_client('openai', 'image')
 
 prompt = 'pantai bali'# -> improve prompt
 
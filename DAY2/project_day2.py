@@ -1,14 +1,17 @@
 import os
+import sys
 import sounddevice as sd
 import scipy.io.wavfile as wavfile
 from playsound import playsound
 from dotenv import load_dotenv
 from pathlib import Path
-from openai import OpenAI
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
 
 # 1. Setup client
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = get_client('openai', 'audio')
 
 # 2. Rekam suara dari mic dan simpan ke file .wav
 def record_voice(filename="user.wav", duration=5, sample_rate=44100):
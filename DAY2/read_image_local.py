@@ -1,13 +1,14 @@
-from openai import OpenAI
 import os
+import sys
 from dotenv import load_dotenv
 import base64
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+client = get_client('openai', 'chat')
 
 # image_path = asset/kucing-ayam.jpg
 def decode_image(image_path):
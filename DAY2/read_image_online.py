@@ -1,12 +1,13 @@
-from openai import OpenAI
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+client = get_client('openai', 'chat')
 
 image_url = 'https://imageio.forbes.com/specials-images/imageserve/664b9c049314ec4607e8ee46/Porsche-Sonderwunsch-Haus--The-Taycan-4S-Cross-Turismo-For-Jennie-Ruby-Jane---/0x0.jpg?format=jpg&crop=2432,1824,x0,y291,safe&width=960'
 
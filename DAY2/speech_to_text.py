@@ -1,12 +1,13 @@
-from openai import OpenAI
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY') # sesuaikan
-)
+client = get_client('openai', 'audio')
 
 audio_path = 'audio_dummy.mp3'
 
@@ -1,13 +1,14 @@
-from openai import OpenAI
 import os
+import sys
 from dotenv import load_dotenv
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY') # sesuaikan
-)
+client = get_client('openai', 'audio')
 text = "Halo, saya Bagusde!"
 
 audio_file = Path('audio_output_1.mp3')
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.benchmark import load_documents, latency_percentiles
+from common.chunker import chunk_text
+from common.embeddings import Embedder, EmbeddingCache, HashingEmbedder
+
+load_dotenv()
+
+# Bandingkan provider embedding: latency embed 1 query (p50/p95) dan throughput ingestion
+# (chunk/detik) atas knowledge_base/. Remote (OpenAI) hanya jalan kalau OPENAI_API_KEY ada,
+# cache in-memory baru supaya setiap teks benar-benar di-embed.
+# Pemakaian:
+#   python DAY3/benchmark_embeddings.py
+#   python DAY3/benchmark_embeddings.py --providers local openai --queries 50
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_questions.json')
+
+
+def make_embedder(name):
+    if name == 'hashing':
+        return HashingEmbedder()
+    if name == 'local':
+        from common.local_embeddings import LocalEmbedder
+        return LocalEmbedder()
+    if not os.getenv('OPENAI_API_KEY'):
+        raise RuntimeError('OPENAI_API_KEY kosong')
+    return Embedder(cache=EmbeddingCache(':memory:'))
+
+
+def measure(embedder, queries, chunks, batch_size):
+    embedder.embed([queries[0]])  # warm-up (load model / buka koneksi)
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        embedder.embed([query])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(chunks), batch_size):
+        embedder.embed(chunks[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    return {
+        'model': embedder.model,
+        'latency_ms': latency_percentiles(latencies),
+        'chunks': len(chunks),
+        'chunks_per_sec': len(chunks) / elapsed if elapsed else 0.0,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark provider embedding lokal vs remote')
+    parser.add_argument('--providers', nargs='+', default=['hashing', 'local', 'openai'],
+                        choices=['hashing', 'local', 'openai'])
+    parser.add_argument('--queries', type=int, default=26, help='jumlah query untuk latency')
+    parser.add_argument('--batch-size', type=int, default=64, help='chunk per panggilan embed saat ingest')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with open(QUESTIONS_PATH, 'r', encoding='utf-8') as f:
+        questions = [label['question'] for label in json.load(f)]
+    queries = (questions * (args.queries // len(questions) + 1))[:args.queries]
+    chunks = [
+        chunk for doc in load_documents(os.path.join(ROOT, 'knowledge_base'))
+        for chunk in chunk_text(doc['content'])
+    ]
+
+    print(f"{'provider':<9} {'model':<24} {'p50 ms':>8} {'p95 ms':>8} {'chunks':>7} {'chunk/s':>9}")
+    for name in args.providers:
+        try:
+            row = measure(make_embedder(name), queries, chunks, args.batch_size)
+        except (RuntimeError, FileNotFoundError) as error:
+            print(f'{name:<9} dilewati: {error}')
+            continue
+        print(f"{name:<9} {row['model']:<24} {row['latency_ms']['p50']:>8.2f} {row['latency_ms']['p95']:>8.2f} "
+              f"{row['chunks']:>7} {row['chunks_per_sec']:>9.1f}")
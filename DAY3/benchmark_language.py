@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.language import is_indonesian, TranslationCache
+
+# Sampel query berlabel (True = bahasa Indonesia) untuk mengukur false positive
+# deteksi lama (substring) vs detektor token-based, dan berapa LLM call terjemahan yang dihemat.
+SAMPLES = [
+    ('What is the refund policy for annual plans?', False),
+    ('How many days of annual leave do employees get?', False),
+    ('Explain the password rotation requirements', False),
+    ('Is remote work allowed on Fridays?', False),
+    ('Which products support single sign-on?', False),
+    ('Can I install personal software on my work laptop?', False),
+    ('Summarize the termination clause in this contract', False),
+    ('What are the payment terms and the due date?', False),
+    ('Who is responsible for data backups?', False),
+    ('List the indemnification obligations of the vendor', False),
+    ('Where is the head office located?', False),
+    ('Does the warranty cover accidental damage?', False),
+    ('What did the auditor find in section 4?', False),
+    ('Tell me about the pricing tiers', False),
+    ('Explain the difference between kernel and user mode', False),
+    ('Which key dates apply to capacity planning?', False),
+    ('Does the market data feed update daily?', False),
+    ('How do I report a phishing email?', False),
+    ('Berapa hari cuti tahunan untuk karyawan?', True),
+    ('Apa kebijakan refund untuk paket tahunan?', True),
+    ('Bagaimana cara melaporkan email phishing?', True),
+    ('Jelaskan syarat penggantian password', True),
+    ('Siapa yang bertanggung jawab atas backup data?', True),
+    ('Apakah kerja remote boleh di hari Jumat?', True),
+    ('Tolong ringkas klausul pemutusan kontrak ini', True),
+    ('Kapan batas waktu pembayarannya?', True),
+    ('Dimana lokasi kantor pusat?', True),
+    ('Produk mana saja yang mendukung SSO?', True),
+    ('Garansinya mencakup kerusakan karena jatuh atau tidak?', True),
+    ('Sebutkan kewajiban vendor dalam perjanjian', True),
+    ('Gimana cara install software di laptop kantor?', True),
+    ('Harga paket enterprise berapa ya?', True),
+    ('Apa saja temuan auditor di bagian 4?', True),
+]
+
+
+def detect_indonesian_old(text):
+    """Deteksi lama dari project_chatpdf.py (substring match)"""
+    indonesian_words = [
+        'apa', 'berapa', 'bagaimana', 'mengapa', 'kapan', 'dimana', 'siapa',
+        'saya', 'kamu', 'kalian', 'kami', 'yang', 'ini', 'itu', 'dan',
+        'untuk', 'dari', 'ke', 'di', 'pada', 'adalah', 'bisa', 'dapat'
+    ]
+    text_lower = text.lower()
+    return sum(1 for word in indonesian_words if word in text_lower) >= 2
+
+
+def evaluate(name, detector):
+    start = time.perf_counter()
+    predictions = [detector(text) for text, _ in SAMPLES]
+    elapsed_us = (time.perf_counter() - start) / len(SAMPLES) * 1e6
+
+    english = [pred for pred, (_, label) in zip(predictions, SAMPLES) if not label]
+    indonesian = [pred for pred, (_, label) in zip(predictions, SAMPLES) if label]
+    false_positive = sum(english) / len(english)
+    recall = sum(indonesian) / len(indonesian)
+    print(f'{name:<10} false positive {false_positive:>5.0%}  recall {recall:>5.0%}  '
+          f'{elapsed_us:.1f} us/query')
+
+
+def simulate_cache(rounds=5):
+    """Query yang sama ditanya berulang (beda kapitalisasi/spasi) -> LLM cukup dipanggil sekali"""
+    calls = [0]
+
+    def fake_translate(text):
+        calls[0] += 1
+        return f'[en] {text}'
+
+    queries = [text for text, label in SAMPLES if label]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranslationCache(os.path.join(tmp, 'translation_cache.sqlite3'))
+        for i in range(rounds):
+            for text in queries:
+                cache.translate(text.upper() if i % 2 else f'  {text} ', fake_translate)
+
+    total = rounds * len(queries)
+    print(f'Cache terjemahan: {total} query, {calls[0]} LLM call '
+          f'({1 - calls[0] / total:.0%} dihemat, hit {cache.hits} / miss {cache.misses})')
+
+
+if __name__ == '__main__':
+    print(f'{len(SAMPLES)} query berlabel')
+    evaluate('lama', detect_indonesian_old)
+    evaluate('baru', is_indonesian)
+    simulate_cache()
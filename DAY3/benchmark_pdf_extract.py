@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import PyPDF2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.pdf_extract import iter_pdf_pages, print_extract_stats, peak_rss_mb
+
+# Bandingkan ekstraksi PDF lama (sekuensial, text +=) dengan process pool streaming
+# Pemakaian: python DAY3/benchmark_pdf_extract.py <folder_pdf>
+
+
+def extract_sequential(pdf_files):
+    pages = 0
+    for pdf_path in pdf_files:
+        with open(pdf_path, 'rb') as file:
+            text = ""
+            for page_num, page in enumerate(PyPDF2.PdfReader(file).pages):
+                page_text = page.extract_text()
+                if page_text:
+                    text += f"\n--- Page {page_num + 1} ---\n{page_text}"
+                    pages += 1
+    return pages
+
+
+if __name__ == '__main__':
+    folder = Path(sys.argv[1] if len(sys.argv) > 1 else '.')
+    pdf_files = sorted(folder.glob('*.pdf'))
+    if not pdf_files:
+        print(f'Tidak ada PDF di {folder}')
+        sys.exit(1)
+
+    start = time.perf_counter()
+    pages = extract_sequential(pdf_files)
+    elapsed = time.perf_counter() - start
+    rss = peak_rss_mb()
+    print(f"[Sekuensial] {pages} halaman, {elapsed:.2f}s ({pages / elapsed:.1f} halaman/s)"
+          + (f", peak RSS {rss[0]:.0f} MB" if rss else ''))
+
+    # jalankan terpisah kalau ingin peak RSS yang tidak tercampur mode sekuensial
+    stats = {}
+    for _ in iter_pdf_pages(pdf_files, stats=stats):
+        pass
+    print_extract_stats(stats)
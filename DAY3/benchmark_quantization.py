@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common import vector_store
+from common.vector_store import LocalVectorStore
+
+# Bandingkan LocalVectorStore float32 vs kode int8 / binary (+ rescoring float):
+# ukuran index yang dipindai, query/detik, dan recall@K terhadap hasil exact float32.
+# Vector sintetis ber-cluster (mirip embedding dokumen), tanpa API call.
+DIM = 1536
+N_QUERIES = 50
+K = 10
+CORPUS_SIZES = [10_000, 40_000]
+
+
+def make_corpus(rng, size):
+    centers = rng.standard_normal((max(size // 100, 1), DIM), dtype=np.float32)
+    vectors = centers[rng.integers(0, len(centers), size)] + rng.normal(scale=0.8, size=(size, DIM)).astype(np.float32)
+    queries = vectors[rng.integers(0, size, N_QUERIES)] + rng.normal(scale=0.3, size=(N_QUERIES, DIM)).astype(np.float32)
+    return vectors, queries
+
+
+def build(path, vectors, quantization):
+    store = LocalVectorStore(path, quantization=quantization)
+    for start in range(0, len(vectors), 10_000):
+        ids = [f'doc-{i}' for i in range(start, min(start + 10_000, len(vectors)))]
+        store.upsert(ids, vectors[start:start + 10_000])
+    return store
+
+
+def run_queries(store, queries):
+    store.query(queries[:1], n_results=K)  # warm-up (page cache)
+    start = time.perf_counter()
+    results = [store.query(query[None, :], n_results=K)['ids'][0] for query in queries]
+    return results, len(queries) / (time.perf_counter() - start)
+
+
+def recall(results, truth):
+    return np.mean([len(set(found) & set(expected)) / K for found, expected in zip(results, truth)])
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    print(f"{'corpus':>8} {'mode':<8} {'index MB':>9} {'q/s':>8} {'recall@10':>10} {'tanpa rescore':>14}")
+
+    for size in CORPUS_SIZES:
+        vectors, queries = make_corpus(rng, size)
+        with tempfile.TemporaryDirectory() as tmp:
+            exact = build(os.path.join(tmp, 'float32'), vectors, None)
+            truth, qps = run_queries(exact, queries)
+            print(f"{size:>8} {'float32':<8} {exact.index_bytes() / 2**20:>9.1f} {qps:>8.1f} {1.0:>10.3f} {'-':>14}")
+
+            for mode in ('int8', 'binary'):
+                store = build(os.path.join(tmp, mode), vectors, mode)
+                results, qps = run_queries(store, queries)
+
+                # faktor 1 = kandidat tahap pertama langsung dipakai (rescore hanya mengurutkan ulang)
+                factor = vector_store.RESCORE_FACTOR[mode]
+                vector_store.RESCORE_FACTOR[mode] = 1
+                first_pass, _ = run_queries(store, queries)
+                vector_store.RESCORE_FACTOR[mode] = factor
+
+                print(f"{size:>8} {mode:<8} {store.index_bytes() / 2**20:>9.1f} {qps:>8.1f} "
+                      f"{recall(results, truth):>10.3f} {recall(first_pass, truth):>14.3f}")
@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.benchmark import MODES, load_documents, run_config, print_benchmark_rows, is_relevant
+from common.embeddings import HashingEmbedder
+
+# Benchmark retrieval offline: embedding hashing lokal (tanpa API key / network),
+# pertanyaan berlabel di benchmark_questions.json atas knowledge_base/.
+# Pemakaian:
+#   python DAY3/benchmark_rag.py
+#   python DAY3/benchmark_rag.py --backends local --chunks 300:30 --modes rerank --min-recall 0.8
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_questions.json')
+
+
+def check_labels(documents, questions):
+    """Potongan jawaban harus benar-benar ada di file sumbernya, kalau tidak label salah ketik"""
+    by_name = {doc['filename']: doc for doc in documents}
+    broken = [
+        label['question'] for label in questions
+        if label['source'] not in by_name
+        or not is_relevant({'source': label['source'], 'text': by_name[label['source']]['content']}, label)
+    ]
+    if broken:
+        raise SystemExit('Label tidak ditemukan di knowledge base:\n  ' + '\n  '.join(broken))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Offline RAG retrieval benchmark')
+    parser.add_argument('--knowledge-base', default=os.path.join(ROOT, 'knowledge_base'))
+    parser.add_argument('--questions', default=QUESTIONS_PATH)
+    parser.add_argument('--backends', nargs='+', default=['local', 'chroma'],
+                        choices=['local', 'local-int8', 'local-binary', 'chroma'])
+    parser.add_argument('--chunks', nargs='+', default=['150:15', '300:30', '500:50'],
+                        help='max_tokens:overlap_tokens')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES)
+    parser.add_argument('--dimensions', type=int, default=512)
+    parser.add_argument('-k', type=int, default=3)
+    parser.add_argument('--min-recall', type=float, default=None,
+                        help='exit 1 kalau recall@k salah satu konfigurasi di bawah nilai ini')
+    parser.add_argument('--json', default=None, help='simpan hasil lengkap ke file JSON')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    documents = load_documents(args.knowledge_base)
+    with open(args.questions, 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+    check_labels(documents, questions)
+
+    embedder = HashingEmbedder(args.dimensions)
+    ks = sorted({1, args.k, 5})
+    print(f'{len(documents)} dokumen, {len(questions)} pertanyaan, embedding {embedder.model}\n')
+
+    rows = []
+    for name in args.backends:
+        # 'local-int8' -> backend local dengan kuantisasi int8
+        backend, _, quantization = name.partition('-')
+        for config in args.chunks:
+            max_tokens, overlap_tokens = (int(value) for value in config.split(':'))
+            rows.extend(run_config(documents, questions, embedder, backend, max_tokens, overlap_tokens,
+                                   modes=args.modes, ks=ks, quantization=quantization or None))
+
+    print_benchmark_rows(rows, k=args.k)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    if args.min_recall is not None:
+        failed = [row for row in rows if row[f'recall@{args.k}'] < args.min_recall]
+        for row in failed:
+            print(f"\n[GAGAL] {row['backend']} {row['chunking']} {row['mode']}: "
+                  f"recall@{args.k} {row[f'recall@{args.k}']:.2f} < {args.min_recall}")
+            for question in row['missed']:
+                print(f'  - {question}')
+        sys.exit(1 if failed else 0)
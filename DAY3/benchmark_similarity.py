@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.similarity import SimilarityIndex, cosine_similarity
+
+# Micro-benchmark: queries/detik vs ukuran corpus (vector random, tanpa API call)
+DIM = 1536
+N_QUERIES = 64
+K = 10
+CORPUS_SIZES = [1_000, 10_000, 100_000]
+
+
+def bench_loop(corpus, queries):
+    """Cara lama: cosine_similarity per pasangan lalu sort"""
+    start = time.perf_counter()
+    for query in queries:
+        scores = [cosine_similarity(query, vector) for vector in corpus]
+        sorted(range(len(scores)), key=scores.__getitem__, reverse=True)[:K]
+    return len(queries) / (time.perf_counter() - start)
+
+
+def bench_index(index, queries):
+    index.search(queries[:1], k=K)  # warm-up (gabung matriks)
+    start = time.perf_counter()
+    index.search(queries, k=K)
+    return len(queries) / (time.perf_counter() - start)
+
+
+rng = np.random.default_rng(0)
+queries = rng.standard_normal((N_QUERIES, DIM), dtype=np.float32)
+
+print(f"{'corpus':>10} {'loop q/s':>12} {'index q/s':>12}")
+for size in CORPUS_SIZES:
+    corpus = rng.standard_normal((size, DIM), dtype=np.float32)
+    index = SimilarityIndex(DIM)
+    index.add(range(size), corpus)
+
+    # loop lama sangat lambat, cukup diukur dengan 2 query di corpus kecil
+    loop_qps = bench_loop(corpus, queries[:2]) if size <= 10_000 else float('nan')
+    index_qps = bench_index(index, queries)
+    print(f'{size:>10} {loop_qps:>12.1f} {index_qps:>12.1f}')
@@ -1,41 +1,23 @@
-from openai import OpenAI
 import os
+import sys
 from dotenv import load_dotenv
-import numpy as np
 
-load_dotenv()
-
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
-
-def get_embeddings(text):
-# client.embeddings.create()
-    response = client.embeddings.create(
-        model='text-embedding-3-small',
-        input=text
-    )
-
-    # response.data[0].embedding
-    return response.data[0].embedding
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embeddings import get_provider
+from common.similarity import cosine_similarity
 
-def cosine_similarity(vector1, vector2):
-    vector1 = np.array(vector1)
-    vector2 = np.array(vector2)
-
-    dot_product = np.dot(vector1, vector2)
-    magnitude1 = np.linalg.norm(vector1)
-    magnitude2 = np.linalg.norm(vector2)
-
-    similarity =  dot_product / (magnitude1 * magnitude2)
-    return similarity
+load_dotenv()
 
+# kosong = 1536 dimensi penuh, mis. 512 untuk index lebih kecil
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS')) if os.getenv('EMBEDDING_DIMENSIONS') else None
+# 'openai' (API) atau 'local' (model ONNX di CPU, tanpa network)
+embedder = get_provider(os.getenv('EMBEDDING_PROVIDER', 'openai'), EMBEDDING_DIMENSIONS)
 
 text1 = 'I love dogs'
 text2 = 'I love dogs'
 
-emb1 = get_embeddings(text1)
-emb2 = get_embeddings(text2)
+emb1 = embedder.embed_one(text1)
+emb2 = embedder.embed_one(text2)
 
 similarity = cosine_similarity(emb1, emb2)
 print(f'Text 1: {text1}')
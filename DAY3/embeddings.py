@@ -1,24 +1,23 @@
-from openai import OpenAI
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embeddings import get_provider, print_cache_stats
+
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+# kosong = 1536 dimensi penuh, mis. 512 untuk index lebih kecil
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS')) if os.getenv('EMBEDDING_DIMENSIONS') else None
+# 'openai' (API) atau 'local' (model ONNX di CPU, tanpa network)
+embedder = get_provider(os.getenv('EMBEDDING_PROVIDER', 'openai'), EMBEDDING_DIMENSIONS)
 
 text = 'Gue ganteng banget'
 
-# client.embeddings.create()
-response = client.embeddings.create(
-    model='text-embedding-3-small',
-    input=text
-)
-
-# response.data[0].embedding
-embedding_data = response.data[0].embedding
+# client.embeddings.create() -> lewat cache, teks yang sama tidak di-embed dua kali
+embedding_data = embedder.embed_one(text)
 
 print(f'Text: {text}')
 print(f'Dimensions: {len(embedding_data)}')
-print(f'Embedding first 10 values: {embedding_data[:10]}')
\ No newline at end of file
+print(f'Embedding first 10 values: {embedding_data[:10]}')
+print_cache_stats(embedder.cache)
@@ -1,28 +1,81 @@
-from openai import OpenAI
 import os
+import sys
+import atexit
+import shutil
 from dotenv import load_dotenv
-import numpy as np
-import chromadb
-from chromadb.utils import embedding_functions
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.ingest import print_ingest_stats
+from common.reindex import reindex
+from common.embeddings import get_provider, print_cache_stats
+from common.vector_store import open_collection, migrate_collection
+from common.semantic_cache import SemanticCache
+from common.llm_clients import get_client
+from common.streaming import stream_to_terminal, print_stream_stats
+from common.memory import ConversationMemory, make_summarizer
+from common.retrieval import speculative_search, hybrid_search
+from common.bm25 import BM25Index
+from common.chunker import chunk_text
+from common.context import pack_context
+from common.rerank import rerank
 
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
+# client rewrite dibuat sekali, koneksinya dipakai ulang setiap turn
+openrouter_client = get_client('openrouter', 'rewrite')
+
+# 'chroma' (default) atau 'local' (index memmap tanpa SQLite/HNSW)
+VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'chroma')
+DB_PATH = './chroma_db' if VECTOR_BACKEND == 'chroma' else './vector_db'
+# backend 'local' saja: 'int8' (4x lebih kecil) / 'binary' (32x), kosong = float penuh
+VECTOR_QUANTIZATION = os.getenv('VECTOR_QUANTIZATION') or None
+
+# 'openai' (default, API) atau 'local' (model ONNX di CPU, tanpa network)
+EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'openai')
+# dimensi embedding text-embedding-3-small (kosong = 1536 penuh); 512 -> index 3x lebih kecil
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS')) if os.getenv('EMBEDDING_DIMENSIONS') else None
+# tiap provider/dimensi punya collection (dan manifest/BM25/answer cache) sendiri,
+# mis. knowledge_base_d512 atau knowledge_base_local
+SUFFIX = ('' if EMBEDDING_PROVIDER == 'openai' else f'_{EMBEDDING_PROVIDER}') + \
+    (f'_d{EMBEDDING_DIMENSIONS}' if EMBEDDING_DIMENSIONS else '')
+embedder = get_provider(EMBEDDING_PROVIDER, EMBEDDING_DIMENSIONS)
+
+# manifest hash per file & per chunk, disimpan bareng index-nya
+MANIFEST_PATH = os.path.join(DB_PATH, f'manifest{SUFFIX}.json')
+
+collection = open_collection(
+    f'knowledge_base{SUFFIX}',
+    backend=VECTOR_BACKEND,
+    path=DB_PATH,
+    metadata={'description':'Production RAG knowledge base example'},
+    quantization=VECTOR_QUANTIZATION,
+    dimensions=EMBEDDING_DIMENSIONS,
+    # embedding selalu dikirim sendiri, embedding function OpenAI hanya untuk provider openai
+    embedding_model='text-embedding-3-small' if EMBEDDING_PROVIDER == 'openai' else None,
+    embedding_provider=None if EMBEDDING_PROVIDER == 'openai' else EMBEDDING_PROVIDER
 )
 
-openai_em_func = embedding_functions.OpenAIEmbeddingFunction(
-    api_key=os.getenv('OPENAI_API_KEY'),
-    model_name='text-embedding-3-small'
+# inverted index BM25, di-update bersamaan dengan embedding saat ingestion
+lexical_index = BM25Index(os.path.join(DB_PATH, f'bm25{SUFFIX}'))
+
+# cache jawaban: pertanyaan yang maknanya sama langsung dijawab tanpa LLM call
+answer_cache = SemanticCache(
+    os.path.join(DB_PATH, f'answer_cache{SUFFIX}'),
+    threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92'))
 )
+# urutan LRU dari cache hit ditulis sekali saat keluar (Ctrl+C / EOF), bukan per hit
+atexit.register(answer_cache.save)
 
-chroma_client = chromadb.PersistentClient('./chroma_db')
+# retrieval dengan query mentah dimulai tanpa menunggu rewrite selesai
+SPECULATIVE_RETRIEVAL = os.getenv('SPECULATIVE_RETRIEVAL', '1') == '1'
+# kalau distance hasil query mentah <= nilai ini, rewrite tidak ditunggu (kosong = selalu tunggu)
+REWRITE_SKIP_DISTANCE = float(os.getenv('REWRITE_SKIP_DISTANCE')) if os.getenv('REWRITE_SKIP_DISTANCE') else None
 
-collection = chroma_client.get_or_create_collection(
-    name='knowledge_base',
-    metadata={'description':'Production RAG knowledge base example'},
-    embedding_function=openai_em_func
-)
+# batas token context di prompt; chunk bersebelahan/overlap digabung sebelum dihitung
+CONTEXT_TOKENS = int(os.getenv('CONTEXT_TOKENS', '1500'))
+
+# kandidat hasil fusion yang di-rerank + MMR (0 = tanpa rerank)
+RERANK_CANDIDATES = int(os.getenv('RERANK_CANDIDATES', '12'))
 
 # hidden process -> co -> llection.add -> embeddingsimpan ke vectorstore
 
@@ -48,107 +101,128 @@ def load_documents(folder_path):
     return documents
 
 
-def chunk_text(text, chunk_size=800, overlap=150):
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        # start = 0, end = 0 + 800, chunk = 0 - 800
-        if chunk.strip():
-            chunks.append(chunk)
+def migrate_from_full_dimensions():
+    """
+    Collection dimensi kecil yang masih kosong diisi dari collection 1536 dimensi:
+    vector dipendekkan + dinormalisasi ulang, tanpa embed ulang.
+    """
+    if EMBEDDING_PROVIDER != 'openai' or not EMBEDDING_DIMENSIONS or collection.count():
+        return
 
-        start += chunk_size - overlap
+    source = open_collection('knowledge_base', backend=VECTOR_BACKEND, path=DB_PATH)
+    if not source.count():
+        return
 
-    return chunks
+    stats = migrate_collection(source, collection, EMBEDDING_DIMENSIONS)
+    base_manifest = os.path.join(DB_PATH, 'manifest.json')
+    if os.path.exists(base_manifest):
+        shutil.copy(base_manifest, MANIFEST_PATH)
+    print(f"[Migrasi] {stats['rows']} chunk {stats['source_dim']} -> {stats['target_dim']} dimensi "
+          f"dalam {stats['seconds']:.2f}s")
 
 
 def add_documents_to_db(folder_path):
+    """Sinkronkan knowledge base: hanya chunk baru/berubah yang di-embed, chunk basi dihapus"""
     docs = load_documents(folder_path)
 
-    all_chunks = []
-    all_ids = []
-    all_metadatas = []
+    migrate_from_full_dimensions()
+    stats = reindex(collection, docs, chunk_text, embedder, MANIFEST_PATH, lexical_index)
 
-    chunk_counter = 0
+    print(f"[Reindex] +{stats['added']} chunk, -{stats['deleted']} chunk, "
+          f"{stats['unchanged_files']}/{len(docs)} file tidak berubah")
+    if stats['ingest']:
+        print_ingest_stats(stats['ingest'])
+    print_cache_stats(embedder.cache)
 
-    for doc in docs:
-        chunks = chunk_text(doc['content']) # chunks akan berisi banyak chunk -> chunks = [chunk, chunk, chunk ...]
+    # jawaban yang memakai chunk/file yang berubah sudah tidak valid
+    removed = answer_cache.invalidate(stats['deleted_ids'], stats['changed_sources'])
+    if removed:
+        print(f'[Answer Cache] {removed} jawaban lama dihapus')
 
-        for i, chunk in enumerate(chunks):
-            all_chunks.append(chunk)
-            all_ids.append(f'chunk_{chunk_counter}')
-            all_metadatas.append({
-                'source':doc['filename'],
-                'chunk_id':i
-            })
 
-            chunk_counter += 1
-
-    collection.add(
-        documents=all_chunks,
-        ids=all_ids,
-        metadatas=all_metadatas
-    )
-
-
-def search(query, n_result=3):
+def dense_search(query, n_result=3):
     results = collection.query(
-        query_texts=[query],
+        query_embeddings=[embedder.embed_one(query)],
         n_results=n_result
     )
 
     relevant_chunks = []
     for i in range(len(results['documents'][0])):
         relevant_chunks.append({
+            'id': results['ids'][0][i],
             'text': results['documents'][0][i],
             'source': results['metadatas'][0][i]['source'],
+            'chunk_id': results['metadatas'][0][i].get('chunk_id'),
             'distance': results['distances'][0][i] # -> cosine similarity
         })
 
     return relevant_chunks
 
-def generate_answer(history):
-    response = client.chat.completions.create(
-        model='gpt-4o-mini',
-        messages=history
-    )
 
-    return response.choices[0].message.content
+def fetch_chunks(ids):
+    """Ambil chunk berdasarkan id (urutan mengikuti `ids`)"""
+    results = collection.get(ids=ids, include=['documents', 'metadatas'])
+    by_id = {
+        chunk_id: {
+            'id': chunk_id,
+            'text': text,
+            'source': metadata['source'],
+            'chunk_id': metadata.get('chunk_id'),
+            'distance': None
+        }
+        for chunk_id, text, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+    }
+    return [by_id[chunk_id] for chunk_id in ids if chunk_id in by_id]
+
+
+def diversify(query, chunks, n_result=3):
+    """Rerank kandidat (cosine + lexical) lalu MMR supaya chunk yang hampir sama tidak terpilih semua"""
+    if len(chunks) <= n_result:
+        return chunks
+
+    results = collection.get(ids=[chunk['id'] for chunk in chunks], include=['embeddings'])
+    vector_of = dict(zip(results['ids'], results['embeddings']))
+    chunks = [chunk for chunk in chunks if chunk['id'] in vector_of]
+    vectors = [vector_of[chunk['id']] for chunk in chunks]
+
+    return rerank(query, embedder.embed_one(query), chunks, vectors, n_results=n_result)
 
 
-def get_embeddings(text):
-# client.embeddings.create()
-    response = client.embeddings.create(
-        model='text-embedding-3-small',
-        input=text
+def search(query, n_result=3):
+    # BM25 + vector, query keyword yang jelas (nomor SKU/versi) tidak perlu embedding call
+    return hybrid_search(
+        query, lexical_index, dense_search, fetch_chunks, n_results=n_result,
+        rerank_fn=diversify if RERANK_CANDIDATES else None, n_rerank=RERANK_CANDIDATES
     )
 
-    # response.data[0].embedding
-    return response.data[0].embedding
 
-def cosine_similarity(vector1, vector2):
-    """Fungsi ini digunakan untuk menghitung cosine similarity"""
-    vector1 = np.array(vector1)
-    vector2 = np.array(vector2)
+def generate_answer(history):
+    """Jawaban di-stream ke terminal, return teks lengkap untuk history & answer cache"""
+    return stream_to_terminal(history, 'gpt-4o-mini')
 
-    dot_product = np.dot(vector1, vector2)
-    magnitude1 = np.linalg.norm(vector1)
-    magnitude2 = np.linalg.norm(vector2)
 
-    similarity =  dot_product / (magnitude1 * magnitude2)
-    return similarity
+def rewrite_query(raw_query):
+    prompt_enhancement = openrouter_client.chat.completions.create(
+        model='openai/gpt-oss-20b:free',
+        messages=[
+            {'role':'system', 'content':'You are a user question translator. Translate user questions from any language into English and make them clearer and more detailed.'},
+            {'role':'user', 'content':raw_query},
+        ],
+        max_tokens=150
+    )
+
+    return prompt_enhancement.choices[0].message.content
 
-if collection.count() == 0:
-    print('Database kosong, menambahkan semua dokumen')
-    add_documents_to_db('knowledge_base')
+
+# jalan setiap start, tapi hanya file yang berubah yang diproses ulang
+add_documents_to_db('knowledge_base')
 
 print('RAG CHATBOT')
 
 
-history = [{
-    'role': 'system', 
-    'content': '''You are a professional and friendly customer service agent for this company. Answer in the language used by the user
+# history dibatasi token, turn lama diringkas di background (tidak menambah latency turn)
+memory = ConversationMemory(
+    '''You are a professional and friendly customer service agent for this company. Answer in the language used by the user
 
 HOW TO ANSWER:
 1. Always greet with kindness and empathy.
@@ -167,46 +241,54 @@ LANGUAGE STYLE:
 EXAMPLE:
 "Thank you for your question! 😊
 According to our company policy, [specific answer from context]...
-Is there anything else I can help you with?'''
-}]
+Is there anything else I can help you with?''',
+    summarize_fn=make_summarizer(get_client('openai', 'chat'))
+)
 
 while True:
     raw_query = input('You: ').strip()
 
+    if not raw_query:
+        continue
 
-    openrouter_client = OpenAI(
-        base_url='https://openrouter.ai/api/v1', # ganti kalau mau ganti
-        api_key=os.getenv('OPENROUTER_API_KEY') # sesuaikan
-    )
-    prompt_enhancement = openrouter_client.chat.completions.create(
-        model='openai/gpt-oss-20b:free',
-        messages=[
-            {'role':'system', 'content':'You are a user question translator. Translate user questions from any language into English and make them clearer and more detailed.'},
-            {'role':'user', 'content':raw_query},
-        ],
-        max_tokens=150
-    )
+    # cek cache dulu, kalau pertanyaan serupa pernah dijawab tidak perlu rewrite/search/LLM
+    raw_embedding = embedder.embed_one(raw_query)
+    cached = answer_cache.lookup(raw_embedding)
+    if cached:
+        memory.add('user', raw_query)
+        memory.add('assistant', cached['answer'])
+        print(f"AI: {cached['answer']}")
+        continue
 
-    query = prompt_enhancement.choices[0].message.content
+    if SPECULATIVE_RETRIEVAL:
+        # search dengan query mentah jalan bersamaan dengan rewrite, hasilnya digabung
+        query, results = speculative_search(
+            raw_query, rewrite_query, search, n_results=3, skip_distance=REWRITE_SKIP_DISTANCE
+        )
+    else:
+        query = rewrite_query(raw_query)
 
-    if not query:
-        continue
+        if not query:
+            continue
 
-    # search ke DB
-    results = search(query, n_result=3)
+        # search ke DB
+        results = search(query, n_result=3)
 
-    context = "\n".join([chunk['text'] for chunk in results])
+    context = pack_context(results, max_tokens=CONTEXT_TOKENS)['text']
 
     user_prompt = f"""Customer Question: {query}
 
 Context from knowledge base:
 {context}"""
     
-    history.append({'role':'user', 'content':user_prompt})
-
-    answer = generate_answer(history)
+    # context hanya dikirim di turn ini, yang disimpan ke memori cukup pertanyaannya
+    print('AI: ', end='', flush=True)
+    answer = generate_answer(memory.messages([{'role':'user', 'content':user_prompt}]))
+    print()
 
-    history[-1] = {'role':'user', 'content':query}
-    history.append({'role':'assistant','content': answer})
+    memory.add('user', query)
+    memory.add('assistant', answer)
 
-    print(f'AI: {answer}')
+    answer_cache.store(raw_query, raw_embedding, answer, [
+        {'id': chunk['id'], 'source': chunk['source']} for chunk in results
+    ])
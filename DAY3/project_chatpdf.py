@@ -1,191 +1,205 @@
 
 import os
+import sys
 os.environ['TOKENIZERS_PARALLELISM'] = 'false'
 
-from openai import OpenAI
 from dotenv import load_dotenv
 import chromadb
 from chromadb.utils import embedding_functions
-import PyPDF2
 from pathlib import Path
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.embeddings import Embedder
+from common.llm_clients import get_client, print_connection_stats
+from common.streaming import stream_to_terminal, print_stream_stats
+from common.retrieval import speculative_search
+from common.chunker import chunk_text
+from common.pdf_extract import iter_pdf_pages, print_extract_stats
+from common.pipeline import Pipeline, print_pipeline_stats
+from common.ingest import make_record, pack_batches
+from common.collection_registry import CollectionRegistry, file_hash
+from common.language import is_indonesian, TranslationCache
+from common.context import pack_context
+from common.rerank import rerank, N_CANDIDATES
+
 load_dotenv()
 
 # Initialize clients
-embeddings_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+embeddings_client = get_client('openai', 'embedding')
 
-chat_client = OpenAI(
-    base_url='https://openrouter.ai/api/v1',
-    api_key=os.getenv("OPENROUTER_API_KEY")
-)
+chat_client = get_client('openrouter', 'chat')
+
+# dimensi embedding (kosong = 1536 penuh), collection tiap dimensi terpisah
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS')) if os.getenv('EMBEDDING_DIMENSIONS') else None
 
 # Setup ChromaDB with OpenAI embeddings
 openai_ef = embedding_functions.OpenAIEmbeddingFunction(
     api_key=os.getenv('OPENAI_API_KEY'),
-    model_name='text-embedding-3-small'
+    model_name='text-embedding-3-small',
+    dimensions=EMBEDDING_DIMENSIONS
 )
 
 chroma_client = chromadb.PersistentClient('./pdf_db')
 
+# Catatan collection per folder PDF, dipakai ulang antar sesi
+registry = CollectionRegistry('./pdf_db/collections.json')
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF file"""
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"\n--- Page {page_num + 1} ---\n{page_text}"
-            
-            return text
-    except Exception:
-        return None
+# Semua embedding (chunk & query) lewat cache, jadi PDF yang sama tidak di-embed ulang;
+# ganti dimensi juga tanpa API call, vector penuh di cache cukup dipendekkan
+embedder = Embedder(client=embeddings_client, dimensions=EMBEDDING_DIMENSIONS)
+
+# Query yang sama (atau hanya beda kapitalisasi/spasi) cukup diterjemahkan sekali
+translation_cache = TranslationCache()
 
 
-def load_pdfs_from_path(folder_path):
-    """Load all PDFs from given path"""
+def list_pdf_files(folder_path):
+    """List PDF files in given path"""
     folder = Path(folder_path)
     
     if not folder.exists():
         return []
     
-    documents = []
-    pdf_files = list(folder.glob("*.pdf"))
-    
-    for pdf_path in pdf_files:
-        text = extract_text_from_pdf(pdf_path)
-        if text:
-            documents.append({
-                'filename': pdf_path.name,
-                'content': text
-            })
-    
-    return documents
+    return sorted(folder.glob("*.pdf"))
 
 
-def chunk_text(text, chunk_size=1000, overlap=200):
-    """Split text into overlapping chunks"""
-    chunks = []
-    start = 0
+def load_pdfs_from_path(folder_path, stats=None, only=None):
+    """Stream page records from PDFs in given path (parallel extraction)"""
+    pdf_files = list_pdf_files(folder_path)
+    if only is not None:
+        pdf_files = [pdf for pdf in pdf_files if pdf.name in only]
     
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-        start += chunk_size - overlap
+    yield from iter_pdf_pages(pdf_files, stats=stats)
+
+
+def chunk_pages(pages):
+    """Stage chunking: stream halaman -> stream batch record siap di-embed"""
+    def records():
+        for page in pages:
+            for i, chunk in enumerate(chunk_text(page['text'])):
+                yield make_record(
+                    f"{page['filename']}:p{page['page']}:{i}",
+                    chunk,
+                    {'source': page['filename'], 'page': page['page'], 'chunk_id': i}
+                )
     
-    return chunks
+    return pack_batches(records())
 
 
-def load_documents_to_db(folder_path, collection):
-    """Load PDFs and add to ChromaDB"""
-    documents = load_pdfs_from_path(folder_path)
+def load_documents_to_db(folder_path, collection, only=None):
+    """Load PDFs (optionally only some filenames) and add to ChromaDB, return set of ingested filenames"""
+    extract_stats = {}
+    ingested = set()
     
-    if not documents:
-        return False
+    def embed_batch(batch):
+        return [(batch, embedder.embed([r['text'] for r in batch]))]
     
-    all_chunks = []
-    all_ids = []
-    all_metadatas = []
+    def upsert_batch(item):
+        batch, embeddings = item
+        collection.upsert(
+            documents=[r['text'] for r in batch],
+            ids=[r['id'] for r in batch],
+            metadatas=[r['metadata'] for r in batch],
+            embeddings=embeddings
+        )
+        ingested.update(r['metadata']['source'] for r in batch)
     
-    chunk_counter = 0
+    # extract -> chunk -> embed -> upsert jalan bersamaan, dihubungkan queue terbatas
+    pipeline = Pipeline(load_pdfs_from_path(folder_path, stats=extract_stats, only=only))
+    pipeline.stream('chunk', chunk_pages)
+    pipeline.map('embed', embed_batch, workers=4)
+    pipeline.map('upsert', upsert_batch)
+    try:
+        stats = pipeline.run()
+    except RuntimeError as e:
+        # file yang sedang diproses saat gagal bisa baru masuk sebagian, jadi tidak ada yang dianggap selesai
+        print(f"Error loading documents: {e}")
+        return set()
     
-    for doc in documents:
-        chunks = chunk_text(doc['content'])
-        
-        for i, chunk in enumerate(chunks):
-            all_chunks.append(chunk)
-            all_ids.append(f"chunk_{chunk_counter}")
-            all_metadatas.append({
-                'source': doc['filename'],
-                'chunk_id': i
-            })
-            chunk_counter += 1
+    print_extract_stats(extract_stats)
+    if not extract_stats.get('pages'):
+        return set()
     
-    # Add in batches
-    batch_size = 100
-    for i in range(0, len(all_chunks), batch_size):
-        batch_end = min(i + batch_size, len(all_chunks))
-        collection.add(
-            documents=all_chunks[i:batch_end],
-            ids=all_ids[i:batch_end],
-            metadatas=all_metadatas[i:batch_end]
-        )
+    print_pipeline_stats(stats)
     
-    return True
+    # PDF yang sebagian halamannya gagal diekstrak tidak dianggap selesai
+    return ingested - set(extract_stats['failed'])
 
 
 def detect_indonesian(text):
     """Detect if query is in Indonesian"""
-    indonesian_words = [
-        'apa', 'berapa', 'bagaimana', 'mengapa', 'kapan', 'dimana', 'siapa',
-        'saya', 'kamu', 'kalian', 'kami', 'yang', 'ini', 'itu', 'dan',
-        'untuk', 'dari', 'ke', 'di', 'pada', 'adalah', 'bisa', 'dapat'
-    ]
-    
-    text_lower = text.lower()
-    count = sum(1 for word in indonesian_words if word in text_lower)
-    return count >= 2
+    return is_indonesian(text)
+
+
+def _translate_llm(query):
+    response = chat_client.chat.completions.create(
+        model='openai/gpt-oss-20b:free',
+        messages=[
+            {
+                'role': 'system',
+                'content': 'Translate Indonesian to English. Output only the translation.'
+            },
+            {'role': 'user', 'content': query}
+        ],
+        timeout=15
+    )
+    return response.choices[0].message.content.strip()
 
 
 def translate_to_english(query):
     """Translate Indonesian query to English"""
     try:
-        response = chat_client.chat.completions.create(
-            model='openai/gpt-oss-20b:free',
-            messages=[
-                {
-                    'role': 'system',
-                    'content': 'Translate Indonesian to English. Output only the translation.'
-                },
-                {'role': 'user', 'content': query}
-            ],
-            timeout=15
-        )
-        return response.choices[0].message.content.strip()
+        return translation_cache.translate(query, _translate_llm)
     except Exception:
         return query
 
 
+def query_collection(search_query, collection, n_results=3):
+    """Query ChromaDB and format results"""
+    query_embedding = embedder.embed_one(search_query)
+    # ambil kandidat lebih banyak, lalu rerank + MMR supaya halaman yang mirip tidak mendominasi
+    results = collection.query(
+        query_embeddings=[query_embedding],
+        n_results=max(n_results, N_CANDIDATES),
+        include=['documents', 'metadatas', 'distances', 'embeddings']
+    )
+    
+    relevant_chunks = []
+    for i in range(len(results['documents'][0])):
+        relevant_chunks.append({
+            'id': results['ids'][0][i],
+            'text': results['documents'][0][i],
+            'source': results['metadatas'][0][i]['source'],
+            'page': results['metadatas'][0][i].get('page'),
+            'chunk_id': results['metadatas'][0][i].get('chunk_id'),
+            'distance': results['distances'][0][i]
+        })
+    
+    return rerank(search_query, query_embedding, relevant_chunks, results['embeddings'][0], n_results=n_results)
+
+
 def search_documents(query, collection, n_results=3):
     """Search for relevant chunks"""
     try:
-        search_query = query
         if detect_indonesian(query):
-            search_query = translate_to_english(query)
-        
-        results = collection.query(
-            query_texts=[search_query],
-            n_results=n_results
-        )
-        
-        relevant_chunks = []
-        for i in range(len(results['documents'][0])):
-            relevant_chunks.append({
-                'text': results['documents'][0][i],
-                'source': results['metadatas'][0][i]['source'],
-                'distance': results['distances'][0][i]
-            })
+            # search query asli jalan bersamaan dengan terjemahan, hasilnya digabung
+            _, relevant_chunks = speculative_search(
+                query,
+                translate_to_english,
+                lambda search_query, n: query_collection(search_query, collection, n),
+                n_results=n_results
+            )
+            return relevant_chunks
         
-        return relevant_chunks
+        return query_collection(query, collection, n_results)
     except Exception:
         return []
 
 
 def generate_answer(query, relevant_chunks, history):
-    """Generate answer using LLM"""
+    """Generate answer using LLM, di-stream langsung ke terminal"""
     try:
-        context_parts = []
-        for i, chunk in enumerate(relevant_chunks, 1):
-            context_parts.append(
-                f"[{i}] Source: {chunk['source']}\n{chunk['text']}"
-            )
-        
-        context = "\n\n".join(context_parts)
+        # halaman/chunk yang bersebelahan digabung, teks overlap tidak dikirim dua kali
+        context = pack_context(relevant_chunks)['text']
         
         user_prompt = f"""User Question: {query}
 
@@ -196,22 +210,23 @@ Answer the question based on the context above in Bahasa Indonesia."""
         
         history.append({'role': 'user', 'content': user_prompt})
         
-        response = chat_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=history,
+        print("AI: ", end="", flush=True)
+        answer = stream_to_terminal(
+            history, "gpt-4o-mini", provider='openrouter',
             temperature=0.7,
             max_tokens=600,
             timeout=30
         )
-        
-        answer = response.choices[0].message.content
+        print("\n")
         
         history[-1] = {'role': 'user', 'content': query}
         history.append({'role': 'assistant', 'content': answer})
         
         return answer, history
     except Exception:
-        return "Maaf, terjadi kesalahan. Silakan coba lagi.", history
+        answer = "Maaf, terjadi kesalahan. Silakan coba lagi."
+        print(f"{answer}\n")
+        return answer, history
 
 
 def cleanup_collection(collection_name):
@@ -233,22 +248,53 @@ def main():
         print("Invalid path")
         return
     
-    # Step 2: Create collection
-    collection_name = f"pdf_session_{int(os.times().elapsed * 1000)}"
+    # Step 2: Find or create collection (keyed by per-file content hashes)
+    file_hashes = {pdf.name: file_hash(pdf) for pdf in list_pdf_files(pdf_path)}
+    
+    if not file_hashes:
+        print("No PDF files found or error loading documents")
+        return
+    
+    collection_name, to_ingest, to_delete = registry.resolve(pdf_path, file_hashes, EMBEDDING_DIMENSIONS)
     collection = chroma_client.get_or_create_collection(
         name=collection_name,
         embedding_function=openai_ef
     )
     
-    print("\nLoading documents...")
+    if not to_ingest and collection.count() == 0:
+        # tercatat di registry tapi collection-nya sudah hilang
+        to_ingest = list(file_hashes)
     
-    # Step 3: Load PDFs
-    success = load_documents_to_db(pdf_path, collection)
+    # Step 3: Load only new/changed PDFs
+    for filename in to_delete:
+        collection.delete(where={'source': filename})
     
-    if not success:
-        print("No PDF files found or error loading documents")
-        cleanup_collection(collection_name)
-        return
+    if to_ingest:
+        print(f"\nLoading {len(to_ingest)} document(s)...")
+        ingested = load_documents_to_db(pdf_path, collection, only=set(to_ingest))
+        
+        if collection.count() == 0:
+            print("No PDF files found or error loading documents")
+            cleanup_collection(collection_name)
+            return
+        
+        # hash file yang gagal tidak dicatat, jadi dicoba lagi di sesi berikutnya
+        failed = set(to_ingest) - ingested
+        if failed:
+            print(f"{len(failed)} file gagal dimuat, dicoba lagi di sesi berikutnya: {', '.join(sorted(failed))}")
+        recorded = {name: value for name, value in file_hashes.items() if name not in failed}
+        registry.record(collection_name, pdf_path, recorded, collection.count(), EMBEDDING_DIMENSIONS)
+    elif to_delete:
+        print("\nRemoved documents deleted from saved collection")
+        registry.record(collection_name, pdf_path, file_hashes, collection.count(), EMBEDDING_DIMENSIONS)
+    else:
+        print("\nDocuments unchanged, reusing saved collection")
+        # bisa jadi collection milik folder lain dengan isi identik: folder asalnya tidak ditimpa
+        registry.touch(collection_name)
+    
+    # Collection lama dibuang berdasarkan LRU & total ukuran, bukan setiap exit
+    for old_name in registry.evict(keep=collection_name):
+        cleanup_collection(old_name)
     
     print("Documents loaded successfully\n")
     
@@ -274,10 +320,8 @@ def main():
                 print("AI: Maaf, saya tidak menemukan informasi yang relevan.\n")
                 continue
             
-            # Generate answer
+            # Generate answer (sudah tampil selama streaming)
             answer, history = generate_answer(query, results, history)
-            
-            print(f"AI: {answer}\n")
         
         except KeyboardInterrupt:
             break
@@ -285,9 +329,9 @@ def main():
         except Exception as e:
             print(f"AI: Maaf, terjadi kesalahan.\n")
     
-    # Step 5: Cleanup
-    print("\nCleaning up...")
-    cleanup_collection(collection_name)
+    # Step 5: Collection disimpan untuk sesi berikutnya
+    print_stream_stats()
+    print_connection_stats()
     print("Session ended\n")
 
 
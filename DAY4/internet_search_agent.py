@@ -1,5 +1,5 @@
-from openai import OpenAI
 import os
+import sys
 import json
 from dotenv import load_dotenv
 import requests
@@ -7,11 +7,12 @@ from ddgs import DDGS
 import trafilatura
 
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.llm_clients import get_client
+
 load_dotenv()
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+client = get_client('openai', 'chat')
 
 MODEL = 'gpt-4o-mini'
 
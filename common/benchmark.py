@@ -0,0 +1,194 @@
+import os
+import time
+import tempfile
+
+import numpy as np
+
+from common.bm25 import BM25Index
+from common.chunker import chunk_text
+from common.reindex import reindex
+from common.rerank import rerank
+from common.retrieval import hybrid_search
+from common.vector_store import open_collection
+
+
+MODES = ('dense', 'hybrid', 'rerank')
+# ranking yang dievaluasi per pertanyaan (MRR@10)
+DEPTH = 10
+
+
+def load_documents(folder_path):
+    """Semua file .txt di folder, format sama dengan load_documents di production_RAG"""
+    documents = []
+    for file_name in sorted(os.listdir(folder_path)):
+        if file_name.endswith('.txt'):
+            with open(os.path.join(folder_path, file_name), 'r', encoding='utf-8') as f:
+                documents.append({'filename': file_name, 'content': f.read()})
+    return documents
+
+
+def _normalize(text):
+    return ' '.join(text.lower().split())
+
+
+def is_relevant(chunk, label):
+    """Chunk relevan kalau dari file yang benar dan memuat potongan jawaban"""
+    return chunk['source'] == label['source'] and _normalize(label['answer']) in _normalize(chunk['text'])
+
+
+def first_relevant_rank(chunks, label):
+    for rank, chunk in enumerate(chunks, 1):
+        if is_relevant(chunk, label):
+            return rank
+    return None
+
+
+def recall_at_k(ranks, k):
+    return sum(1 for rank in ranks if rank is not None and rank <= k) / len(ranks) if ranks else 0.0
+
+
+def mean_reciprocal_rank(ranks):
+    return sum(1.0 / rank for rank in ranks if rank is not None) / len(ranks) if ranks else 0.0
+
+
+def latency_percentiles(seconds):
+    """p50/p95/p99 dalam milidetik"""
+    if not seconds:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    p50, p95, p99 = np.percentile(np.asarray(seconds) * 1000, [50, 95, 99])
+    return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+
+def current_rss_mb():
+    """RSS proses saat ini (MB); Linux lewat /proc, OS lain None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def directory_size_mb(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / (1024 * 1024)
+
+
+def _format(results):
+    metadatas = results.get('metadatas') or [[{}] * len(results['ids'][0])]
+    return [
+        {
+            'id': chunk_id,
+            'text': text,
+            'source': metadata['source'],
+            'chunk_id': metadata.get('chunk_id'),
+            'distance': distance,
+        }
+        for chunk_id, text, metadata, distance in zip(
+            results['ids'][0], results['documents'][0], metadatas[0], results['distances'][0]
+        )
+    ]
+
+
+def make_searchers(collection, lexical_index, embed_fn, n_rerank=12):
+    """Fungsi search per mode, disusun seperti search() di production_RAG"""
+
+    def dense_search(query, n_results):
+        return _format(collection.query(query_embeddings=[embed_fn([query])[0]], n_results=n_results))
+
+    def fetch_chunks(ids):
+        results = collection.get(ids=ids, include=['documents', 'metadatas'])
+        by_id = {
+            chunk_id: {'id': chunk_id, 'text': text, 'source': metadata['source'],
+                       'chunk_id': metadata.get('chunk_id'), 'distance': None}
+            for chunk_id, text, metadata in zip(results['ids'], results['documents'], results['metadatas'])
+        }
+        return [by_id[chunk_id] for chunk_id in ids if chunk_id in by_id]
+
+    def diversify(query, chunks, n_results):
+        if len(chunks) <= n_results:
+            return chunks
+        results = collection.get(ids=[chunk['id'] for chunk in chunks], include=['embeddings'])
+        vector_of = dict(zip(results['ids'], results['embeddings']))
+        chunks = [chunk for chunk in chunks if chunk['id'] in vector_of]
+        vectors = [vector_of[chunk['id']] for chunk in chunks]
+        return rerank(query, embed_fn([query])[0], chunks, vectors, n_results=n_results)
+
+    return {
+        'dense': dense_search,
+        'hybrid': lambda query, n: hybrid_search(query, lexical_index, dense_search, fetch_chunks, n_results=n),
+        'rerank': lambda query, n: hybrid_search(
+            query, lexical_index, dense_search, fetch_chunks, n_results=n,
+            rerank_fn=diversify, n_rerank=max(n_rerank, n)
+        ),
+    }
+
+
+def run_config(documents, questions, embed_fn, backend='local', max_tokens=300, overlap_tokens=30,
+               modes=MODES, ks=(1, 3, 5), quantization=None):
+    """
+    Ingest `documents` ke index baru (folder sementara) lalu jalankan semua pertanyaan.
+
+    Returns:
+        list dict per mode: backend, chunking, mode, recall@k, mrr, latency (ms),
+        ingestion (chunks/s), memori (RSS naik & ukuran index di disk)
+    """
+    with tempfile.TemporaryDirectory(prefix='rag_bench_') as workdir:
+        rss_before = current_rss_mb()
+        collection = open_collection('benchmark', backend=backend, path=workdir, embedding_model=None,
+                                     quantization=quantization)
+        lexical_index = BM25Index(os.path.join(workdir, 'bm25'))
+
+        def chunker(text):
+            return chunk_text(text, max_tokens, overlap_tokens)
+
+        stats = reindex(collection, documents, chunker, embed_fn,
+                        os.path.join(workdir, 'manifest.json'), lexical_index)
+        rss_after = current_rss_mb()
+        index_mb = directory_size_mb(workdir)
+
+        searchers = make_searchers(collection, lexical_index, embed_fn)
+        rows = []
+        for mode in modes:
+            search = searchers[mode]
+            search(questions[0]['question'], DEPTH)  # warm-up
+            ranks = []
+            latencies = []
+            for label in questions:
+                start = time.perf_counter()
+                chunks = search(label['question'], DEPTH)
+                latencies.append(time.perf_counter() - start)
+                ranks.append(first_relevant_rank(chunks, label))
+
+            row = {
+                'backend': f'{backend}-{quantization}' if quantization else backend,
+                'chunking': f'{max_tokens}/{overlap_tokens}',
+                'mode': mode,
+                'chunks': stats['ingest']['chunks'] if stats['ingest'] else 0,
+                'ingest_chunks_per_sec': stats['ingest']['chunks_per_sec'] if stats['ingest'] else 0.0,
+                'mrr': mean_reciprocal_rank(ranks),
+                'latency_ms': latency_percentiles(latencies),
+                'rss_mb': rss_after - rss_before if rss_before is not None else None,
+                'index_mb': index_mb,
+                'missed': [label['question'] for label, rank in zip(questions, ranks) if rank is None],
+            }
+            row.update({f'recall@{k}': recall_at_k(ranks, k) for k in ks})
+            rows.append(row)
+
+        if backend == 'chroma':
+            # lepaskan file SQLite sebelum folder sementara dihapus
+            del collection
+
+        return rows
+
+
+def print_benchmark_rows(rows, k=3):
+    print(f"{'backend':<12} {'chunk':>7} {'mode':<7} {'chunks':>6} {'recall@1':>8} {f'recall@{k}':>8} "
+          f"{'MRR':>6} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'ingest/s':>9} {'RSS MB':>7} {'disk MB':>7}")
+    for row in rows:
+        rss = f"{row['rss_mb']:>7.1f}" if row['rss_mb'] is not None else f"{'-':>7}"
+        print(f"{row['backend']:<12} {row['chunking']:>7} {row['mode']:<7} {row['chunks']:>6} "
+              f"{row['recall@1']:>8.2f} {row[f'recall@{k}']:>8.2f} {row['mrr']:>6.3f} "
+              f"{row['latency_ms']['p50']:>7.2f} {row['latency_ms']['p95']:>7.2f} {row['latency_ms']['p99']:>7.2f} "
+              f"{row['ingest_chunks_per_sec']:>9.0f} {rss} {row['index_mb']:>7.2f}")
@@ -0,0 +1,204 @@
+import os
+import re
+import json
+from array import array
+from collections import Counter
+
+import numpy as np
+
+
+# token "utuh" seperti v2.3.1, SKU-4471, POL/2024/01 tetap disimpan sebagai satu token
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+_PART_RE = re.compile(r"[a-z0-9]+")
+
+K1 = 1.5
+B = 0.75
+# hasil lexical dianggap meyakinkan kalau skor #1 >= rasio ini x skor #2
+DECISIVE_RATIO = 2.0
+# ... dan dokumen #1 memuat minimal sebagian ini dari term query (bukan kebetulan sama satu kata)
+DECISIVE_COVERAGE = 0.5
+COMPACT_RATIO = 0.25
+
+
+def tokenize(text):
+    """Lowercase + token alfanumerik; token majemuk juga dipecah ke bagian-bagiannya"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(_PART_RE.findall(token))
+    return tokens
+
+
+class BM25Index:
+    """
+    Inverted index BM25 in-process, dibangun saat ingestion.
+
+    Postings per term disimpan sebagai dua array ringkas (nomor dokumen uint32,
+    term frequency uint16). Dokumen yang dihapus ditandai dulu (tombstone) lalu
+    dibuang saat compaction.
+
+    Di disk: `<path>.json` (doc_ids, terms, nomor generasi) dan `<path>.<generasi>.npz`.
+    Postings selalu ditulis ke file generasi baru sebelum JSON diganti atomik, jadi
+    crash di tengah save tidak memasangkan postings baru dengan daftar term lama.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.doc_ids = []
+        self.doc_lengths = array('I')
+        self.postings = {}
+        self._row_of = {}
+        self._deleted = set()
+        self._generation = 0
+
+        if path and os.path.exists(path + '.json'):
+            self._load()
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def add(self, doc_id, text):
+        if doc_id in self._row_of:
+            self.remove([doc_id])
+
+        row = len(self.doc_ids)
+        tokens = tokenize(text)
+        self.doc_ids.append(doc_id)
+        self.doc_lengths.append(len(tokens))
+        self._row_of[doc_id] = row
+
+        for term, tf in Counter(tokens).items():
+            if term not in self.postings:
+                self.postings[term] = (array('I'), array('H'))
+            rows, tfs = self.postings[term]
+            rows.append(row)
+            tfs.append(min(tf, 65535))
+
+    def remove(self, doc_ids):
+        for doc_id in doc_ids:
+            row = self._row_of.pop(doc_id, None)
+            if row is not None:
+                self._deleted.add(row)
+
+        if self.doc_ids and len(self._deleted) / len(self.doc_ids) > COMPACT_RATIO:
+            self.compact()
+
+    def compact(self):
+        """Bangun ulang postings tanpa dokumen yang sudah dihapus"""
+        keep = np.array([row not in self._deleted for row in range(len(self.doc_ids))], dtype=bool)
+        new_row = np.cumsum(keep) - 1
+
+        postings = {}
+        for term, (rows, tfs) in self.postings.items():
+            rows_np = np.frombuffer(rows, dtype=np.uint32)
+            mask = keep[rows_np]
+            if mask.any():
+                postings[term] = (
+                    array('I', new_row[rows_np[mask]].astype(np.uint32).tobytes()),
+                    array('H', np.frombuffer(tfs, dtype=np.uint16)[mask].tobytes()),
+                )
+
+        self.postings = postings
+        self.doc_ids = [doc_id for row, doc_id in enumerate(self.doc_ids) if keep[row]]
+        self.doc_lengths = array('I', np.frombuffer(self.doc_lengths, dtype=np.uint32)[keep].tobytes())
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+        self._deleted = set()
+
+    def search(self, query, k=10):
+        """Return list (doc_id, skor BM25) terurut, maksimal k"""
+        if not self._row_of:
+            return []
+
+        lengths = np.frombuffer(self.doc_lengths, dtype=np.uint32).astype(np.float32)
+        n_docs = len(self._row_of)
+        avg_length = lengths.sum() / max(len(lengths), 1) or 1.0
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            rows_arr, tfs_arr = self.postings[term]
+            rows = np.frombuffer(rows_arr, dtype=np.uint32)
+            tfs = np.frombuffer(tfs_arr, dtype=np.uint16).astype(np.float32)
+            df = len(rows)
+            idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = K1 * (1 - B + B * lengths[rows] / avg_length)
+            scores[rows] += idf * tfs * (K1 + 1) / (tfs + norm)
+
+        if self._deleted:
+            scores[list(self._deleted)] = 0.0
+
+        top = np.argsort(-scores)[:k]
+        return [(self.doc_ids[row], float(scores[row])) for row in top if scores[row] > 0]
+
+    def coverage(self, query, doc_id):
+        """Porsi term unik query yang muncul di dokumen `doc_id` (0..1)"""
+        terms = set(tokenize(query))
+        row = self._row_of.get(doc_id)
+        if not terms or row is None:
+            return 0.0
+        found = sum(1 for term in terms if term in self.postings
+                    and row in np.frombuffer(self.postings[term][0], dtype=np.uint32))
+        return found / len(terms)
+
+    def save(self):
+        if not self.path:
+            return
+        if self._deleted:
+            self.compact()
+
+        terms = list(self.postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(self.postings[term][0]) for term in terms])
+        rows = np.concatenate([np.frombuffer(self.postings[t][0], dtype=np.uint32) for t in terms]) if terms else np.empty(0, np.uint32)
+        tfs = np.concatenate([np.frombuffer(self.postings[t][1], dtype=np.uint16) for t in terms]) if terms else np.empty(0, np.uint16)
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        old_path = self._postings_path(self._generation)
+        self._generation += 1
+        tmp_path = self._postings_path(self._generation) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, rows=rows, tfs=tfs, offsets=offsets,
+                     doc_lengths=np.frombuffer(self.doc_lengths, dtype=np.uint32))
+        os.replace(tmp_path, self._postings_path(self._generation))
+
+        tmp_path = self.path + '.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'generation': self._generation, 'doc_ids': self.doc_ids, 'terms': terms}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path + '.json')
+
+        if os.path.exists(old_path):
+            os.remove(old_path)
+
+    def _postings_path(self, generation):
+        # generasi 0 = format lama tanpa nomor generasi
+        return f'{self.path}.{generation}.npz' if generation else self.path + '.npz'
+
+    def _load(self):
+        with open(self.path + '.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self._generation = meta.get('generation', 0)
+        data = np.load(self._postings_path(self._generation))
+
+        self.doc_ids = meta['doc_ids']
+        self.doc_lengths = array('I', data['doc_lengths'].tobytes())
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.doc_ids)}
+
+        rows, tfs, offsets = data['rows'], data['tfs'], data['offsets']
+        for i, term in enumerate(meta['terms']):
+            start, end = offsets[i], offsets[i + 1]
+            self.postings[term] = (array('I', rows[start:end].tobytes()), array('H', tfs[start:end].tobytes()))
+
+
+def is_decisive(hits, coverage, ratio=DECISIVE_RATIO, min_coverage=DECISIVE_COVERAGE):
+    """
+    True kalau hasil lexical #1 jauh lebih unggul dari #2 (mis. query nomor SKU/versi yang persis)
+    dan memuat cukup banyak term query (`coverage` dari BM25Index.coverage untuk hit #1).
+    Satu-satunya hit yang hanya kebetulan sama satu kata tidak dianggap meyakinkan.
+    """
+    if not hits or coverage < min_coverage:
+        return False
+    if len(hits) == 1:
+        return True
+    return hits[0][1] >= ratio * hits[1][1]
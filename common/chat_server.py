@@ -0,0 +1,244 @@
+import json
+import time
+import uuid
+import itertools
+from collections import OrderedDict
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from aiohttp import web
+
+from common.llm_clients import make_async_client, connection_stats, TIMEOUTS
+from common.memory import ConversationMemory
+from common.streaming import StreamMetrics, stream_deltas, record_metrics, stream_stats
+
+
+MAX_SESSIONS = 10_000
+# sesi yang tidak dipakai selama ini dibuang
+SESSION_TTL_SECONDS = 60 * 60
+# request bersamaan per sesi; lebih dari ini langsung 429, tidak diantrekan
+SESSION_CONCURRENCY = 1
+# pool upstream bersama untuk semua sesi, dipecah jadi beberapa client kecil: pool httpcore 1.0
+# memindai semua koneksinya (O(n^2)) setiap request mulai/selesai dan menghitung semua koneksi
+# (bukan hanya yang idle) terhadap batas keep-alive. Satu pool 300 stream ~3x lebih lambat.
+UPSTREAM_SHARDS = 16
+UPSTREAM_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64, keepalive_expiry=90.0)
+SUMMARY_WORKERS = 4
+
+
+def sse(data, event=None):
+    """Satu event Server-Sent-Events"""
+    prefix = f'event: {event}\n' if event else ''
+    return f'{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n'.encode('utf-8')
+
+
+class ChatSession:
+    def __init__(self, session_id, memory):
+        self.id = session_id
+        self.memory = memory
+        self.active = 0
+        self.requests = 0
+        self.last_used = time.monotonic()
+
+
+class ChatServer:
+    """
+    Server chat multi-sesi di atas asyncio (aiohttp), jawaban di-stream lewat SSE.
+
+    Tiap sesi punya ConversationMemory sendiri; semua sesi berbagi client upstream
+    (UPSTREAM_SHARDS pool keep-alive, dipakai bergiliran) dan satu pool thread untuk
+    ringkasan. Endpoint:
+
+        POST /sessions                          -> {"session_id": ...}
+        POST /sessions/{id}/messages            body {"content": ..., "stream": true}
+             stream: event data {"delta": ...}, lalu event `done` {"metrics": ...}
+        DELETE /sessions/{id}
+        GET  /stats
+    """
+
+    def __init__(self, model, system_prompt, provider='openai', base_url=None, client=None,
+                 summarize_fn=None, max_sessions=MAX_SESSIONS, session_ttl=SESSION_TTL_SECONDS,
+                 session_concurrency=SESSION_CONCURRENCY, **params):
+        self.model = model
+        self.system_prompt = system_prompt
+        self.provider = provider
+        self.base_url = base_url
+        self.clients = [client] if client is not None else []
+        self._next_client = None
+        self.summarize_fn = summarize_fn
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.session_concurrency = session_concurrency
+        self.params = params
+        self.sessions = OrderedDict()
+        self._summary_pool = ThreadPoolExecutor(max_workers=SUMMARY_WORKERS, thread_name_prefix='server-summary')
+
+        self.active_streams = 0
+        self.rejected = 0
+        self.errors = 0
+
+    async def _startup(self, app):
+        if not self.clients:
+            self.clients = [
+                make_async_client(self.provider, self.base_url, UPSTREAM_LIMITS, TIMEOUTS['stream'])
+                for _ in range(UPSTREAM_SHARDS)
+            ]
+        self._next_client = itertools.cycle(self.clients)
+
+    async def _cleanup(self, app):
+        for client in self.clients:
+            await client.close()
+        self._summary_pool.shutdown(wait=False)
+
+    def _evict(self):
+        """Buang sesi kedaluwarsa dan sesi tertua di atas max_sessions; sesi yang sedang stream dilewati"""
+        now = time.monotonic()
+        over = len(self.sessions) - self.max_sessions
+        evicted = []
+        for session in self.sessions.values():
+            if session.active:
+                # stream panjang di depan antrean LRU tidak boleh menahan eviction sesi lain
+                continue
+            if len(evicted) >= over and now - session.last_used <= self.session_ttl:
+                break
+            evicted.append(session.id)
+        for session_id in evicted:
+            del self.sessions[session_id]
+
+    def create_session(self):
+        session_id = uuid.uuid4().hex
+        memory = ConversationMemory(self.system_prompt, self.summarize_fn, executor=self._summary_pool)
+        self.sessions[session_id] = ChatSession(session_id, memory)
+        self._evict()
+        return self.sessions[session_id]
+
+    def _get_session(self, request):
+        session = self.sessions.get(request.match_info['session_id'])
+        if session is not None:
+            self.sessions.move_to_end(session.id)
+        return session
+
+    async def handle_create(self, request):
+        return web.json_response({'session_id': self.create_session().id}, status=201)
+
+    async def handle_delete(self, request):
+        session = self.sessions.pop(request.match_info['session_id'], None)
+        return web.json_response({'deleted': session is not None}, status=200 if session else 404)
+
+    async def handle_message(self, request):
+        session = self._get_session(request)
+        if session is None:
+            return web.json_response({'error': 'Sesi tidak ditemukan'}, status=404)
+
+        try:
+            body = await request.json()
+        except ValueError:
+            return web.json_response({'error': 'Body harus JSON'}, status=400)
+        content = (body.get('content') or '').strip()
+        if not content:
+            return web.json_response({'error': 'content kosong'}, status=400)
+
+        if session.active >= self.session_concurrency:
+            self.rejected += 1
+            return web.json_response({'error': 'Masih ada jawaban yang berjalan di sesi ini'},
+                                     status=429, headers={'Retry-After': '1'})
+
+        session.active += 1
+        session.requests += 1
+        self.active_streams += 1
+        try:
+            # pesan user baru masuk memori setelah jawabannya lengkap (kalau gagal, tidak tersimpan)
+            user_message = {'role': 'user', 'content': content}
+            messages = session.memory.messages([user_message])
+            if body.get('stream', True):
+                return await self._stream_reply(request, session, messages)
+            return await self._full_reply(session, messages)
+        finally:
+            session.active -= 1
+            session.last_used = time.monotonic()
+            self.active_streams -= 1
+
+    def _remember(self, session, messages, text):
+        session.memory.add('user', messages[-1]['content'])
+        session.memory.add('assistant', text)
+
+    async def _full_reply(self, session, messages):
+        metrics = StreamMetrics()
+        try:
+            async with aclosing(stream_deltas(next(self._next_client), messages, self.model, metrics, **self.params)) as deltas:
+                parts = [delta async for delta in deltas]
+        except Exception as error:
+            self.errors += 1
+            return web.json_response({'error': str(error)}, status=502)
+
+        result = metrics.finish()
+        record_metrics(result)
+        text = ''.join(parts)
+        self._remember(session, messages, text)
+        return web.json_response({'content': text, 'metrics': result})
+
+    async def _stream_reply(self, request, session, messages):
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+        await response.prepare(request)
+
+        metrics = StreamMetrics()
+        parts = []
+        try:
+            async with aclosing(stream_deltas(next(self._next_client), messages, self.model, metrics, **self.params)) as deltas:
+                async for delta in deltas:
+                    parts.append(delta)
+                    await response.write(sse({'delta': delta}))
+        except ConnectionResetError:
+            # client menutup koneksi; stream upstream sudah ditutup lewat aclosing
+            return response
+        except Exception as error:
+            self.errors += 1
+            await response.write(sse({'error': str(error)}, event='error'))
+            return response
+
+        result = metrics.finish()
+        record_metrics(result)
+        self._remember(session, messages, ''.join(parts))
+        await response.write(sse({'metrics': result}, event='done'))
+        await response.write_eof()
+        return response
+
+    async def handle_stats(self, request):
+        return web.json_response({
+            'sessions': len(self.sessions),
+            'active_streams': self.active_streams,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'stream': stream_stats(),
+            'upstream': connection_stats().get(self.provider),
+        })
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/sessions', self.handle_create)
+        app.router.add_post('/sessions/{session_id}/messages', self.handle_message)
+        app.router.add_delete('/sessions/{session_id}', self.handle_delete)
+        app.router.add_get('/stats', self.handle_stats)
+        app.on_startup.append(self._startup)
+        app.on_cleanup.append(self._cleanup)
+        return app
+
+
+async def start_server(server, host='127.0.0.1', port=0):
+    """Jalankan ChatServer di event loop yang sedang aktif; return (runner, base url)"""
+    runner = web.AppRunner(server.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f'http://{host}:{port}'
+
+
+def run_server(server, host='127.0.0.1', port=8080):
+    print(f'[Server] http://{host}:{port}  (POST /sessions, POST /sessions/<id>/messages, GET /stats)')
+    web.run_app(server.app(), host=host, port=port, access_log=None, print=None)
@@ -0,0 +1,151 @@
+import re
+
+from common.tokens import count_tokens
+
+
+MAX_TOKENS = 300
+OVERLAP_TOKENS = 30
+
+# banner handbook: baris '=====' di atas dan di bawah judul section
+_BANNER_RE = re.compile(r'^\s*[=\-]{5,}\s*$')
+_MARKDOWN_HEADER_RE = re.compile(r'^\s*#{1,6}\s+(.+)$')
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+# judul di antara dua banner biasanya 1-2 baris, lebih dari ini dianggap teks biasa
+_MAX_TITLE_LINES = 3
+
+
+def iter_blocks(lines):
+    """
+    Ubah stream baris (file / halaman) jadi stream blok:
+    ('header', judul) untuk judul section dan ('paragraph', teks) untuk paragraf.
+    """
+    paragraph = []
+    title = None  # list baris kalau sedang di dalam banner
+
+    for line in lines:
+        for raw in line.splitlines() or ['']:
+            stripped = raw.strip()
+
+            if _BANNER_RE.match(stripped):
+                if title is None:
+                    if paragraph:
+                        yield 'paragraph', '\n'.join(paragraph)
+                        paragraph = []
+                    title = []
+                else:
+                    if title:
+                        yield 'header', ' '.join(title)
+                    title = None
+                continue
+
+            if title is not None:
+                if stripped:
+                    title.append(stripped)
+                if len(title) > _MAX_TITLE_LINES:
+                    # ternyata banner dipakai sebagai garis pemisah, bukan judul
+                    paragraph.extend(title)
+                    title = None
+                continue
+
+            header = _MARKDOWN_HEADER_RE.match(stripped)
+            if header:
+                if paragraph:
+                    yield 'paragraph', '\n'.join(paragraph)
+                    paragraph = []
+                yield 'header', header.group(1)
+            elif stripped:
+                paragraph.append(stripped)
+            elif paragraph:
+                yield 'paragraph', '\n'.join(paragraph)
+                paragraph = []
+
+    if title:
+        paragraph.extend(title)
+    if paragraph:
+        yield 'paragraph', '\n'.join(paragraph)
+
+
+def _split_oversized(text, max_tokens, model):
+    """Pecah paragraf kepanjangan per kalimat, kalimat kepanjangan per kata"""
+    for sentence in _SENTENCE_RE.split(text):
+        tokens = count_tokens(sentence, model)
+        if tokens <= max_tokens:
+            yield sentence, tokens
+            continue
+
+        words = sentence.split()
+        window = []
+        for word in words:
+            window.append(word)
+            if count_tokens(' '.join(window), model) > max_tokens and len(window) > 1:
+                window.pop()
+                piece = ' '.join(window)
+                yield piece, count_tokens(piece, model)
+                window = [word]
+        if window:
+            piece = ' '.join(window)
+            yield piece, count_tokens(piece, model)
+
+
+def _render(header, pieces):
+    body = ''
+    for text, _, separator in pieces:
+        body += (separator if body else '') + text
+    return f'{header}\n{body}' if header else body
+
+
+def iter_chunks(lines, max_tokens=MAX_TOKENS, overlap_tokens=OVERLAP_TOKENS, model='text-embedding-3-small'):
+    """
+    Chunker streaming berbasis token.
+
+    - tidak pernah menyeberang batas section; judul section ditaruh di awal tiap chunk
+    - paragraf & kalimat tidak dipotong kecuali memang lebih besar dari max_tokens
+    - overlap minimal: hanya kalimat/paragraf terakhir, dan hanya kalau <= overlap_tokens
+    """
+    header = None
+    header_tokens = 0
+    pieces = []  # (teks, jumlah token, separator sebelum teks)
+    size = 0
+
+    for kind, text in iter_blocks(lines):
+        if kind == 'header':
+            if pieces:
+                yield _render(header, pieces)
+            header = text
+            header_tokens = count_tokens(text, model) + 1
+            pieces, size = [], 0
+            continue
+
+        budget = max(max_tokens - header_tokens, 1)
+        tokens = count_tokens(text, model)
+        if tokens <= budget:
+            new_pieces = [(text, tokens, '\n\n')]
+        else:
+            new_pieces = [
+                (piece, piece_tokens, '\n\n' if i == 0 else ' ')
+                for i, (piece, piece_tokens) in enumerate(_split_oversized(text, budget, model))
+            ]
+
+        for piece in new_pieces:
+            if pieces and size + piece[1] > budget:
+                yield _render(header, pieces)
+                last = pieces[-1]
+                overlap = [last] if last[1] <= overlap_tokens and last[1] + piece[1] <= budget else []
+                pieces, size = overlap, sum(p[1] for p in overlap)
+
+            pieces.append(piece)
+            size += piece[1]
+
+    if pieces:
+        yield _render(header, pieces)
+
+
+def chunk_text(text, max_tokens=MAX_TOKENS, overlap_tokens=OVERLAP_TOKENS):
+    """Versi list dari iter_chunks untuk teks yang sudah ada di memori"""
+    return list(iter_chunks(text.splitlines(), max_tokens, overlap_tokens))
+
+
+def chunk_file(path, max_tokens=MAX_TOKENS, overlap_tokens=OVERLAP_TOKENS):
+    """Chunk file teks baris per baris tanpa membaca seluruh isinya ke memori"""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_chunks(f, max_tokens, overlap_tokens)
@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import hashlib
+
+
+MAX_COLLECTIONS = 10
+MAX_TOTAL_CHUNKS = 200000
+
+
+def file_hash(path, block_size=1 << 20):
+    """sha256 isi file, dibaca per blok"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def folder_content_hash(file_hashes):
+    """Hash gabungan folder dari pasangan (nama file, hash file) yang diurutkan"""
+    digest = hashlib.sha256()
+    for name, value in sorted(file_hashes.items()):
+        digest.update(f'{name}\0{value}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class CollectionRegistry:
+    """
+    Catatan collection yang sudah pernah dibangun, disimpan di JSON.
+
+    Tiap collection menyimpan folder asal, hash per file, jumlah chunk dan kapan terakhir dipakai,
+    jadi folder yang sama (atau folder lain dengan isi identik) bisa dipakai ulang antar sesi.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.collections = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.collections = json.load(f)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.collections, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def resolve(self, folder, file_hashes, dimensions=None):
+        """
+        Tentukan collection untuk folder ini. Collection dengan dimensi embedding
+        berbeda tidak pernah dipakai ulang (vector-nya tidak bisa dibandingkan).
+
+        Returns:
+            (nama collection, file yang perlu di-ingest, file yang chunk-nya perlu dihapus)
+        """
+        folder = os.path.abspath(folder)
+        content_hash = folder_content_hash(file_hashes)
+        candidates = {
+            name: entry for name, entry in self.collections.items()
+            if entry.get('dimensions') == dimensions
+        }
+
+        # 1. isi identik (folder mana pun) -> langsung pakai
+        for name, entry in candidates.items():
+            if entry['content_hash'] == content_hash:
+                return name, [], []
+
+        # 2. folder yang sama tapi ada file berubah -> update inkremental
+        for name, entry in candidates.items():
+            if entry['folder'] == folder:
+                old = entry['files']
+                changed = [f for f, h in file_hashes.items() if old.get(f) != h]
+                removed = [f for f in old if f not in file_hashes]
+                return name, changed, [f for f in changed if f in old] + removed
+
+        # 3. belum pernah -> collection baru
+        suffix = f'_d{dimensions}' if dimensions else ''
+        return f'pdf_{content_hash[:16]}{suffix}', list(file_hashes), []
+
+    def record(self, name, folder, file_hashes, chunk_count, dimensions=None):
+        self.collections[name] = {
+            'folder': os.path.abspath(folder),
+            'files': file_hashes,
+            'content_hash': folder_content_hash(file_hashes),
+            'chunks': chunk_count,
+            'dimensions': dimensions,
+            'last_used': time.time(),
+        }
+        self.save()
+
+    def touch(self, name):
+        """Tandai collection baru dipakai (untuk LRU) tanpa mengubah folder asal & hash-nya"""
+        self.collections[name]['last_used'] = time.time()
+        self.save()
+
+    def evict(self, keep, max_collections=MAX_COLLECTIONS, max_chunks=MAX_TOTAL_CHUNKS):
+        """
+        Pilih collection yang harus dihapus (LRU) supaya jumlah collection dan total chunk
+        di bawah batas. Collection `keep` (yang sedang dipakai) tidak pernah dihapus.
+        """
+        by_age = sorted(
+            (name for name in self.collections if name != keep),
+            key=lambda name: self.collections[name]['last_used']
+        )
+        total_chunks = sum(entry['chunks'] for entry in self.collections.values())
+        count = len(self.collections)
+
+        evicted = []
+        for name in by_age:
+            if count <= max_collections and total_chunks <= max_chunks:
+                break
+            evicted.append(name)
+            count -= 1
+            total_chunks -= self.collections[name]['chunks']
+
+        for name in evicted:
+            del self.collections[name]
+        if evicted:
+            self.save()
+        return evicted
@@ -0,0 +1,138 @@
+import re
+
+from common.tokens import count_tokens
+
+
+CONTEXT_TOKENS = 1500
+# sisa budget di bawah ini tidak dipakai untuk potongan sebuah group
+MIN_PARTIAL_TOKENS = 50
+
+# pecah per kalimat / baris, separator ikut disimpan supaya format teks tidak berubah
+_SEGMENT_RE = re.compile(r'((?<=[.!?])[ \t]+|\n+)')
+
+
+def _segments(text):
+    """List (segmen, separator setelahnya)"""
+    parts = _SEGMENT_RE.split(text)
+    parts.append('')
+    return [(parts[i], parts[i + 1]) for i in range(0, len(parts) - 1, 2) if parts[i].strip()]
+
+
+def _normalize(segment):
+    return ' '.join(segment.lower().split())
+
+
+def _position(chunk):
+    """Posisi chunk di dalam source: (halaman, nomor chunk), None kalau tidak diketahui"""
+    if chunk.get('chunk_id') is None:
+        return None
+    return chunk.get('page') or 0, chunk['chunk_id']
+
+
+def _is_adjacent(previous, position):
+    return (previous is not None and position is not None
+            and previous[0] == position[0] and position[1] - previous[1] == 1)
+
+
+def _merge_source(chunks):
+    """
+    Gabungkan chunk dari satu source jadi group: chunk bersebelahan atau yang teksnya
+    overlap digabung, dan segmen yang sudah pernah muncul di source ini dibuang.
+    """
+    ordered = sorted(chunks, key=lambda item: (_position(item[1]) is None, _position(item[1]) or (0, 0), item[0]))
+    seen = set()
+    groups = []
+    current = None
+
+    for rank, chunk in ordered:
+        position = _position(chunk)
+        segments = _segments(chunk['text'])
+        fresh = [(text, sep) for text, sep in segments if _normalize(text) not in seen]
+        overlaps = current is not None and len(fresh) < len(segments)
+
+        if current is None or not (overlaps or _is_adjacent(current['last_position'], position)):
+            current = {'rank': rank, 'source': chunk['source'], 'ids': [], 'pages': [],
+                       'segments': [], 'last_position': None}
+            groups.append(current)
+
+        current['rank'] = min(current['rank'], rank)
+        current['ids'].append(chunk.get('id'))
+        if chunk.get('page') is not None and chunk['page'] not in current['pages']:
+            current['pages'].append(chunk['page'])
+        current['last_position'] = position or current['last_position']
+        if fresh and current['segments'] and not current['segments'][-1][1]:
+            # akhir chunk sebelumnya tidak punya separator, pisahkan sebagai paragraf
+            current['segments'][-1] = (current['segments'][-1][0], '\n\n')
+        for text, sep in fresh:
+            seen.add(_normalize(text))
+            current['segments'].append((text, sep))
+
+    return [group for group in groups if group['segments']]
+
+
+def _render(segments):
+    return ''.join(text + sep for text, sep in segments).strip()
+
+
+def _label(n, group):
+    label = f"[{n}] Source: {group['source']}"
+    if group['pages']:
+        pages = sorted(group['pages'])
+        label += f", page {pages[0]}" if len(pages) == 1 else f", pages {pages[0]}-{pages[-1]}"
+    return label
+
+
+def pack_context(chunks, max_tokens=CONTEXT_TOKENS, model='gpt-4o-mini'):
+    """
+    Susun context prompt dari hasil retrieval (urut relevansi).
+
+    - chunk bersebelahan / overlap dari source yang sama digabung jadi satu blok
+    - kalimat & baris (termasuk judul section) yang berulang hanya ditulis sekali
+    - blok diurutkan menurut chunk paling relevan di dalamnya, lalu dimasukkan
+      sampai `max_tokens`; blok yang tidak muat dipotong di batas kalimat atau dilewati
+
+    Returns:
+        dict: text, citations (n, source, pages, ids), tokens, input_tokens
+    """
+    by_source = {}
+    for rank, chunk in enumerate(chunks):
+        by_source.setdefault(chunk['source'], []).append((rank, chunk))
+
+    groups = sorted(
+        (group for source_chunks in by_source.values() for group in _merge_source(source_chunks)),
+        key=lambda group: group['rank']
+    )
+
+    blocks = []
+    citations = []
+    used = 0
+    for group in groups:
+        n = len(citations) + 1
+        label = _label(n, group)
+        # 2 token kira-kira untuk pemisah antar blok
+        remaining = max_tokens - used - count_tokens(label, model) - 2
+        segments = list(group['segments'])
+        body = _render(segments)
+        tokens = count_tokens(body, model)
+
+        if tokens > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                continue
+            while segments and tokens > remaining:
+                segments.pop()
+                body = _render(segments)
+                tokens = count_tokens(body, model)
+            if not segments:
+                continue
+
+        blocks.append(f'{label}\n{body}')
+        citations.append({'n': n, 'source': group['source'], 'pages': sorted(group['pages']), 'ids': group['ids']})
+        used += count_tokens(blocks[-1], model) + 2
+
+    text = '\n\n'.join(blocks)
+    return {
+        'text': text,
+        'citations': citations,
+        'tokens': count_tokens(text, model) if text else 0,
+        'input_tokens': sum(count_tokens(chunk['text'], model) for chunk in chunks),
+    }
@@ -0,0 +1,289 @@
+import re
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from common.llm_clients import get_client
+
+
+EMBEDDING_MODEL = 'text-embedding-3-small'
+CACHE_PATH = './embedding_cache.sqlite3'
+MEMORY_CACHE_SIZE = 10000
+
+_HASH_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def supports_shortening(model):
+    """Model text-embedding-3-* bisa dipendekkan: potong dimensi lalu normalisasi ulang"""
+    return model.startswith('text-embedding-3')
+
+
+def reduce_dimensions(vectors, dimensions):
+    """
+    Ambil `dimensions` nilai pertama tiap vector lalu normalisasi L2 ulang.
+    Hasilnya sama dengan meminta `dimensions` langsung ke API text-embedding-3-*.
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    if dimensions > vectors.shape[1]:
+        raise ValueError(f'Tidak bisa menaikkan dimensi {vectors.shape[1]} -> {dimensions}, perlu embed ulang')
+
+    reduced = vectors[:, :dimensions]
+    norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return reduced / norms
+
+
+def cache_key(text, model=EMBEDDING_MODEL, dimensions=None):
+    """Key cache = (model, dimensions, sha256(text))"""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f'{model}:{dimensions or "full"}:{digest}'
+
+
+class EmbeddingCache:
+    """
+    Cache embedding dua tingkat: LRU di memori di depan SQLite di disk.
+    Vector disimpan sebagai float32 mentah supaya hemat tempat.
+    """
+
+    def __init__(self, path=CACHE_PATH, memory_size=MEMORY_CACHE_SIZE):
+        self.path = path
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)'
+        )
+        self._db.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """Ambil banyak vector sekaligus, return dict key -> vector (hanya yang ketemu)"""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    missing.append(key)
+
+            # SQLite membatasi jumlah parameter per query, jadi dicicil
+            for i in range(0, len(missing), 500):
+                part = missing[i:i + 500]
+                placeholders = ','.join('?' * len(part))
+                rows = self._db.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})', part
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    found[key] = vector
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+
+            self.misses += len(missing) - sum(1 for key in missing if key in found)
+
+        return found
+
+    def put_many(self, items):
+        """Simpan pasangan (key, vector) ke memori dan disk"""
+        rows = []
+        with self._lock:
+            for key, vector in items:
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes()))
+
+            self._db.executemany('INSERT OR REPLACE INTO embeddings VALUES (?, ?)', rows)
+            self._db.commit()
+
+    def stats(self):
+        """Statistik cache untuk sizing: hit rate, jumlah entry, bytes tersimpan"""
+        with self._lock:
+            entries, stored = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings'
+            ).fetchone()
+
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes_stored': stored,
+            'memory_entries': len(self._memory),
+        }
+
+
+class Embedder:
+    """Satu-satunya pintu untuk bikin embedding, semua hasil lewat cache"""
+
+    def __init__(self, client=None, model=EMBEDDING_MODEL, dimensions=None, cache=None):
+        self.client = client or get_client('openai', 'embedding')
+        self.model = model
+        self.dimensions = dimensions
+        self.cache = cache if cache is not None else EmbeddingCache()
+
+    def _create(self, texts):
+        params = {'model': self.model, 'input': texts}
+        if self.dimensions:
+            params['dimensions'] = self.dimensions
+
+        response = self.client.embeddings.create(**params)
+        return [item.embedding for item in response.data]
+
+    def embed(self, texts):
+        """Embed list teks; hanya teks yang belum pernah di-embed yang dikirim ke API"""
+        keys = [cache_key(text, self.model, self.dimensions) for text in texts]
+        found = self.cache.get_many(set(keys))
+
+        # teks duplikat dalam satu panggilan cukup dikirim sekali
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing and self.dimensions and supports_shortening(self.model):
+            # vector penuh yang sudah ada di cache cukup dipendekkan, tidak perlu API call
+            full_keys = {key: cache_key(text, self.model) for key, text in missing.items()}
+            full = self.cache.get_many(set(full_keys.values()))
+            derived = [
+                (key, reduce_dimensions(full[full_key], self.dimensions)[0])
+                for key, full_key in full_keys.items() if full_key in full
+            ]
+            if derived:
+                self.cache.put_many(derived)
+                found.update(derived)
+                for key, _ in derived:
+                    del missing[key]
+
+        if missing:
+            vectors = self._create(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self.cache.put_many(new_items)
+            found.update((key, np.asarray(vector, dtype=np.float32)) for key, vector in new_items)
+
+        return [found[key].tolist() for key in keys]
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+    def __call__(self, texts):
+        return self.embed(texts)
+
+
+class HashingEmbedder:
+    """
+    Embedding lokal deterministik (hashing vectorizer) untuk benchmark & test offline.
+
+    Kata dan pasangan kata di-hash ke `dimensions` bucket dengan tanda +/-,
+    bobot log(1 + tf), lalu dinormalisasi L2. Tidak menangkap sinonim seperti model
+    sungguhan, tapi stabil antar proses dan tidak butuh API call.
+    """
+
+    def __init__(self, dimensions=512):
+        self.dimensions = dimensions
+        self.model = f'hashing-{dimensions}'
+        self.cache = None
+
+    def _features(self, text):
+        words = _HASH_TOKEN_RE.findall(text.lower())
+        return words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                value = int.from_bytes(digest, 'little')
+                vectors[row, value % self.dimensions] += 1.0 if value >> 63 else -1.0
+
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).tolist()
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+    def __call__(self, texts):
+        return self.embed(texts)
+
+
+_default_embedders = {}
+_default_cache = None
+
+
+def default_cache():
+    """EmbeddingCache bersama (lazy) untuk semua provider; key memuat nama model jadi tidak bentrok"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = EmbeddingCache()
+    return _default_cache
+
+
+def get_embedder(dimensions=None):
+    """Embedder bersama (lazy) per jumlah dimensi, semuanya memakai satu cache default"""
+    if dimensions not in _default_embedders:
+        _default_embedders[dimensions] = Embedder(dimensions=dimensions, cache=default_cache())
+    return _default_embedders[dimensions]
+
+
+def get_embeddings(text, dimensions=None):
+    """Embedding satu teks lewat embedder bersama"""
+    return get_embedder(dimensions).embed_one(text)
+
+
+def _local_provider(dimensions):
+    # import di sini: onnxruntime/tokenizers hanya dibutuhkan kalau provider lokal dipakai
+    from common.local_embeddings import LocalEmbedder, LOCAL_DIMENSIONS
+
+    if dimensions and dimensions != LOCAL_DIMENSIONS:
+        raise ValueError(f'Provider local selalu {LOCAL_DIMENSIONS} dimensi, bukan {dimensions}')
+    # lewat cache juga, jadi query yang sama (cek answer cache, dense search, rerank) cukup dihitung sekali
+    return LocalEmbedder(cache=default_cache())
+
+
+# provider embedding: nama -> factory(dimensions). Semua hasilnya punya atribut model,
+# dimensions, cache (boleh None) dan method embed(texts) / embed_one(text) / __call__(texts)
+PROVIDERS = {
+    'openai': get_embedder,
+    'local': _local_provider,
+    'hashing': lambda dimensions: HashingEmbedder(dimensions or 512),
+}
+_providers = {}
+
+
+def get_provider(name='openai', dimensions=None):
+    """Embedder bersama untuk provider `name` ('openai', 'local', 'hashing')"""
+    if name not in PROVIDERS:
+        raise ValueError(f'Provider embedding tidak dikenal: {name}')
+    if (name, dimensions) not in _providers:
+        _providers[(name, dimensions)] = PROVIDERS[name](dimensions)
+    return _providers[(name, dimensions)]
+
+
+def print_cache_stats(cache):
+    if cache is None:
+        return
+    stats = cache.stats()
+    print(
+        f"[Embedding Cache] hit rate {stats['hit_rate']:.1%} "
+        f"(memory {stats['memory_hits']}, disk {stats['disk_hits']}, miss {stats['misses']}), "
+        f"{stats['entries']} entries, {stats['bytes_stored'] / 1024:.1f} KB"
+    )
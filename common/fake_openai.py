@@ -0,0 +1,101 @@
+import json
+import time
+import asyncio
+
+from aiohttp import web
+
+
+# jeda buatan supaya mirip API sungguhan: waktu sampai token pertama lalu per token
+FIRST_TOKEN_SECONDS = 0.2
+TOKEN_SECONDS = 0.01
+REPLY_TOKENS = 40
+
+
+class FakeOpenAI:
+    """
+    Endpoint /v1/chat/completions palsu (OpenAI-compatible) untuk test & load test tanpa API key.
+
+    Jawaban berisi `reply_tokens` kata, streaming SSE dengan format chunk yang sama
+    seperti OpenAI (termasuk chunk usage kalau diminta lewat stream_options).
+    Request terakhir disimpan di `requests` untuk diperiksa test.
+    """
+
+    def __init__(self, first_token_seconds=FIRST_TOKEN_SECONDS, token_seconds=TOKEN_SECONDS,
+                 reply_tokens=REPLY_TOKENS):
+        self.first_token_seconds = first_token_seconds
+        self.token_seconds = token_seconds
+        self.reply_tokens = reply_tokens
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._runner = None
+        self.url = None
+
+    def _words(self, body):
+        last = body['messages'][-1]['content'] if body['messages'] else ''
+        words = [f'kata{i} ' for i in range(self.reply_tokens)]
+        words[0] = f'[{len(last)}] '
+        return words
+
+    def _chunk(self, body, delta=None, finish_reason=None, usage=None):
+        return {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': body['model'],
+            'choices': [] if usage else [{'index': 0, 'delta': delta or {}, 'finish_reason': finish_reason}],
+            'usage': usage,
+        }
+
+    async def handle_chat(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.first_token_seconds)
+            words = self._words(body)
+            usage = {'prompt_tokens': sum(len(m['content'].split()) for m in body['messages']),
+                     'completion_tokens': len(words), 'total_tokens': 0}
+
+            if not body.get('stream'):
+                await asyncio.sleep(self.token_seconds * len(words))
+                return web.json_response({
+                    'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': int(time.time()),
+                    'model': body['model'], 'usage': usage,
+                    'choices': [{'index': 0, 'finish_reason': 'stop',
+                                 'message': {'role': 'assistant', 'content': ''.join(words)}}],
+                })
+
+            response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+            await response.prepare(request)
+            for i, word in enumerate(words):
+                if i:
+                    await asyncio.sleep(self.token_seconds)
+                await response.write(f'data: {json.dumps(self._chunk(body, {"content": word}))}\n\n'.encode())
+            await response.write(f'data: {json.dumps(self._chunk(body, finish_reason="stop"))}\n\n'.encode())
+            if (body.get('stream_options') or {}).get('include_usage'):
+                await response.write(f'data: {json.dumps(self._chunk(body, usage=usage))}\n\n'.encode())
+            await response.write(b'data: [DONE]\n\n')
+            return response
+        finally:
+            self.active -= 1
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', self.handle_chat)
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Jalankan di event loop yang sedang aktif; return base_url (…/v1)"""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f'http://{host}:{port}/v1'
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
@@ -0,0 +1,102 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from common.tokens import count_tokens
+
+
+# Batas dari provider embeddings (OpenAI): maks 2048 input & ~300k token per request.
+# Default di bawah sengaja jauh lebih kecil supaya banyak batch bisa jalan paralel.
+MAX_BATCH_TOKENS = 20000
+MAX_BATCH_ITEMS = 256
+MAX_WORKERS = 4
+
+
+def make_record(chunk_id, text, metadata, model='text-embedding-3-small'):
+    """Bungkus satu chunk jadi record siap di-ingest"""
+    return {
+        'id': chunk_id,
+        'text': text,
+        'metadata': metadata,
+        'tokens': count_tokens(text, model),
+    }
+
+
+def pack_batches(records, max_tokens=MAX_BATCH_TOKENS, max_items=MAX_BATCH_ITEMS):
+    """Kelompokkan record ke batch berdasarkan jumlah token (generator)"""
+    batch = []
+    batch_tokens = 0
+
+    for record in records:
+        tokens = record['tokens']
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch = []
+            batch_tokens = 0
+
+        batch.append(record)
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+def _upsert_batch(collection, batch, embeddings, stats):
+    collection.upsert(
+        ids=[r['id'] for r in batch],
+        documents=[r['text'] for r in batch],
+        metadatas=[r['metadata'] for r in batch],
+        embeddings=embeddings
+    )
+
+    stats['batches'] += 1
+    stats['chunks'] += len(batch)
+    stats['tokens'] += sum(r['tokens'] for r in batch)
+
+
+def ingest_records(collection, records, embed_fn, max_tokens=MAX_BATCH_TOKENS,
+                   max_items=MAX_BATCH_ITEMS, max_workers=MAX_WORKERS):
+    """
+    Embed & upsert record ke collection secara paralel.
+
+    Record dipecah jadi batch berdasarkan token, tiap batch di-embed di thread pool
+    (maks `max_workers` request bersamaan) dan langsung di-upsert begitu selesai.
+    Jumlah batch yang menunggu dibatasi supaya memori tidak membengkak.
+
+    Returns:
+        dict statistik: chunks, tokens, batches, seconds, chunks_per_sec, tokens_per_sec
+    """
+    stats = {'chunks': 0, 'tokens': 0, 'batches': 0}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+
+        for batch in pack_batches(records, max_tokens, max_items):
+            if len(pending) >= max_workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _upsert_batch(collection, pending.pop(future), future.result(), stats)
+
+            future = pool.submit(embed_fn, [r['text'] for r in batch])
+            pending[future] = batch
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _upsert_batch(collection, pending.pop(future), future.result(), stats)
+
+    elapsed = time.perf_counter() - start
+    stats['seconds'] = elapsed
+    stats['chunks_per_sec'] = stats['chunks'] / elapsed if elapsed else 0.0
+    stats['tokens_per_sec'] = stats['tokens'] / elapsed if elapsed else 0.0
+
+    return stats
+
+
+def print_ingest_stats(stats):
+    """Tampilkan ringkasan throughput ingestion"""
+    print(
+        f"[Ingest] {stats['chunks']} chunks / {stats['tokens']} tokens "
+        f"dalam {stats['batches']} batch, {stats['seconds']:.2f}s "
+        f"({stats['chunks_per_sec']:.1f} chunks/s, {stats['tokens_per_sec']:.0f} tokens/s)"
+    )
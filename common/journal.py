@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import threading
+
+
+# fsync setiap N record atau setiap N detik, mana yang lebih dulu (0 = serahkan ke OS)
+FSYNC_EVERY = 20
+FSYNC_SECONDS = 1.0
+# file di atas ukuran ini dipadatkan: ringkasan terakhir + pesan yang belum diringkas
+MAX_BYTES = 1024 * 1024
+# batas pesan yang dibaca balik saat resume / disimpan saat compaction
+MAX_MESSAGES = 200
+BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reversed(path, block_size=BLOCK_SIZE):
+    """Baris file dari belakang ke depan, dibaca per blok (file besar tidak dibaca semua)"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        rest = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + rest).split(b'\n')
+            rest = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if rest:
+            yield rest
+
+
+def truncate_torn_tail(path, block_size=BLOCK_SIZE):
+    """
+    Potong baris terakhir yang tidak diakhiri newline (crash saat menulis), supaya
+    record berikutnya tidak tersambung ke potongan itu. Return jumlah byte yang dibuang.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b'\n')
+            if newline >= 0:
+                keep = position + newline + 1
+                break
+        else:
+            keep = 0
+
+        if keep < end:
+            f.truncate(keep)
+        return end - keep
+
+
+def read_tail(path, max_messages=MAX_MESSAGES):
+    """
+    Bangun ulang sesi dari ujung journal: baca mundur sampai pesan yang sudah tercakup
+    ringkasan terakhir (atau `max_messages` pesan), sisa file tidak dibaca.
+
+    Returns:
+        dict summary, folded (jumlah pesan yang tercakup ringkasan), messages
+        (pesan sesudahnya, urut waktu), first_n (nomor pesan pertama di messages; bisa
+        > folded kalau dipotong `max_messages`), next_n (nomor pesan berikutnya)
+    """
+    state = {'summary': None, 'folded': 0, 'messages': [], 'first_n': 0, 'next_n': 0}
+    if not os.path.exists(path):
+        return state
+
+    messages = []
+    for line in iter_lines_reversed(path):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # baris terakhir terpotong karena crash saat menulis
+            continue
+
+        if record['type'] == 'summary':
+            if state['summary'] is None:
+                state['summary'] = record['content']
+                state['folded'] = record['folded']
+            continue
+
+        state['next_n'] = max(state['next_n'], record['n'] + 1)
+        # ringkasan ditulis setelah pesan yang belum diringkas, jadi baca terus sampai pesan yang sudah tercakup
+        if state['summary'] is not None and record['n'] < state['folded']:
+            break
+        messages.append(record)
+        if len(messages) >= max_messages:
+            break
+
+    state['messages'] = [{'role': record['role'], 'content': record['content']} for record in reversed(messages)]
+    state['first_n'] = state['next_n'] - len(messages)
+    return state
+
+
+class ChatJournal:
+    """
+    Riwayat chat append-only: setiap pesan satu baris JSONL, langsung ditulis saat terjadi.
+
+    Simpan = O(1) per pesan (bukan menulis ulang seluruh history), fsync dikelompokkan
+    per `fsync_every` record / `fsync_seconds` detik. Kalau file melewati `max_bytes`,
+    isinya dipadatkan jadi ringkasan terakhir + pesan yang belum diringkas (tulis file
+    sementara lalu os.replace, jadi aman kalau crash di tengah).
+    """
+
+    def __init__(self, path, fsync_every=FSYNC_EVERY, fsync_seconds=FSYNC_SECONDS,
+                 max_bytes=MAX_BYTES, max_messages=MAX_MESSAGES):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_seconds = fsync_seconds
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        truncate_torn_tail(path)
+        self.next_n = read_tail(path, max_messages)['next_n']
+        self._file = open(path, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._compacted_size = 0
+
+        self.records = 0
+        self.syncs = 0
+        self.compactions = 0
+
+    def _append(self, record):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self.records += 1
+            self._unsynced += 1
+            if self.fsync_every and (self._unsynced >= self.fsync_every
+                                     or time.monotonic() - self._last_sync >= self.fsync_seconds):
+                self._sync()
+            # hasil compaction sendiri bisa besar (pesan panjang), jadi tunggu sampai dua kali lipatnya
+            if self.max_bytes and self._file.tell() > max(self.max_bytes, 2 * self._compacted_size):
+                self._compact()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.syncs += 1
+
+    def add_message(self, role, content):
+        record = {'type': 'message', 'n': self.next_n, 'role': role, 'content': content, 'ts': time.time()}
+        self.next_n += 1
+        self._append(record)
+
+    def add_summary(self, summary, folded):
+        """Catat ringkasan memori (mencakup pesan nomor 0 .. folded-1)"""
+        self._append({'type': 'summary', 'content': summary, 'folded': folded, 'ts': time.time()})
+
+    def sync(self):
+        with self._lock:
+            self._file.flush()
+            if self._unsynced:
+                self._sync()
+
+    def _compact(self):
+        self._file.flush()
+        state = read_tail(self.path, self.max_messages)
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if state['summary'] is not None:
+                f.write(json.dumps({'type': 'summary', 'content': state['summary'],
+                                    'folded': state['folded'], 'ts': time.time()}, ensure_ascii=False) + '\n')
+            for n, message in enumerate(state['messages'], state['first_n']):
+                f.write(json.dumps({'type': 'message', 'n': n, **message}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._compacted_size = self._file.tell()
+        self._unsynced = 0
+        self.compactions += 1
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def resume(self):
+        """State sesi dari ujung file, lihat read_tail"""
+        self.sync()
+        return read_tail(self.path, self.max_messages)
+
+    def close(self):
+        self.sync()
+        with self._lock:
+            self._file.close()
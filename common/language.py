@@ -0,0 +1,111 @@
+import re
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# kata fungsi yang sering muncul; dicocokkan per token utuh, bukan substring
+INDONESIAN_WORDS = {
+    'apa', 'apakah', 'berapa', 'bagaimana', 'mengapa', 'kenapa', 'kapan', 'dimana', 'siapa',
+    'saya', 'aku', 'kamu', 'anda', 'kalian', 'kami', 'kita', 'mereka', 'dia', 'yang', 'ini', 'itu',
+    'dan', 'atau', 'untuk', 'dari', 'ke', 'di', 'pada', 'adalah', 'bisa', 'dapat', 'tidak', 'bukan',
+    'dengan', 'juga', 'sudah', 'belum', 'akan', 'harus', 'ada', 'saja', 'lebih', 'sangat', 'jika',
+    'kalau', 'tentang', 'bagi', 'oleh', 'dalam', 'karena', 'tolong', 'mohon', 'gimana', 'nggak',
+    'gak', 'ya', 'dong', 'sih', 'nya', 'jelaskan', 'berikan', 'sebutkan', 'cara',
+}
+ENGLISH_WORDS = {
+    'what', 'how', 'why', 'when', 'where', 'who', 'which', 'is', 'are', 'was', 'were', 'the', 'a',
+    'an', 'and', 'or', 'for', 'from', 'to', 'in', 'on', 'of', 'with', 'can', 'could', 'should',
+    'do', 'does', 'did', 'not', 'this', 'that', 'these', 'those', 'i', 'you', 'we', 'they', 'my',
+    'your', 'our', 'it', 'be', 'have', 'has', 'there', 'about', 'please', 'explain', 'many', 'much',
+}
+# akhiran khas bahasa Indonesia; awalan (me-/ber-/ter-) terlalu sering cocok dengan kata Inggris
+_AFFIX_RE = re.compile(r'\w{3,}(?:kan|nya|lah|kah)$')
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def language_scores(text):
+    """Skor (indonesia, inggris) dari kata fungsi + imbuhan"""
+    tokens = _TOKEN_RE.findall(text.lower())
+    id_score = en_score = 0.0
+    for token in tokens:
+        if token in INDONESIAN_WORDS:
+            id_score += 1.0
+        elif token in ENGLISH_WORDS:
+            en_score += 1.0
+        elif _AFFIX_RE.match(token):
+            id_score += 0.5
+    return id_score, en_score
+
+
+def detect_language(text):
+    """'id', 'en', atau 'unknown' (tanpa model, cukup untuk query pendek)"""
+    id_score, en_score = language_scores(text)
+    if id_score == en_score:
+        return 'unknown'
+    return 'id' if id_score > en_score else 'en'
+
+
+def is_indonesian(text):
+    return detect_language(text) == 'id'
+
+
+class TranslationCache:
+    """Cache terjemahan: LRU di memori + SQLite di disk, key = sha256(query ternormalisasi)"""
+
+    def __init__(self, path='./translation_cache.sqlite3', memory_size=2000):
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, translation TEXT NOT NULL)')
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(text, target):
+        normalized = ' '.join(text.lower().split())
+        return hashlib.sha256(f'{target}\0{normalized}'.encode('utf-8')).hexdigest()
+
+    def get(self, text, target='en'):
+        key = self._key(text, target)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            row = self._db.execute('SELECT translation FROM translations WHERE key = ?', (key,)).fetchone()
+            if row:
+                self._remember(key, row[0])
+                self.hits += 1
+                return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, text, translation, target='en'):
+        key = self._key(text, target)
+        with self._lock:
+            self._remember(key, translation)
+            self._db.execute('INSERT OR REPLACE INTO translations VALUES (?, ?)', (key, translation))
+            self._db.commit()
+
+    def _remember(self, key, translation):
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def translate(self, text, translate_fn, target='en'):
+        """Terjemahkan lewat cache; translate_fn hanya dipanggil sekali per query berbeda"""
+        cached = self.get(text, target)
+        if cached is not None:
+            return cached
+
+        translation = translate_fn(text)
+        if translation and translation != text:
+            self.put(text, translation, target)
+        return translation
@@ -0,0 +1,200 @@
+import os
+import time
+import asyncio
+import weakref
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+
+PROVIDERS = {
+    'openai': {'base_url': None, 'api_key_env': 'OPENAI_API_KEY'},
+    'openrouter': {'base_url': 'https://openrouter.ai/api/v1', 'api_key_env': 'OPENROUTER_API_KEY'},
+}
+
+# timeout (detik) per jenis panggilan; connect dibuat pendek supaya cepat gagal
+TIMEOUTS = {
+    'default': httpx.Timeout(60.0, connect=5.0),
+    'chat': httpx.Timeout(60.0, connect=5.0),
+    'stream': httpx.Timeout(120.0, connect=5.0, read=30.0),
+    'rewrite': httpx.Timeout(15.0, connect=5.0),
+    'embedding': httpx.Timeout(30.0, connect=5.0),
+    'audio': httpx.Timeout(120.0, connect=5.0),
+    'image': httpx.Timeout(120.0, connect=5.0),
+}
+
+POOL_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=90.0)
+
+# retry bawaan SDK: exponential backoff + jitter untuk 408/409/429/5xx dan error koneksi
+MAX_RETRIES = 3
+
+
+_clients = {}
+# client async per event loop: httpx.AsyncClient tidak bisa dipakai lintas loop
+_async_clients = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_stats = {}
+
+
+def _record(provider, new_connection, latency):
+    with _lock:
+        stats = _stats.setdefault(provider, {
+            'requests': 0, 'new_connections': 0,
+            'latency_new': 0.0, 'latency_reused': 0.0,
+        })
+        stats['requests'] += 1
+        if new_connection:
+            stats['new_connections'] += 1
+            stats['latency_new'] += latency
+        else:
+            stats['latency_reused'] += latency
+
+
+def _make_http_client(provider, transport=None):
+    """
+    httpx client keep-alive dengan hook untuk mengukur reuse koneksi & latency.
+    `transport` hanya untuk test (mis. httpx.MockTransport); default pool httpx biasa.
+    """
+
+    def on_request(request):
+        info = {'start': time.perf_counter(), 'new_connection': False}
+
+        def trace(event_name, _):
+            # httpcore hanya membuka TCP kalau tidak ada koneksi idle di pool
+            if event_name == 'connection.connect_tcp.started':
+                info['new_connection'] = True
+
+        request.extensions['trace'] = trace
+        request.extensions['llm_client_info'] = info
+
+    def on_response(response):
+        info = response.request.extensions.get('llm_client_info')
+        if info:
+            # waktu sampai header diterima (untuk stream = time to first byte)
+            _record(provider, info['new_connection'], time.perf_counter() - info['start'])
+
+    return httpx.Client(
+        transport=transport,
+        limits=POOL_LIMITS,
+        timeout=TIMEOUTS['default'],
+        event_hooks={'request': [on_request], 'response': [on_response]},
+    )
+
+
+def _make_async_http_client(provider, limits=POOL_LIMITS):
+    """Versi async _make_http_client: hook & trace httpx async wajib berupa coroutine"""
+
+    async def on_request(request):
+        info = {'start': time.perf_counter(), 'new_connection': False}
+
+        async def trace(event_name, _):
+            if event_name == 'connection.connect_tcp.started':
+                info['new_connection'] = True
+
+        request.extensions['trace'] = trace
+        request.extensions['llm_client_info'] = info
+
+    async def on_response(response):
+        info = response.request.extensions.get('llm_client_info')
+        if info:
+            _record(provider, info['new_connection'], time.perf_counter() - info['start'])
+
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=TIMEOUTS['default'],
+        event_hooks={'request': [on_request], 'response': [on_response]},
+    )
+
+
+def get_client(provider='openai', call_type=None):
+    """
+    Client OpenAI-compatible yang berumur panjang (satu per provider, dipakai ulang).
+
+    `call_type` ('chat', 'stream', 'rewrite', 'embedding', ...) hanya mengganti timeout;
+    semua varian tetap berbagi connection pool yang sama.
+    """
+    key = (provider, call_type)
+    if key in _clients:
+        return _clients[key]
+
+    with _lock:
+        if (provider, None) not in _clients:
+            _clients[(provider, None)] = make_client(provider)
+
+        if key not in _clients:
+            _clients[key] = _clients[(provider, None)].with_options(timeout=TIMEOUTS[call_type])
+
+    return _clients[key]
+
+
+def make_client(provider='openai', base_url=None):
+    """OpenAI sinkron baru dengan pool sendiri, mis. untuk endpoint OpenAI-compatible lain (`base_url`)"""
+    config = PROVIDERS[provider]
+    return OpenAI(
+        base_url=base_url or config['base_url'],
+        api_key=os.getenv(config['api_key_env']) or ('unused' if base_url else None),
+        http_client=_make_http_client(provider),
+        max_retries=MAX_RETRIES,
+    )
+
+
+def make_async_client(provider='openai', base_url=None, limits=POOL_LIMITS, timeout=None):
+    """
+    AsyncOpenAI baru dengan pool sendiri, mis. untuk server dengan ratusan stream
+    bersamaan (`limits` lebih besar) atau endpoint OpenAI-compatible lain (`base_url`).
+    """
+    config = PROVIDERS[provider]
+    client = AsyncOpenAI(
+        base_url=base_url or config['base_url'],
+        api_key=os.getenv(config['api_key_env']) or ('unused' if base_url else None),
+        http_client=_make_async_http_client(provider, limits),
+        max_retries=MAX_RETRIES,
+    )
+    return client.with_options(timeout=timeout) if timeout is not None else client
+
+
+def get_async_client(provider='openai', call_type=None):
+    """
+    AsyncOpenAI untuk event loop yang sedang berjalan, sama seperti get_client:
+    satu client (satu connection pool) per provider, `call_type` hanya mengganti timeout.
+    """
+    loop = asyncio.get_running_loop()
+    key = (provider, call_type)
+
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        if (provider, None) not in clients:
+            clients[(provider, None)] = make_async_client(provider)
+
+        if key not in clients:
+            clients[key] = clients[(provider, None)].with_options(timeout=TIMEOUTS[call_type])
+
+    return clients[key]
+
+
+def connection_stats():
+    """Statistik per provider: jumlah request, rasio koneksi dipakai ulang, rata-rata latency"""
+    result = {}
+    with _lock:
+        for provider, stats in _stats.items():
+            reused = stats['requests'] - stats['new_connections']
+            result[provider] = {
+                'requests': stats['requests'],
+                'new_connections': stats['new_connections'],
+                'reuse_rate': reused / stats['requests'] if stats['requests'] else 0.0,
+                'avg_latency_new': stats['latency_new'] / stats['new_connections'] if stats['new_connections'] else None,
+                'avg_latency_reused': stats['latency_reused'] / reused if reused else None,
+            }
+    return result
+
+
+def print_connection_stats():
+    for provider, stats in connection_stats().items():
+        line = (f"[Client {provider}] {stats['requests']} request, "
+                f"reuse koneksi {stats['reuse_rate']:.0%}")
+        if stats['avg_latency_new'] is not None and stats['avg_latency_reused'] is not None:
+            saved = stats['avg_latency_new'] - stats['avg_latency_reused']
+            line += (f", latency baru {stats['avg_latency_new'] * 1000:.0f} ms vs "
+                     f"reuse {stats['avg_latency_reused'] * 1000:.0f} ms (hemat ~{saved * 1000:.0f} ms/request)")
+        print(line)
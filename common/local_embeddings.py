@@ -0,0 +1,141 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from common.embeddings import cache_key
+
+
+LOCAL_MODEL = 'all-MiniLM-L6-v2'
+LOCAL_DIMENSIONS = 384
+# lokasi yang sama dengan ONNXMiniLM_L6_V2 bawaan Chroma, jadi model cukup di-download sekali
+MODEL_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'chroma', 'onnx_models', LOCAL_MODEL, 'onnx')
+BATCH_SIZE = 32
+# panjang maksimum yang dipakai sentence-transformers untuk model ini
+MAX_LENGTH = 256
+WORKERS = min(4, os.cpu_count() or 1)
+
+
+def download_model():
+    """Download model ONNX lewat embedding function Chroma (sekali, butuh internet)"""
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+    ONNXMiniLM_L6_V2()(['warmup'])
+    return MODEL_DIR
+
+
+class LocalEmbedder:
+    """
+    Embedding di CPU dengan model ONNX kecil (all-MiniLM-L6-v2, 384 dimensi), tanpa network.
+
+    Teks diurutkan berdasarkan panjang lalu dipecah per `batch_size` supaya padding
+    minimal; batch dijalankan paralel di thread pool (onnxruntime melepas GIL) dengan
+    thread intra-op dibagi rata antar worker. Hasil: mean pooling + normalisasi L2.
+
+    `session` / `tokenizer` bisa diisi langsung (mis. untuk test); kalau tidak,
+    dimuat dari `model_dir` saat embed pertama.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, batch_size=BATCH_SIZE, workers=WORKERS,
+                 max_length=MAX_LENGTH, cache=None, session=None, tokenizer=None):
+        self.model_dir = model_dir
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_length = max_length
+        self.model = LOCAL_MODEL
+        self.dimensions = LOCAL_DIMENSIONS
+        self.cache = cache
+        self._session = session
+        self._tokenizer = tokenizer
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._pool is not None:
+                return
+
+            if self._session is None or self._tokenizer is None:
+                model_path = os.path.join(self.model_dir, 'model.onnx')
+                tokenizer_path = os.path.join(self.model_dir, 'tokenizer.json')
+                if not (os.path.exists(model_path) and os.path.exists(tokenizer_path)):
+                    raise FileNotFoundError(
+                        f'Model {LOCAL_MODEL} tidak ada di {self.model_dir}. Download sekali dengan '
+                        f'`python -c "from common.local_embeddings import download_model; download_model()"`'
+                    )
+
+            if self._tokenizer is None:
+                from tokenizers import Tokenizer
+
+                tokenizer = Tokenizer.from_file(tokenizer_path)
+                tokenizer.enable_truncation(max_length=self.max_length)
+                tokenizer.enable_padding(pad_id=0, pad_token='[PAD]')
+                self._tokenizer = tokenizer
+
+            if self._session is None:
+                import onnxruntime
+
+                options = onnxruntime.SessionOptions()
+                options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+                options.inter_op_num_threads = 1
+                self._session = onnxruntime.InferenceSession(
+                    model_path, sess_options=options, providers=['CPUExecutionProvider']
+                )
+
+            self._input_names = {item.name for item in self._session.get_inputs()}
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='local-embed')
+
+    def _forward(self, texts):
+        encoded = self._tokenizer.encode_batch(texts)
+        input_ids = np.array([item.ids for item in encoded], dtype=np.int64)
+        attention_mask = np.array([item.attention_mask for item in encoded], dtype=np.int64)
+        feeds = {'input_ids': input_ids, 'attention_mask': attention_mask,
+                 'token_type_ids': np.zeros_like(input_ids)}
+        hidden = self._session.run(None, {name: feeds[name] for name in self._input_names})[0]
+
+        # mean pooling, token padding tidak ikut dihitung
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (pooled / norms).astype(np.float32)
+
+    def _encode(self, texts):
+        if self._pool is None:
+            self._load()
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        results = self._pool.map(lambda batch: self._forward([texts[i] for i in batch]), batches)
+        for batch, batch_vectors in zip(batches, results):
+            vectors[batch] = batch_vectors
+        return vectors
+
+    def embed(self, texts):
+        """Embed list teks; kalau ada `cache`, hanya teks baru yang dihitung"""
+        if not texts:
+            return []
+        if self.cache is None:
+            return self._encode(texts).tolist()
+
+        keys = [cache_key(text, self.model) for text in texts]
+        found = self.cache.get_many(set(keys))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            new_items = list(zip(missing.keys(), self._encode(list(missing.values()))))
+            self.cache.put_many(new_items)
+            found.update(new_items)
+
+        return [np.asarray(found[key]).tolist() for key in keys]
+
+    def embed_one(self, text):
+        return self.embed([text])[0]
+
+    def __call__(self, texts):
+        return self.embed(texts)
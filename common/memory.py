@@ -0,0 +1,204 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from common.tokens import count_tokens
+
+
+# batas token history per request (system prompt + ringkasan + pesan)
+MAX_PROMPT_TOKENS = 3000
+# pesan terbaru yang disimpan apa adanya; yang lebih lama dilipat ke ringkasan
+RECENT_TOKENS = 1500
+SUMMARY_TOKENS = 300
+# overhead format chat per pesan (role, pemisah)
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_PROMPT = (
+    'Ringkas percakapan berikut untuk dipakai sebagai memori asisten. Pertahankan fakta tentang user, '
+    'keputusan, angka, dan pertanyaan yang belum terjawab. Maksimal {tokens} token, tanpa basa-basi.'
+)
+
+
+def message_tokens(message, model='gpt-4o-mini'):
+    return count_tokens(message['content'] or '', model) + MESSAGE_OVERHEAD
+
+
+def make_summarizer(client, model='gpt-4o-mini', max_tokens=SUMMARY_TOKENS):
+    """summarize_fn(ringkasan lama, pesan) -> ringkasan baru, lewat satu LLM call"""
+
+    def summarize(summary, messages):
+        transcript = '\n'.join(f"{message['role']}: {message['content']}" for message in messages)
+        if summary:
+            transcript = f'Ringkasan sebelumnya:\n{summary}\n\nLanjutan percakapan:\n{transcript}'
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {'role': 'system', 'content': SUMMARY_PROMPT.format(tokens=max_tokens)},
+                {'role': 'user', 'content': transcript},
+            ],
+            max_tokens=max_tokens,
+            temperature=0,
+        )
+        return response.choices[0].message.content.strip()
+
+    return summarize
+
+
+class ConversationMemory:
+    """
+    History chat dengan batas token: pesan terbaru disimpan apa adanya, pesan lama
+    dilipat ke ringkasan bergulir oleh satu worker background.
+
+    `messages()` tidak pernah menunggu ringkasan: selama worker belum selesai, pesan
+    yang sedang diringkas ikut dikirim sejauh masih muat, sisanya dilewati. Jadi
+    prompt selalu <= `max_tokens` (kecuali satu pesan terakhir sendiri lebih besar).
+
+    Tanpa `summarize_fn`, pesan tertua yang sudah tidak mungkin masuk `max_tokens`
+    langsung dibuang, jadi memori tetap terbatas.
+
+    `on_summary(summary, folded)` dipanggil setiap ringkasan baru jadi, dengan `folded`
+    = jumlah pesan (sejak awal sesi) yang sudah tercakup ringkasan. `executor` bisa
+    dibagi banyak sesi (mis. server); default satu thread per memori.
+    """
+
+    def __init__(self, system_prompt, summarize_fn=None, max_tokens=MAX_PROMPT_TOKENS,
+                 recent_tokens=RECENT_TOKENS, model='gpt-4o-mini', on_summary=None, executor=None):
+        self.system_prompt = system_prompt
+        self.summarize_fn = summarize_fn
+        self.max_tokens = max_tokens
+        self.recent_tokens = recent_tokens
+        self.model = model
+        self.on_summary = on_summary
+        self.summary = ''
+        self.folded = 0
+        # (pesan, jumlah token) yang belum masuk ringkasan, urut waktu
+        self._turns = []
+        self._folding = 0
+        self._lock = threading.Lock()
+        self._worker = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='memory-summary')
+        self._pending = None
+
+        self.folds = 0
+        self.errors = 0
+        self.dropped = 0
+
+    def add(self, role, content):
+        message = {'role': role, 'content': content}
+        with self._lock:
+            self._turns.append((message, message_tokens(message, self.model)))
+            self._maybe_fold()
+
+    def restore(self, summary, first_n, messages):
+        """
+        Isi ulang memori dari sesi tersimpan (mis. hasil ChatJournal.resume). `first_n` =
+        nomor pesan pertama di `messages`, supaya `folded` di ringkasan berikutnya tetap
+        cocok dengan nomor pesan di journal walaupun pesan lama tidak ikut dibaca.
+        """
+        self.wait()
+        with self._lock:
+            self.summary = summary or ''
+            self.folded = first_n
+            self._turns = [(message, message_tokens(message, self.model)) for message in messages]
+            self._maybe_fold()
+
+    def _maybe_fold(self):
+        """Kirim pesan di luar jendela recent ke worker (dipanggil dengan lock dipegang)"""
+        if self.summarize_fn is None:
+            self._drop_overflow()
+            return
+        if self._folding:
+            return
+
+        kept = 0
+        split = len(self._turns)
+        while split > 0 and kept + self._turns[split - 1][1] <= self.recent_tokens:
+            split -= 1
+            kept += self._turns[split][1]
+        # pesan terakhir selalu disimpan utuh
+        split = min(split, len(self._turns) - 1)
+        if split <= 0:
+            return
+
+        self._folding = split
+        old = [message for message, _ in self._turns[:split]]
+        self._pending = self._worker.submit(self._fold, self.summary, old)
+
+    def _drop_overflow(self):
+        total = sum(tokens for _, tokens in self._turns)
+        drop = 0
+        while total > self.max_tokens and drop < len(self._turns) - 1:
+            total -= self._turns[drop][1]
+            drop += 1
+        if drop:
+            del self._turns[:drop]
+            self.dropped += drop
+
+    def _fold(self, summary, messages):
+        try:
+            new_summary = self.summarize_fn(summary, messages)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+                self._folding = 0
+            return
+
+        with self._lock:
+            self.summary = new_summary
+            del self._turns[:len(messages)]
+            self.folded += len(messages)
+            self._folding = 0
+            self.folds += 1
+            folded = self.folded
+            self._maybe_fold()
+
+        if self.on_summary is not None:
+            self.on_summary(new_summary, folded)
+
+    def system_message(self):
+        content = self.system_prompt
+        if self.summary:
+            content += f'\n\nRingkasan percakapan sebelumnya:\n{self.summary}'
+        return {'role': 'system', 'content': content}
+
+    def messages(self, extra=None):
+        """
+        Pesan untuk request berikutnya: system (+ ringkasan) lalu pesan terbaru yang muat
+        di `max_tokens`. `extra` (mis. pertanyaan + context RAG) ikut dihitung dan
+        ditaruh paling akhir tanpa disimpan ke memori.
+        """
+        extra = list(extra or [])
+        with self._lock:
+            system = self.system_message()
+            budget = self.max_tokens - message_tokens(system, self.model)
+            budget -= sum(message_tokens(message, self.model) for message in extra)
+
+            selected = []
+            for message, tokens in reversed(self._turns):
+                if tokens > budget and (selected or extra):
+                    break
+                selected.append(message)
+                budget -= tokens
+
+        return [system] + selected[::-1] + extra
+
+    def prompt_tokens(self, extra=None):
+        return sum(message_tokens(message, self.model) for message in self.messages(extra))
+
+    def wait(self):
+        """Tunggu ringkasan yang sedang berjalan (untuk test / sebelum simpan)"""
+        while True:
+            with self._lock:
+                pending = self._pending if self._folding else None
+            if pending is None:
+                return
+            pending.result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'turns': len(self._turns),
+                'summary_tokens': count_tokens(self.summary, self.model) if self.summary else 0,
+                'folds': self.folds,
+                'errors': self.errors,
+                'dropped': self.dropped,
+                'folding': self._folding > 0,
+            }
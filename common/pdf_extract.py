@@ -0,0 +1,126 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+PAGES_PER_TASK = 32
+
+
+def _page_count(pdf_path):
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _extract_range(pdf_path, start, end):
+    """Jalan di worker process: ekstrak halaman [start, end) dari satu PDF, return (filename, pages, error)"""
+    import PyPDF2
+
+    filename = os.path.basename(pdf_path)
+    pages = []
+    try:
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            for page_num in range(start, min(end, len(reader.pages))):
+                text = reader.pages[page_num].extract_text()
+                if text and text.strip():
+                    pages.append({
+                        'filename': filename,
+                        'page': page_num + 1,
+                        'text': text,
+                    })
+    except Exception as e:
+        return filename, [], f'{type(e).__name__}: {e}'
+
+    return filename, pages, None
+
+
+def _tasks(pdf_paths, pages_per_task, failed):
+    """Bagi tiap PDF per rentang halaman; PDF kecil cukup satu task. PDF yang tidak bisa dibuka masuk `failed`."""
+    for pdf_path in pdf_paths:
+        try:
+            n_pages = _page_count(pdf_path)
+        except Exception as e:
+            failed[os.path.basename(str(pdf_path))] = f'{type(e).__name__}: {e}'
+            continue
+        for start in range(0, n_pages, pages_per_task):
+            yield str(pdf_path), start, start + pages_per_task
+
+
+def peak_rss_mb():
+    """Peak RSS proses ini + worker yang sudah selesai (MB), None kalau tidak didukung OS"""
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux dalam KB, macOS dalam byte
+    divisor = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    return own / divisor, children / divisor
+
+
+def iter_pdf_pages(pdf_paths, max_workers=None, pages_per_task=PAGES_PER_TASK, stats=None):
+    """
+    Ekstrak halaman banyak PDF secara paralel di process pool, hasilnya di-yield satu per halaman.
+
+    Task yang berjalan dibatasi (2x jumlah worker) jadi memori tetap datar walaupun
+    PDF-nya ribuan halaman. Urutan hasil mengikuti task yang selesai duluan;
+    tiap record membawa 'filename' dan 'page'.
+
+    Kalau `stats` (dict) diberikan, diisi: pages, files, failed (filename -> error; PDF rusak
+    atau yang sebagian halamannya gagal diekstrak), seconds, pages_per_sec.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    start_time = time.perf_counter()
+    pages = 0
+    files = set()
+    failed = {}
+
+    def results(done):
+        nonlocal pages
+        for future in done:
+            filename, records, error = future.result()
+            if error:
+                failed[filename] = error
+            for record in records:
+                pages += 1
+                files.add(filename)
+                yield record
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+        for task in _tasks(pdf_paths, pages_per_task, failed):
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from results(done)
+            pending.add(pool.submit(_extract_range, *task))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from results(done)
+
+    if stats is not None:
+        elapsed = time.perf_counter() - start_time
+        stats.update({
+            'pages': pages,
+            'files': len(files),
+            'failed': failed,
+            'seconds': elapsed,
+            'pages_per_sec': pages / elapsed if elapsed else 0.0,
+        })
+
+
+def print_extract_stats(stats):
+    line = (f"[PDF] {stats['pages']} halaman dari {stats['files']} file, {stats['seconds']:.2f}s "
+            f"({stats['pages_per_sec']:.1f} halaman/s)")
+    if stats.get('failed'):
+        line += f", {len(stats['failed'])} file gagal: {', '.join(sorted(stats['failed']))}"
+    rss = peak_rss_mb()
+    if rss:
+        line += f", peak RSS {rss[0]:.0f} MB (worker {rss[1]:.0f} MB)"
+    print(line)
@@ -0,0 +1,207 @@
+import time
+import queue
+import threading
+
+
+QUEUE_SIZE = 8
+_DONE = object()
+
+
+class _Stage:
+    def __init__(self, name, fn, workers, stream):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.stream = stream
+        self.items_in = 0
+        self.items_out = 0
+        self.busy = 0.0
+        self.blocked = 0.0  # waktu menunggu queue berikutnya (backpressure)
+        self.lock = threading.Lock()
+        self.finished_workers = 0
+
+
+class Pipeline:
+    """
+    Pipeline bertahap dengan queue terbatas di antara stage.
+
+    Setiap stage jalan di thread-nya sendiri (atau beberapa worker), jadi ekstraksi,
+    chunking, embedding dan upsert berjalan bersamaan. Kalau stage lambat, queue di
+    depannya penuh dan stage sebelumnya ikut tertahan (backpressure), bukan menumpuk di memori.
+
+        pipeline = Pipeline(source_iterable)
+        pipeline.stream('chunk', lambda items: ...)   # generator: iterator masuk -> iterator keluar
+        pipeline.map('embed', fn, workers=4)          # fn(item) -> iterable hasil
+        stats = pipeline.run()
+    """
+
+    def __init__(self, source, queue_size=QUEUE_SIZE):
+        self.source = source
+        self.queue_size = queue_size
+        self.stages = [_Stage('source', None, 1, True)]
+        self._abort = threading.Event()
+        self._errors = []
+
+    def map(self, name, fn, workers=1):
+        self.stages.append(_Stage(name, fn, workers, stream=False))
+        return self
+
+    def stream(self, name, fn):
+        self.stages.append(_Stage(name, fn, 1, stream=True))
+        return self
+
+    def _put(self, q, item):
+        """Put yang bisa dibatalkan; return lama waktu tertahan karena queue penuh"""
+        start = time.perf_counter()
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        return time.perf_counter() - start
+
+    def _get(self, q):
+        """Get yang bisa dibatalkan; return (item, lama menunggu)"""
+        start = time.perf_counter()
+        while not self._abort.is_set():
+            try:
+                return q.get(timeout=0.1), time.perf_counter() - start
+            except queue.Empty:
+                continue
+        return _DONE, time.perf_counter() - start
+
+    def _emit(self, stage, outputs, out_q, input_wait):
+        """
+        Kirim hasil ke stage berikutnya. Waktu menghasilkan item dihitung busy,
+        waktu menunggu input (`input_wait`, list berisi satu angka) dan queue penuh tidak.
+        """
+        outputs = iter(outputs)
+        # berhenti menarik input (mis. ekstraksi PDF berikutnya) begitu ada stage yang gagal
+        while not self._abort.is_set():
+            input_wait[0] = 0.0
+            start = time.perf_counter()
+            try:
+                item = next(outputs)
+            except StopIteration:
+                with stage.lock:
+                    stage.busy += time.perf_counter() - start - input_wait[0]
+                return
+
+            busy = time.perf_counter() - start - input_wait[0]
+            blocked = self._put(out_q, item) if out_q is not None else 0.0
+            with stage.lock:
+                stage.busy += busy
+                stage.blocked += blocked
+                stage.items_out += 1
+
+    def _finish(self, stage, in_q, out_q):
+        with stage.lock:
+            stage.finished_workers += 1
+            last = stage.finished_workers == stage.workers
+        if not last and in_q is not None:
+            self._put(in_q, _DONE)  # bangunkan worker lain di stage yang sama
+        if last and out_q is not None:
+            self._put(out_q, _DONE)
+
+    def _run_stream(self, stage, in_q, out_q):
+        input_wait = [0.0]
+
+        def inputs():
+            while True:
+                item, waited = self._get(in_q)
+                input_wait[0] += waited
+                if item is _DONE:
+                    return
+                stage.items_in += 1
+                yield item
+
+        try:
+            outputs = self.source if in_q is None else stage.fn(inputs())
+            self._emit(stage, outputs, out_q, input_wait)
+        except Exception as e:
+            self._fail(stage, e)
+        finally:
+            self._finish(stage, in_q, out_q)
+
+    def _run_map(self, stage, in_q, out_q):
+        no_wait = [0.0]
+        try:
+            while True:
+                item, _ = self._get(in_q)
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                outputs = stage.fn(item) or ()
+                with stage.lock:
+                    stage.items_in += 1
+                    stage.busy += time.perf_counter() - start
+                self._emit(stage, outputs, out_q, no_wait)
+        except Exception as e:
+            self._fail(stage, e)
+        finally:
+            self._finish(stage, in_q, out_q)
+
+    def _fail(self, stage, error):
+        self._errors.append((stage.name, error))
+        self._abort.set()
+
+    def _report(self, elapsed):
+        # item yang sudah diproses tiap stage (source: yang sudah dihasilkan)
+        parts = [f'{stage.name} {stage.items_in if stage.fn else stage.items_out}' for stage in self.stages]
+        print(f"[Pipeline {elapsed:.1f}s] " + ' | '.join(parts), flush=True)
+
+    def run(self, progress_every=2.0):
+        """
+        Jalankan semua stage sampai source habis.
+
+        Returns:
+            dict per stage: items_in, items_out, busy, blocked, utilization (busy / (wall x workers))
+        """
+        queues = [None] + [queue.Queue(self.queue_size) for _ in self.stages[1:]]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            in_q = queues[i]
+            out_q = queues[i + 1] if i + 1 < len(self.stages) else None
+            target = self._run_stream if stage.stream else self._run_map
+            for _ in range(stage.workers):
+                thread = threading.Thread(target=target, args=(stage, in_q, out_q), daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        start = time.perf_counter()
+        last_report = start
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.2)
+                now = time.perf_counter()
+                if progress_every and now - last_report >= progress_every:
+                    self._report(now - start)
+                    last_report = now
+
+        wall = time.perf_counter() - start
+        if self._errors:
+            name, error = self._errors[0]
+            raise RuntimeError(f"Stage '{name}' gagal: {error}") from error
+
+        return {
+            'seconds': wall,
+            'stages': {
+                stage.name: {
+                    'workers': stage.workers,
+                    'items_in': stage.items_in,
+                    'items_out': stage.items_out,
+                    'busy': stage.busy,
+                    'blocked': stage.blocked,
+                    'utilization': stage.busy / (wall * stage.workers) if wall else 0.0,
+                }
+                for stage in self.stages
+            },
+        }
+
+
+def print_pipeline_stats(stats):
+    print(f"[Pipeline] selesai dalam {stats['seconds']:.2f}s")
+    for name, stage in stats['stages'].items():
+        print(f"  {name:<10} x{stage['workers']}  in {stage['items_in']:>6}  out {stage['items_out']:>6}  "
+              f"utilisasi {stage['utilization']:>5.0%}  tertahan {stage['blocked']:.2f}s")
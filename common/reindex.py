@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+
+from common.ingest import make_record, ingest_records
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def chunk_ids(source, chunks):
+    """
+    ID chunk diturunkan dari isi chunk (bukan posisi), jadi chunk yang tidak berubah
+    tetap punya ID yang sama walaupun chunk lain di file yang sama bergeser.
+    """
+    ids = []
+    seen = {}
+    for chunk in chunks:
+        base = f"{source}:{content_hash(source + chr(0) + chunk)[:24]}"
+        # chunk dengan isi identik di file yang sama diberi nomor urut
+        seen[base] = seen.get(base, 0) + 1
+        ids.append(base if seen[base] == 1 else f'{base}-{seen[base]}')
+    return ids
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def plan_reindex(manifest, documents, chunker):
+    """
+    Bandingkan dokumen sekarang dengan manifest lama.
+
+    Returns:
+        (records_to_embed, ids_to_delete, metadata_updates, new_manifest, changed_sources)
+    """
+    old_files = manifest['files'] if manifest else {}
+    new_files = {}
+    records = []
+    to_delete = []
+    metadata_updates = {}
+    changed_sources = []
+
+    for doc in documents:
+        source = doc['filename']
+        file_hash = content_hash(doc['content'])
+        old_entry = old_files.get(source)
+
+        # file tidak berubah -> tidak perlu chunking ulang sama sekali
+        if old_entry and old_entry['hash'] == file_hash:
+            new_files[source] = old_entry
+            continue
+
+        changed_sources.append(source)
+        chunks = chunker(doc['content'])
+        ids = chunk_ids(source, chunks)
+        old_ids = set(old_entry['chunks']) if old_entry else set()
+
+        for i, (chunk_id, chunk) in enumerate(zip(ids, chunks)):
+            metadata = {'source': source, 'chunk_id': i}
+            if chunk_id in old_ids:
+                metadata_updates[chunk_id] = metadata
+            else:
+                records.append(make_record(chunk_id, chunk, metadata))
+
+        to_delete.extend(old_ids - set(ids))
+        new_files[source] = {'hash': file_hash, 'chunks': ids}
+
+    # file yang sudah dihapus dari folder
+    for source, entry in old_files.items():
+        if source not in new_files:
+            changed_sources.append(source)
+            to_delete.extend(entry['chunks'])
+
+    return records, to_delete, metadata_updates, {'files': new_files}, changed_sources
+
+
+def reindex(collection, documents, chunker, embed_fn, manifest_path, lexical_index=None):
+    """
+    Sinkronkan collection dengan dokumen: embed chunk baru/berubah, hapus chunk basi.
+    Kalau `lexical_index` (BM25Index) diberikan, index lexical ikut di-update di langkah yang sama.
+
+    Returns:
+        dict statistik: added, deleted, unchanged_files, changed_sources, deleted_ids,
+        ingest (statistik ingest_records)
+    """
+    manifest = load_manifest(manifest_path)
+    if lexical_index is not None and manifest and not len(lexical_index):
+        # index lexical belum pernah dibangun -> proses ulang semua file (embedding tetap dari cache)
+        manifest = None
+
+    records, to_delete, metadata_updates, new_manifest, changed_sources = plan_reindex(manifest, documents, chunker)
+
+    if manifest is None:
+        # belum ada manifest (index lama dengan ID posisi) -> buang semua ID yang tidak dikenal
+        known = {chunk_id for entry in new_manifest['files'].values() for chunk_id in entry['chunks']}
+        to_delete = [chunk_id for chunk_id in collection.get(include=[])['ids'] if chunk_id not in known]
+
+    if to_delete:
+        collection.delete(ids=to_delete)
+
+    if metadata_updates:
+        collection.update(ids=list(metadata_updates), metadatas=list(metadata_updates.values()))
+
+    ingest_stats = ingest_records(collection, records, embed_fn) if records else None
+
+    if lexical_index is not None:
+        lexical_index.remove(to_delete)
+        for record in records:
+            lexical_index.add(record['id'], record['text'])
+        lexical_index.save()
+
+    # manifest baru ditulis setelah collection ter-update
+    save_manifest(new_manifest, manifest_path)
+
+    unchanged = sum(
+        1 for source, entry in new_manifest['files'].items()
+        if manifest and manifest['files'].get(source, {}).get('hash') == entry['hash']
+    )
+    return {
+        'added': len(records),
+        'deleted': len(to_delete),
+        'unchanged_files': unchanged,
+        'changed_sources': changed_sources,
+        'deleted_ids': to_delete,
+        'ingest': ingest_stats,
+    }
@@ -0,0 +1,101 @@
+import numpy as np
+
+from common.bm25 import tokenize, K1, B
+from common.similarity import normalize
+
+
+N_CANDIDATES = 12
+# 1.0 = hanya relevansi, makin kecil makin mengutamakan chunk yang berbeda satu sama lain
+MMR_LAMBDA = 0.7
+# bobot skor lexical di relevansi (sisanya cosine)
+LEXICAL_WEIGHT = 0.3
+
+
+def lexical_scores(query, texts):
+    """
+    Skor BM25 query terhadap kandidat (IDF dihitung dari kandidat itu sendiri),
+    dinormalisasi ke 0..1. Tidak butuh index maupun model.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms or not texts:
+        return np.zeros(len(texts), dtype=np.float32)
+
+    column = {term: j for j, term in enumerate(terms)}
+    tf = np.zeros((len(texts), len(terms)), dtype=np.float32)
+    lengths = np.zeros(len(texts), dtype=np.float32)
+    for i, text in enumerate(texts):
+        tokens = tokenize(text)
+        lengths[i] = len(tokens)
+        for token in tokens:
+            j = column.get(token)
+            if j is not None:
+                tf[i, j] += 1
+
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(texts) - df + 0.5) / (df + 0.5))
+    norm = K1 * (1 - B + B * lengths / max(lengths.mean(), 1.0))
+    scores = (tf * (K1 + 1) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+    top = scores.max()
+    return scores / top if top > 0 else scores
+
+
+def mmr(query_vector, candidate_vectors, k, lambda_mult=MMR_LAMBDA, relevance=None):
+    """
+    Maximal marginal relevance: pilih k kandidat yang relevan tapi tidak saling mirip.
+
+    Similarity antar kandidat dihitung sekali (satu perkalian matriks), lalu tiap langkah
+    greedy hanya operasi vektor. `relevance` bisa menggantikan cosine ke query.
+
+    Returns:
+        list index kandidat terpilih, urut pilihan
+    """
+    vectors = normalize(candidate_vectors)
+    if relevance is None:
+        relevance = vectors @ normalize(query_vector)[0]
+    relevance = np.asarray(relevance, dtype=np.float32)
+    pairwise = vectors @ vectors.T
+
+    k = min(k, len(vectors))
+    selected = []
+    max_similarity = np.full(len(vectors), -np.inf, dtype=np.float32)
+    available = np.ones(len(vectors), dtype=bool)
+
+    for _ in range(k):
+        redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, pairwise[best])
+
+    return selected
+
+
+def rerank(query, query_vector, chunks, vectors, n_results=3, lambda_mult=MMR_LAMBDA,
+           lexical_weight=LEXICAL_WEIGHT, score_fn=None):
+    """
+    Rerank kandidat hasil over-fetch lalu diversifikasi dengan MMR, semua di CPU.
+
+    Relevansi = (1 - lexical_weight) x cosine + lexical_weight x skor reranker, dengan
+    reranker default `lexical_scores`. `score_fn(query, texts)` bisa diganti model lokal
+    (mis. cross-encoder) asalkan mengembalikan satu skor per teks.
+
+    Returns:
+        list chunk terpilih (maks n_results), dengan tambahan key 'rerank_score'
+    """
+    if not chunks:
+        return []
+
+    vectors = normalize(vectors)
+    cosine = vectors @ normalize(query_vector)[0]
+    extra = np.asarray((score_fn or lexical_scores)(query, [chunk['text'] for chunk in chunks]), dtype=np.float32)
+    relevance = (1 - lexical_weight) * cosine + lexical_weight * extra
+
+    selected = []
+    for index in mmr(query_vector, vectors, n_results, lambda_mult, relevance):
+        chunk = dict(chunks[index])
+        chunk['rerank_score'] = float(relevance[index])
+        selected.append(chunk)
+    return selected
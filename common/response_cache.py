@@ -0,0 +1,211 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+
+CACHE_PATH = './llm_cache.sqlite3'
+TTL_SECONDS = 7 * 24 * 60 * 60
+MAX_ENTRIES = 1000
+
+# parameter yang tidak mengubah isi jawaban, tidak ikut key
+IGNORED_PARAMS = {'timeout', 'extra_headers'}
+
+
+def is_deterministic(params):
+    """Hanya panggilan dengan temperature 0 atau seed tetap (dan satu jawaban) yang boleh di-cache"""
+    if params.get('n', 1) != 1:
+        return False
+    return params.get('temperature') == 0 or params.get('seed') is not None
+
+
+def cache_key(provider, params):
+    """sha256 dari JSON kanonik (key terurut) provider + model + messages + temperature + tools + sisanya"""
+    canonical = {name: value for name, value in params.items() if name not in IGNORED_PARAMS}
+    canonical['provider'] = provider
+    text = json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache jawaban LLM exact-match di SQLite.
+
+    Entry kedaluwarsa setelah `ttl` detik; kalau jumlahnya melebihi `max_entries`,
+    yang paling lama tidak dipakai dibuang. Payload disimpan sebagai JSON:
+    response lengkap untuk panggilan biasa, daftar chunk untuk streaming.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)'
+        )
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT payload, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row and now - row[1] >= self.ttl:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self._db.commit()
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._db.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+            self._db.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key, payload):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                (key, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+            self._db.execute('DELETE FROM responses WHERE created_at <= ?', (now - self.ttl,))
+            self._db.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, stored = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM responses'
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'skipped': self.skipped,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes_stored': stored,
+        }
+
+
+class CachedStream:
+    """
+    Pengganti openai.Stream untuk stream=True: bisa diiterasi, dipakai dengan `with`,
+    dan di-close. Atribut lain (mis. `response`) diteruskan ke stream asli kalau ada.
+    """
+
+    def __init__(self, chunks, stream=None):
+        self._iterator = iter(chunks)
+        self._stream = stream
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # generator perekam yang ditutup sebelum habis tidak menyimpan apa pun
+        if hasattr(self._iterator, 'close'):
+            self._iterator.close()
+        if hasattr(self._stream, 'close'):
+            self._stream.close()
+
+    def __getattr__(self, name):
+        stream = self.__dict__.get('_stream')
+        if stream is None:
+            raise AttributeError(name)
+        return getattr(stream, name)
+
+
+class _Override:
+    """Objek asli dengan beberapa atribut diganti; atribut lain diteruskan apa adanya"""
+
+    def __init__(self, target, **overrides):
+        self._target = target
+        self.__dict__.update(overrides)
+
+    def __getattr__(self, name):
+        return getattr(self.__dict__['_target'], name)
+
+
+class CachedClient:
+    """
+    Pembungkus client OpenAI (sync) dengan cache jawaban untuk chat.completions.create.
+
+    Panggilan yang tidak deterministik diteruskan apa adanya (dihitung `skipped`).
+    Untuk stream=True, chunk yang tersimpan diputar ulang; stream baru disimpan
+    hanya kalau dibaca sampai habis. Atribut lain (termasuk `with_raw_response`)
+    diteruskan ke client asli, tanpa cache.
+    """
+
+    def __init__(self, client, provider='openai', cache=None):
+        self.client = client
+        self.provider = provider
+        self.cache = cache if cache is not None else ResponseCache()
+        self.chat = _Override(client.chat, completions=_Override(client.chat.completions, create=self.create))
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def create(self, **params):
+        if not is_deterministic(params):
+            self.cache.skipped += 1
+            return self.client.chat.completions.create(**params)
+
+        key = cache_key(self.provider, params)
+        payload = self.cache.get(key)
+        if params.get('stream'):
+            if payload is not None:
+                return CachedStream(ChatCompletionChunk.model_validate(chunk) for chunk in payload)
+            stream = self.client.chat.completions.create(**params)
+            return CachedStream(self._record_stream(key, stream), stream)
+
+        if payload is not None:
+            return ChatCompletion.model_validate(payload)
+        response = self.client.chat.completions.create(**params)
+        self.cache.put(key, response.model_dump(mode='json'))
+        return response
+
+    def _record_stream(self, key, stream):
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk.model_dump(mode='json'))
+            yield chunk
+        self.cache.put(key, chunks)
+
+
+def print_cache_stats(cache):
+    stats = cache.stats()
+    print(
+        f"[Response Cache] hit {stats['hits']}, miss {stats['misses']}, "
+        f"dilewati {stats['skipped']} (tidak deterministik), {stats['entries']} entries"
+    )
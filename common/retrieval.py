@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from common.bm25 import is_decisive
+
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='retrieval')
+
+
+def reciprocal_rank_fusion(*ranked_id_lists, k=60):
+    """Gabungkan beberapa ranking (list id) dengan RRF: skor = sum(1 / (k + rank))"""
+    scores = {}
+    for ranked_ids in ranked_id_lists:
+        for rank, doc_id in enumerate(ranked_ids, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def _chunk_key(chunk):
+    return chunk.get('id') or (chunk['source'], chunk['text'])
+
+
+def merge_results(*result_sets, n_results=3):
+    """Gabungkan beberapa hasil search dengan RRF (dedup per chunk), ambil n teratas"""
+    chunks = {}
+    for results in result_sets:
+        for chunk in results:
+            chunks.setdefault(_chunk_key(chunk), chunk)
+
+    fused = reciprocal_rank_fusion(*[[_chunk_key(chunk) for chunk in results] for results in result_sets])
+    return [chunks[key] for key, _ in fused[:n_results]]
+
+
+def hybrid_search(query, lexical_index, dense_search_fn, fetch_fn, n_results=3, n_candidates=20,
+                  rerank_fn=None, n_rerank=12):
+    """
+    Gabungan BM25 + vector search dengan reciprocal rank fusion.
+
+    Kalau hasil BM25 sudah meyakinkan (mis. query berisi nomor kebijakan/SKU/versi yang persis),
+    dense search (dan embedding call-nya) dilewati. `fetch_fn(ids)` mengambil chunk dari vector store.
+    Kalau `rerank_fn(query, chunks, n_results)` diberikan, `n_rerank` teratas hasil fusion
+    di-rerank dulu sebelum dipotong jadi `n_results`.
+    """
+    lexical_hits = lexical_index.search(query, k=n_candidates)
+    coverage = lexical_index.coverage(query, lexical_hits[0][0]) if lexical_hits else 0.0
+    if is_decisive(lexical_hits, coverage):
+        # fetch_fn bisa melewati id yang sudah terhapus / mengubah urutan, jadi skor dicocokkan per id
+        scores = dict(lexical_hits)
+        chunks = fetch_fn([doc_id for doc_id, _ in lexical_hits[:n_results]])
+        for chunk in chunks:
+            chunk['bm25'] = scores[chunk['id']]
+        if chunks:
+            return chunks
+
+    dense = dense_search_fn(query, n_candidates)
+    by_id = {chunk['id']: chunk for chunk in dense}
+    fused = reciprocal_rank_fusion([chunk['id'] for chunk in dense], [doc_id for doc_id, _ in lexical_hits])
+    top_ids = [doc_id for doc_id, _ in fused[:max(n_rerank, n_results) if rerank_fn else n_results]]
+
+    # chunk yang hanya ditemukan BM25 diambil dari vector store
+    missing = [doc_id for doc_id in top_ids if doc_id not in by_id]
+    if missing:
+        by_id.update((chunk['id'], chunk) for chunk in fetch_fn(missing))
+
+    chunks = [by_id[doc_id] for doc_id in top_ids if doc_id in by_id]
+    return rerank_fn(query, chunks, n_results) if rerank_fn else chunks
+
+
+def speculative_search(raw_query, rewrite_fn, search_fn, n_results=3, skip_distance=None,
+                       rewrite_timeout=None):
+    """
+    Search dengan query mentah langsung jalan, bersamaan dengan rewrite query oleh LLM.
+
+    1. search_fn(raw_query) dan rewrite_fn(raw_query) dijalankan paralel
+    2. kalau hasil query mentah sudah cukup yakin (distance terkecil <= skip_distance),
+       langsung dipakai tanpa menunggu rewrite. Hasil tanpa distance (mis. dari BM25)
+       tidak dihitung, jadi tetap menunggu rewrite
+    3. kalau tidak, search ulang dengan query hasil rewrite lalu kedua hasil digabung.
+       Rewrite yang gagal atau lebih lama dari rewrite_timeout detik -> pakai hasil mentah
+
+    Returns:
+        (query yang dipakai untuk prompt, list chunk relevan)
+    """
+    raw_future = _executor.submit(search_fn, raw_query, n_results)
+    rewrite_future = _executor.submit(rewrite_fn, raw_query)
+
+    raw_results = raw_future.result()
+    distances = [r['distance'] for r in raw_results if r.get('distance') is not None]
+    best_distance = min(distances) if distances else None
+    if skip_distance is not None and best_distance is not None and best_distance <= skip_distance:
+        # cancel() hanya berlaku kalau rewrite belum mulai; yang sudah jalan tetap
+        # selesai di background (panggilan LLM-nya tetap dibayar), hasilnya dibuang
+        rewrite_future.cancel()
+        return raw_query, raw_results
+
+    try:
+        query = rewrite_future.result(timeout=rewrite_timeout) or raw_query
+    except Exception:
+        # termasuk TimeoutError: rewrite dibiarkan selesai di background
+        query = raw_query
+
+    if query == raw_query:
+        return raw_query, raw_results
+
+    rewritten_results = search_fn(query, n_results)
+    return query, merge_results(rewritten_results, raw_results, n_results=n_results)
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+
+import numpy as np
+
+from common.similarity import normalize
+
+
+SIMILARITY_THRESHOLD = 0.92
+TTL_SECONDS = 24 * 60 * 60
+MAX_ENTRIES = 500
+
+
+class SemanticCache:
+    """
+    Cache jawaban berdasarkan kemiripan embedding pertanyaan.
+
+    Pertanyaan yang maknanya sama (cosine >= threshold) langsung dapat jawaban
+    yang tersimpan beserta chunk sumbernya, tanpa rewrite/search/LLM call.
+    Entry kedaluwarsa setelah `ttl` detik, yang paling jarang dipakai dibuang
+    kalau jumlahnya melebihi `max_entries`, dan entry yang sumbernya di-reindex
+    dihapus lewat `invalidate()`.
+
+    Di disk: `<path>.json` (entry + nomor generasi matrix) dan `<path>.<generasi>.npy`.
+    Matrix selalu ditulis ke file generasi baru sebelum JSON diganti atomik, jadi
+    crash di tengah penyimpanan tidak membuat entry dan matrix tidak sejajar.
+    `last_used` dari lookup tidak langsung ditulis (hit tidak menulis ulang JSON),
+    tapi ikut tersimpan di store/invalidate berikutnya atau lewat `save()` saat keluar.
+    """
+
+    def __init__(self, path=None, threshold=SIMILARITY_THRESHOLD, ttl=TTL_SECONDS, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._dirty = False
+
+        if path and os.path.exists(path + '.json'):
+            self._load()
+
+    def _matrix_path(self, generation):
+        return f'{self.path}.{generation}.npy'
+
+    def _load(self):
+        with open(self.path + '.json', 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            # format lama (entry dan matrix tanpa generasi): dibuang, cache diisi ulang
+            return
+
+        self._generation = data['generation']
+        entries = data['entries']
+        if entries and os.path.exists(self._matrix_path(self._generation)):
+            matrix = np.load(self._matrix_path(self._generation))
+            if len(matrix) == len(entries):
+                self.entries, self._matrix = entries, matrix
+        self._purge_expired()
+
+    def _save(self, matrix=True):
+        """Simpan ke disk; `matrix=False` kalau hanya metadata entry (mis. last_used) yang berubah"""
+        if not self.path:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        old_generation = self._generation
+        if matrix:
+            self._generation += 1
+            tmp_path = self._matrix_path(self._generation) + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, self._matrix)
+            os.replace(tmp_path, self._matrix_path(self._generation))
+
+        tmp_path = self.path + '.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'generation': self._generation, 'entries': self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path + '.json')
+
+        self._dirty = False
+        if matrix and os.path.exists(self._matrix_path(old_generation)):
+            os.remove(self._matrix_path(old_generation))
+
+    def save(self):
+        """Tulis urutan LRU (last_used) yang belum tersimpan, mis. sebelum program keluar"""
+        if self._dirty:
+            self._save(matrix=False)
+
+    def _keep(self, rows):
+        self.entries = [self.entries[row] for row in rows]
+        self._matrix = self._matrix[rows] if len(rows) else np.empty((0, self._matrix.shape[1]), dtype=np.float32)
+
+    def _purge_expired(self):
+        now = time.time()
+        alive = [row for row, entry in enumerate(self.entries) if now - entry['created_at'] < self.ttl]
+        if len(alive) != len(self.entries):
+            self._keep(alive)
+            return True
+        return False
+
+    def lookup(self, query_embedding):
+        """Return entry {'query', 'answer', 'chunks', ...} kalau ada pertanyaan mirip, else None"""
+        if self._purge_expired():
+            self._save()
+
+        if not self.entries:
+            self.misses += 1
+            return None
+
+        scores = self._matrix @ normalize(query_embedding)[0]
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        entry = self.entries[best]
+        entry['last_used'] = time.time()
+        self._dirty = True
+        return dict(entry, similarity=float(scores[best]))
+
+    def store(self, query, query_embedding, answer, chunks):
+        """Simpan jawaban + chunk sumber (butuh key 'id' dan 'source' di tiap chunk)"""
+        vector = normalize(query_embedding)
+        now = time.time()
+        self.entries.append({
+            'query': query,
+            'answer': answer,
+            'chunks': chunks,
+            'created_at': now,
+            'last_used': now,
+        })
+        self._matrix = vector if not len(self._matrix) else np.vstack([self._matrix, vector])
+
+        self._purge_expired()
+        if len(self.entries) > self.max_entries:
+            # buang entry yang paling lama tidak dipakai
+            by_recency = sorted(range(len(self.entries)), key=lambda row: self.entries[row]['last_used'])
+            self._keep(sorted(by_recency[len(self.entries) - self.max_entries:]))
+
+        self._save()
+
+    def invalidate(self, chunk_ids=(), sources=()):
+        """Hapus entry yang memakai chunk/file yang berubah. Return jumlah entry yang dihapus."""
+        chunk_ids, sources = set(chunk_ids), set(sources)
+        keep = [
+            row for row, entry in enumerate(self.entries)
+            if not any(c.get('id') in chunk_ids or c.get('source') in sources for c in entry['chunks'])
+        ]
+        removed = len(self.entries) - len(keep)
+        if removed:
+            self._keep(keep)
+            self._save()
+        return removed
+
+    def clear(self):
+        self._keep([])
+        self._save()
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+def normalize(vectors):
+    """Normalisasi L2 per baris ke float32 (vector nol dibiarkan nol)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def cosine_similarity(vector1, vector2):
+    """Cosine similarity satu pasang vector"""
+    a, b = normalize([vector1, vector2])
+    return float(np.dot(a, b))
+
+
+def top_k(scores, k):
+    """
+    Ambil k skor terbesar per baris pakai argpartition (O(n)), baru diurutkan
+    sebanyak k saja. Returns (indices, scores), masing-masing shape (n_query, k).
+    """
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class SimilarityIndex:
+    """
+    Index cosine similarity in-memory.
+
+    Semua embedding disimpan sudah ternormalisasi dalam satu matriks float32 contiguous,
+    jadi cosine similarity = dot product, dan banyak query dijawab dengan satu perkalian matriks.
+    """
+
+    def __init__(self, dim=None):
+        self.dim = dim
+        self.ids = []
+        self._matrix = np.empty((0, dim or 0), dtype=np.float32)
+        self._pending = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, ids, vectors):
+        vectors = normalize(vectors)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._matrix = np.empty((0, self.dim), dtype=np.float32)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f'Dimensi vector {vectors.shape[1]} != dimensi index {self.dim}')
+
+        self.ids.extend(ids)
+        # ditumpuk dulu, digabung sekali saat search berikutnya
+        self._pending.append(vectors)
+
+    @property
+    def matrix(self):
+        if self._pending:
+            self._matrix = np.ascontiguousarray(np.vstack([self._matrix, *self._pending]))
+            self._pending = []
+        return self._matrix
+
+    def search(self, queries, k=3, batch_size=256):
+        """
+        Cari k tetangga terdekat untuk satu atau banyak query sekaligus.
+        Query diproses per `batch_size` supaya matriks skor tidak terlalu besar.
+
+        Returns:
+            list (per query) berisi list (id, score) terurut dari yang paling mirip
+        """
+        queries = normalize(queries)
+        matrix = self.matrix
+        results = []
+
+        for start in range(0, len(queries), batch_size):
+            indices, scores = top_k(queries[start:start + batch_size] @ matrix.T, k)
+            results.extend(
+                [(self.ids[i], float(s)) for i, s in zip(row_idx, row_scores)]
+                for row_idx, row_scores in zip(indices, scores)
+            )
+
+        return results
@@ -0,0 +1,220 @@
+import sys
+import json
+import time
+import asyncio
+import threading
+from collections import deque
+
+import numpy as np
+
+from common.llm_clients import get_async_client
+
+
+# terminal di-update paling sering sekali per frame (~30 fps), bukan per token
+FRAME_SECONDS = 1 / 30
+# jumlah response terakhir yang dipakai untuk statistik streaming
+STATS_WINDOW = 1000
+
+_history = deque(maxlen=STATS_WINDOW)
+_history_lock = threading.Lock()
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+class StreamMetrics:
+    """Catat waktu tiap delta satu response: TTFT, jeda antar token, token/detik"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first = None
+        self.last = None
+        self.gaps = []
+        self.chunks = 0
+        self.completion_tokens = None
+
+    def mark(self):
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        else:
+            self.gaps.append(now - self.last)
+        self.last = now
+        self.chunks += 1
+
+    def finish(self):
+        """
+        Returns:
+            dict ttft_ms, inter_token_ms (p50/p95), tokens, tokens_per_sec, seconds.
+            `tokens` dari usage API kalau ada, kalau tidak jumlah delta (~1 token per delta).
+        """
+        end = time.perf_counter()
+        tokens = self.completion_tokens if self.completion_tokens is not None else self.chunks
+        generating = end - self.first if self.first is not None else 0.0
+        p50, p95 = np.percentile(np.asarray(self.gaps) * 1000, [50, 95]) if self.gaps else (0.0, 0.0)
+        return {
+            'ttft_ms': (self.first - self.start) * 1000 if self.first is not None else None,
+            'inter_token_ms': {'p50': float(p50), 'p95': float(p95)},
+            'tokens': tokens,
+            'tokens_per_sec': tokens / generating if generating else 0.0,
+            'seconds': end - self.start,
+        }
+
+
+class TerminalWriter:
+    """
+    Tulis delta ke terminal per frame, bukan satu write + flush per token.
+
+    Delta pertama langsung ditulis (TTFT yang dilihat user tidak bertambah); delta
+    berikutnya ditampung lalu ditulis sekaligus paling lambat `frame_seconds` kemudian.
+    Dipakai dari dalam coroutine (butuh event loop yang sedang jalan).
+    """
+
+    def __init__(self, stream=None, frame_seconds=FRAME_SECONDS):
+        self.stream = stream or sys.stdout
+        self.frame_seconds = frame_seconds
+        self._parts = []
+        self._last_flush = 0.0
+        self._timer = None
+
+    def write(self, text):
+        self._parts.append(text)
+        delay = self.frame_seconds - (time.perf_counter() - self._last_flush)
+        if delay <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay, self.flush)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._parts:
+            self.stream.write(''.join(self._parts))
+            self._parts.clear()
+            self.stream.flush()
+        self._last_flush = time.perf_counter()
+
+
+async def stream_deltas(client, messages, model, metrics=None, **params):
+    """
+    Async generator potongan teks dari chat completion streaming.
+
+    `client` adalah AsyncOpenAI (lihat get_async_client); `metrics` (StreamMetrics)
+    diisi waktu tiap delta dan jumlah token dari usage di chunk terakhir.
+
+    Baris SSE dibaca mentah dan hanya field yang dipakai yang diambil dari JSON-nya;
+    membangun objek pydantic SDK untuk setiap chunk memakan ~0.5 ms CPU per token.
+    Retry dan error status HTTP tetap ditangani SDK.
+    """
+    params.setdefault('stream_options', {'include_usage': True})
+    request = client.chat.completions.with_streaming_response.create(
+        model=model, messages=messages, stream=True, **params
+    )
+
+    # keluar di tengah (mis. client disconnect) -> koneksi upstream langsung dilepas
+    async with request as response:
+        async for line in response.iter_lines():
+            if not line.startswith('data: '):
+                continue
+            data = line[len('data: '):]
+            if data == '[DONE]':
+                # body dibaca sampai habis supaya koneksi kembali ke pool keep-alive
+                continue
+
+            chunk = json.loads(data)
+            if chunk.get('error'):
+                raise RuntimeError(f"Upstream error: {chunk['error'].get('message', chunk['error'])}")
+            if chunk.get('usage') and metrics is not None:
+                metrics.completion_tokens = chunk['usage'].get('completion_tokens')
+            choices = chunk.get('choices')
+            content = choices[0].get('delta', {}).get('content') if choices else None
+            if content:
+                if metrics is not None:
+                    metrics.mark()
+                yield content
+
+
+async def stream_chat(client, messages, model, writer=None, **params):
+    """
+    Stream satu jawaban: delta dikumpulkan di list lalu di-join sekali di akhir,
+    ditampilkan lewat `writer` (mis. TerminalWriter) kalau ada.
+
+    Returns:
+        (teks lengkap, dict metrics dari StreamMetrics.finish)
+    """
+    metrics = StreamMetrics()
+    parts = []
+    try:
+        async for delta in stream_deltas(client, messages, model, metrics, **params):
+            parts.append(delta)
+            if writer is not None:
+                writer.write(delta)
+    finally:
+        if writer is not None:
+            writer.flush()
+
+    result = metrics.finish()
+    record_metrics(result)
+    return ''.join(parts), result
+
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='llm-stream', daemon=True).start()
+    return _loop
+
+
+def run_sync(coro):
+    """
+    Jalankan coroutine dari kode sinkron di satu event loop background bersama,
+    jadi client async (dan koneksi keep-alive-nya) dipakai ulang antar turn.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+def stream_to_terminal(messages, model, provider='openai', **params):
+    """Untuk chat loop berbasis input(): stream jawaban ke stdout, return teks lengkap"""
+
+    async def run():
+        text, _ = await stream_chat(get_async_client(provider, 'stream'), messages, model,
+                                    TerminalWriter(), **params)
+        return text
+
+    return run_sync(run())
+
+
+def record_metrics(metrics):
+    with _history_lock:
+        _history.append(metrics)
+
+
+def stream_stats():
+    """Ringkasan response terakhir: p50/p95 TTFT & jeda antar token, rata-rata token/detik"""
+    with _history_lock:
+        rows = [row for row in _history if row['ttft_ms'] is not None]
+    if not rows:
+        return None
+
+    ttft = np.percentile([row['ttft_ms'] for row in rows], [50, 95])
+    gaps = np.percentile([row['inter_token_ms']['p50'] for row in rows], [50, 95])
+    return {
+        'responses': len(rows),
+        'ttft_ms': {'p50': float(ttft[0]), 'p95': float(ttft[1])},
+        'inter_token_ms': {'p50': float(gaps[0]), 'p95': float(gaps[1])},
+        'tokens_per_sec': float(np.mean([row['tokens_per_sec'] for row in rows])),
+    }
+
+
+def print_stream_stats():
+    stats = stream_stats()
+    if stats is None:
+        return
+    print(
+        f"[Stream] {stats['responses']} response, TTFT p50 {stats['ttft_ms']['p50']:.0f} ms / "
+        f"p95 {stats['ttft_ms']['p95']:.0f} ms, jeda token p50 {stats['inter_token_ms']['p50']:.1f} ms, "
+        f"{stats['tokens_per_sec']:.1f} token/s"
+    )
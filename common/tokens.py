@@ -0,0 +1,34 @@
+import re
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken opsional, fallback ke estimasi kasar
+    tiktoken = None
+
+
+_ENCODINGS = {}
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def get_encoding(model='text-embedding-3-small'):
+    """Ambil tokenizer tiktoken untuk model (di-cache), None kalau tiktoken tidak ada"""
+    if tiktoken is None:
+        return None
+
+    if model not in _ENCODINGS:
+        try:
+            _ENCODINGS[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _ENCODINGS[model] = tiktoken.get_encoding('cl100k_base')
+
+    return _ENCODINGS[model]
+
+
+def count_tokens(text, model='text-embedding-3-small'):
+    """Hitung jumlah token sebuah teks secara lokal (tanpa API call)"""
+    encoding = get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    # estimasi: kira-kira 4 karakter per token, tapi minimal 1 token per kata
+    return max(len(_WORD_RE.findall(text)), (len(text) + 3) // 4)
@@ -0,0 +1,670 @@
+"""
+Backend penyimpanan vector untuk RAG.
+
+Semua backend mengikuti subset API collection Chroma yang dipakai di repo ini:
+`upsert`, `query(query_embeddings=...)`, `get`, `update`, `delete`, `count`.
+Jadi `ingest_records`, `reindex` dan `search()` jalan sama persis di backend mana pun.
+
+- 'chroma' : chromadb.PersistentClient (default, perilaku lama)
+- 'local'  : LocalVectorStore, matriks float32/float16 memory-mapped + sidecar metadata,
+             opsional kode int8 / binary untuk pencarian tahap pertama
+"""
+import os
+import json
+import time
+
+import numpy as np
+
+from common.similarity import normalize, top_k
+
+
+# baris diproses per blok supaya memmap float16 tidak dikonversi sekaligus
+BLOCK_ROWS = 65536
+# di atas jumlah ini, pencarian pakai index IVF (approximate)
+IVF_MIN_ROWS = 50000
+IVF_NPROBE = 8
+# compaction otomatis kalau baris terhapus lebih dari rasio ini
+COMPACT_RATIO = 0.25
+# kuantisasi: kandidat tahap pertama = k x faktor ini, lalu di-rescore dengan vector float
+QUANTIZATIONS = ('int8', 'binary')
+RESCORE_FACTOR = {'int8': 4, 'binary': 16}
+# jumlah bit 1 untuk setiap nilai byte, fallback kalau numpy < 2.0 (tanpa np.bitwise_count)
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+def _hamming(codes, bits):
+    """Hamming distance antara kode binary (n, bytes) dan satu query (bytes,)"""
+    diff = np.bitwise_xor(codes, bits)
+    if not hasattr(np, 'bitwise_count'):
+        return _POPCOUNT[diff].sum(axis=1)
+    if diff.shape[1] % 8 == 0:
+        diff = diff.view(np.uint64)  # popcount per 64 bit, bukan per byte
+    return np.bitwise_count(diff).sum(axis=1, dtype=np.int64)
+
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _write_json(data, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def quantize(vectors, mode):
+    """
+    Kode tahap pertama dari vector ternormalisasi.
+
+    - 'int8'   : per baris, nilai / (max |nilai| / 127) dibulatkan; return (kode int8, skala float32)
+    - 'binary' : tanda tiap dimensi dipadatkan jadi bit (dim / 8 byte); return (kode uint8, None)
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if mode == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    if mode == 'binary':
+        return np.packbits(vectors > 0, axis=1), None
+    raise ValueError(f'Kuantisasi tidak dikenal: {mode}')
+
+
+def _kmeans(vectors, n_lists, iterations=10, seed=0):
+    """Spherical k-means sederhana (vectors sudah ternormalisasi)"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for list_id in range(n_lists):
+            members = vectors[assignments == list_id]
+            if len(members):
+                centroids[list_id] = members.sum(axis=0)
+        centroids = normalize(centroids)
+
+    return centroids
+
+
+class LocalVectorStore:
+    """
+    Vector store lokal tanpa server/SQLite.
+
+    File di dalam folder `path`:
+        vectors.bin   matriks embedding ternormalisasi (float32/float16), di-memmap read-only
+        documents.bin teks dokumen UTF-8 disambung, doc_index.bin berisi (offset, panjang) per baris
+        meta.json     sidecar kecil: dim, dtype, ids, metadatas, info IVF, panjang documents.bin yang berlaku
+        ivf_*.npy     index IVF (centroid + urutan baris per list) untuk collection besar
+        codes.bin     (opsional) kode int8 / binary per baris, scales.bin skala per baris untuk int8
+
+    Karena dibuka lewat memmap, load hanya baca meta.json dan banyak proses
+    bisa berbagi page yang sama dari page cache OS.
+
+    Penulisan hanya append + meta.json ditulis terakhir (lihat upsert); baris lama hasil
+    upsert ulang / delete dibuang lewat compaction begitu melebihi COMPACT_RATIO.
+    File yang ditulis ulang (compaction, kuantisasi, IVF) selalu dibuat dengan nama baru
+    per generasi (mis. vectors.3.bin); meta['files'] menunjuk ke file yang berlaku dan
+    meta.json ditulis paling akhir, jadi crash di tengah tidak menyentuh data lama.
+
+    Dengan `quantization='int8'` (4x lebih kecil) atau `'binary'` (32x), pencarian memindai
+    kode saja, lalu hanya kandidat teratas yang dihitung ulang dengan vector float di disk.
+    """
+
+    def __init__(self, path, dtype='float32', quantization=None):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = self._file('meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'dim': None, 'dtype': dtype, 'ids': [], 'metadatas': [], 'ivf': None,
+                         'quantization': quantization, 'documents_bytes': 0}
+
+        self.dtype = np.dtype(self.meta['dtype'])
+        if 'documents_bytes' not in self.meta:
+            # store lama: panjang documents.bin yang dipakai dihitung dari doc_index
+            self.meta['documents_bytes'] = self._documents_end()
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(self.meta['ids']) if chunk_id is not None}
+        self._open_maps()
+
+        # store lama dibuka dengan mode kuantisasi lain -> kode dibangun ulang sekali
+        if quantization is not None and quantization != self.quantization:
+            self.set_quantization(quantization)
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _data(self, name):
+        """Path file data yang berlaku (nama fisiknya dicatat di meta['files'])"""
+        return self._file(self.meta.get('files', {}).get(name, name))
+
+    def _write_generation(self, contents):
+        """
+        Tulis file pengganti dengan nama generasi berikutnya lalu fsync; belum di-commit.
+        `contents`: nama file -> list array/bytes, fungsi writer(f), atau None (file dihapus).
+        """
+        generation = self.meta.get('generation', 0) + 1
+        written = {}
+        for name, parts in contents.items():
+            if parts is None:
+                continue
+            stem, ext = os.path.splitext(name)
+            physical = f'{stem}.{generation}{ext}'
+            with open(self._file(physical), 'wb') as f:
+                if callable(parts):
+                    parts(f)
+                else:
+                    for part in parts:
+                        f.write(part if isinstance(part, bytes) else np.ascontiguousarray(part).tobytes())
+                _sync(f)
+            written[name] = physical
+        return generation, written
+
+    def _commit_generation(self, generation, contents, written):
+        """meta.json (ditulis terakhir) menunjuk ke file baru; file lama baru dihapus sesudahnya"""
+        old_paths = {name: self._data(name) for name in contents}
+        files = {name: physical for name, physical in self.meta.get('files', {}).items() if name not in contents}
+        files.update(written)
+        self.meta['files'] = files
+        self.meta['generation'] = generation
+        self._save_meta()
+
+        for path in old_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _documents_end(self):
+        if not self.meta['ids']:
+            return 0
+        index = np.fromfile(self._data('doc_index.bin'), dtype=np.int64, count=len(self.meta['ids']) * 2)
+        return int((index[0::2] + index[1::2]).max())
+
+    @property
+    def rows(self):
+        return len(self.meta['ids'])
+
+    @property
+    def quantization(self):
+        return self.meta.get('quantization')
+
+    def _code_shape(self, rows):
+        dim = self.meta['dim']
+        return (rows, (dim + 7) // 8) if self.quantization == 'binary' else (rows, dim)
+
+    def _code_dtype(self):
+        return np.uint8 if self.quantization == 'binary' else np.int8
+
+    def _open_maps(self):
+        self._vectors = None
+        self._doc_index = None
+        self._documents = None
+        self._ivf = None
+        self._codes = None
+        self._scales = None
+
+        if self.rows == 0:
+            return
+
+        dim = self.meta['dim']
+        self._vectors = np.memmap(self._data('vectors.bin'), dtype=self.dtype, mode='r', shape=(self.rows, dim))
+        self._doc_index = np.memmap(self._data('doc_index.bin'), dtype=np.int64, mode='r', shape=(self.rows, 2))
+        if os.path.getsize(self._data('documents.bin')):
+            self._documents = np.memmap(self._data('documents.bin'), dtype=np.uint8, mode='r')
+
+        if self.quantization:
+            self._codes = np.memmap(self._data('codes.bin'), dtype=self._code_dtype(), mode='r',
+                                    shape=self._code_shape(self.rows))
+            if self.quantization == 'int8':
+                self._scales = np.memmap(self._data('scales.bin'), dtype=np.float32, mode='r', shape=(self.rows,))
+
+        alive = np.array([chunk_id is not None for chunk_id in self.meta['ids']])
+        self._dead_rows = np.flatnonzero(~alive)
+
+        if self.meta['ivf']:
+            self._ivf = {
+                name: np.load(self._data(f'ivf_{name}.npy'), mmap_mode='r')
+                for name in ('centroids', 'order', 'offsets')
+            }
+
+    def _close_maps(self):
+        # memmap harus dilepas sebelum file-nya ditulis ulang
+        self._vectors = self._doc_index = self._documents = self._ivf = None
+        self._codes = self._scales = None
+
+    def _document(self, row):
+        start, length = self._doc_index[row]
+        if length == 0:
+            return ''
+        return bytes(self._documents[start:start + length]).decode('utf-8')
+
+    def _save_meta(self):
+        _write_json(self.meta, self._file('meta.json'))
+
+    def count(self):
+        return len(self._row_of)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        if embeddings is None:
+            raise ValueError('LocalVectorStore butuh embeddings (tidak meng-embed sendiri)')
+
+        normalized = normalize(embeddings)
+        vectors = normalized.astype(self.dtype)
+        if self.meta['dim'] is None:
+            self.meta['dim'] = vectors.shape[1]
+        elif vectors.shape[1] != self.meta['dim']:
+            raise ValueError(f"Dimensi {vectors.shape[1]} != dimensi collection {self.meta['dim']}")
+
+        documents = documents or [''] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+
+        # id duplikat dalam satu panggilan -> yang terakhir menang
+        latest = {chunk_id: i for i, chunk_id in enumerate(ids)}
+        positions = list(latest.values())
+        codes, scales = quantize(normalized, self.quantization) if self.quantization else (None, None)
+
+        # Semua data hanya di-append: id yang sudah ada ditandai mati (tombstone) lalu versi barunya
+        # ditambahkan di akhir. meta.json ditulis paling akhir dan menentukan baris mana yang berlaku,
+        # jadi crash di tengah hanya meninggalkan ekor file yang dipotong saat penulisan berikutnya.
+        # Baris mati (dan teksnya di documents.bin) dibuang saat compaction.
+        self._close_maps()
+        self._truncate_uncommitted()
+
+        encoded = []
+        with open(self._data('documents.bin'), 'ab') as doc_file:
+            doc_offset = doc_file.tell()
+            for i in positions:
+                data = documents[i].encode('utf-8')
+                doc_file.write(data)
+                encoded.append((doc_offset, len(data)))
+                doc_offset += len(data)
+            _sync(doc_file)
+
+        self._append('vectors.bin', vectors[positions])
+        self._append('doc_index.bin', np.array(encoded, dtype=np.int64).reshape(-1, 2))
+        if codes is not None:
+            self._append('codes.bin', codes[positions])
+            if scales is not None:
+                self._append('scales.bin', scales[positions])
+
+        for chunk_id, i in latest.items():
+            old_row = self._row_of.get(chunk_id)
+            if old_row is not None:
+                self.meta['ids'][old_row] = None
+                self.meta['metadatas'][old_row] = None
+            self._row_of[chunk_id] = self.rows
+            self.meta['ids'].append(chunk_id)
+            self.meta['metadatas'].append(metadatas[i])
+        self.meta['documents_bytes'] = doc_offset
+
+        self._after_write()
+
+    add = upsert
+
+    def _append(self, name, array):
+        with open(self._data(name), 'ab') as f:
+            f.write(np.ascontiguousarray(array).tobytes())
+            _sync(f)
+
+    def _committed_sizes(self):
+        """Ukuran tiap file data menurut meta.json (sisa di belakangnya berasal dari penulisan yang tidak selesai)"""
+        rows, dim = self.rows, self.meta['dim'] or 0
+        sizes = {
+            'vectors.bin': rows * dim * self.dtype.itemsize,
+            'doc_index.bin': rows * 2 * 8,
+            'documents.bin': self.meta['documents_bytes'],
+        }
+        if self.quantization:
+            row_bytes = self._code_shape(1)[1] * np.dtype(self._code_dtype()).itemsize
+            sizes['codes.bin'] = rows * row_bytes
+            if self.quantization == 'int8':
+                sizes['scales.bin'] = rows * 4
+        return sizes
+
+    def _truncate_uncommitted(self):
+        for name, size in self._committed_sizes().items():
+            path = self._data(name)
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def set_quantization(self, quantization):
+        """Ganti mode kuantisasi (None / 'int8' / 'binary'); kode dibangun ulang dari vector float"""
+        if quantization is not None and quantization not in QUANTIZATIONS:
+            raise ValueError(f'Kuantisasi tidak dikenal: {quantization}')
+
+        self._close_maps()
+        self.meta['quantization'] = quantization
+        contents = {'codes.bin': None, 'scales.bin': None}
+
+        if quantization and self.rows:
+            vectors = np.memmap(self._data('vectors.bin'), dtype=self.dtype, mode='r',
+                                shape=(self.rows, self.meta['dim']))
+            code_blocks, scale_blocks = [], []
+            for start in range(0, self.rows, BLOCK_ROWS):
+                codes, scales = quantize(vectors[start:start + BLOCK_ROWS], quantization)
+                code_blocks.append(codes)
+                scale_blocks.append(scales)
+            del vectors
+            contents['codes.bin'] = code_blocks
+            if quantization == 'int8':
+                contents['scales.bin'] = scale_blocks
+
+        generation, written = self._write_generation(contents)
+        self._commit_generation(generation, contents, written)
+        self._open_maps()
+
+    def index_bytes(self):
+        """Ukuran data yang dipindai saat query: kode kalau dikuantisasi, selain itu matriks vector"""
+        if not self.rows:
+            return 0
+        if self.quantization:
+            size = os.path.getsize(self._data('codes.bin'))
+            if self.quantization == 'int8':
+                size += os.path.getsize(self._data('scales.bin'))
+            return size
+        return os.path.getsize(self._data('vectors.bin'))
+
+    def update(self, ids, metadatas):
+        for chunk_id, metadata in zip(ids, metadatas):
+            if chunk_id in self._row_of:
+                self.meta['metadatas'][self._row_of[chunk_id]] = metadata
+        self._save_meta()
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            row = self._row_of.pop(chunk_id, None)
+            if row is not None:
+                self.meta['ids'][row] = None
+                self.meta['metadatas'][row] = None
+
+        self._close_maps()
+        self._after_write()
+
+    def _after_write(self):
+        dead = self.rows - len(self._row_of)
+        if self.rows and dead / self.rows > COMPACT_RATIO:
+            self.compact()
+            return
+
+        ivf = self.meta['ivf']
+        if self.count() >= IVF_MIN_ROWS and (not ivf or self.rows > ivf['rows'] * 1.5):
+            self._save_meta()
+            self._open_maps()
+            self.build_ivf()
+            return
+
+        self._save_meta()
+        self._open_maps()
+
+    def compact(self):
+        """Tulis ulang file tanpa baris yang sudah dihapus (ke file generasi baru, meta.json terakhir)"""
+        self._open_maps()
+        alive = [row for row, chunk_id in enumerate(self.meta['ids']) if chunk_id is not None]
+
+        documents = [self._document(row).encode('utf-8') for row in alive]
+        lengths = np.array([len(data) for data in documents], dtype=np.int64)
+        doc_index = np.stack([np.cumsum(lengths) - lengths, lengths], axis=1) if alive else np.empty((0, 2), np.int64)
+        contents = {
+            'vectors.bin': [np.asarray(self._vectors[alive])] if alive else [],
+            'documents.bin': documents,
+            'doc_index.bin': [doc_index],
+            'codes.bin': [np.asarray(self._codes[alive])] if self._codes is not None and alive else None,
+            'scales.bin': [np.asarray(self._scales[alive])] if self._scales is not None and alive else None,
+            'ivf_centroids.npy': None,
+            'ivf_order.npy': None,
+            'ivf_offsets.npy': None,
+        }
+        ids = [self.meta['ids'][row] for row in alive]
+        metadatas = [self.meta['metadatas'][row] for row in alive]
+        self._close_maps()
+
+        generation, written = self._write_generation(contents)
+        self.meta.update({'ids': ids, 'metadatas': metadatas, 'ivf': None, 'documents_bytes': int(lengths.sum())})
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(ids)}
+        self._commit_generation(generation, contents, written)
+        self._after_write()
+
+    def build_ivf(self, n_lists=None, iterations=10):
+        """Bangun index IVF: baris dikelompokkan ke n_lists cluster, query hanya memeriksa beberapa cluster"""
+        n_lists = n_lists or max(1, int(np.sqrt(self.rows)))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(self.rows, min(self.rows, n_lists * 64), replace=False))
+        centroids = _kmeans(np.asarray(self._vectors[sample_rows], dtype=np.float32), n_lists, iterations)
+
+        assignments = np.empty(self.rows, dtype=np.int32)
+        for start in range(0, self.rows, BLOCK_ROWS):
+            block = np.asarray(self._vectors[start:start + BLOCK_ROWS], dtype=np.float32)
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind='stable').astype(np.int64)
+        offsets = np.searchsorted(assignments[order], np.arange(n_lists + 1)).astype(np.int64)
+
+        self._close_maps()
+        contents = {
+            'ivf_centroids.npy': lambda f: np.save(f, centroids),
+            'ivf_order.npy': lambda f: np.save(f, order),
+            'ivf_offsets.npy': lambda f: np.save(f, offsets),
+        }
+        generation, written = self._write_generation(contents)
+        self.meta['ivf'] = {'rows': self.rows, 'lists': n_lists}
+        self._commit_generation(generation, contents, written)
+        self._open_maps()
+
+    def _scores(self, queries, rows):
+        """Skor tahap pertama untuk `rows` (slice atau array index): dari kode kalau dikuantisasi"""
+        if self.quantization == 'int8':
+            # query ikut dikuantisasi supaya perkalian tetap int8 x int8 (akumulasi int32),
+            # tanpa mengonversi seluruh blok kode ke float32
+            query_codes, query_scales = quantize(queries, 'int8')
+            dots = np.einsum('qd,nd->qn', query_codes, np.asarray(self._codes[rows]), dtype=np.int32)
+            return dots * query_scales[:, None] * np.asarray(self._scales[rows])[None, :]
+
+        if self.quantization == 'binary':
+            # hamming distance lewat XOR + tabel popcount, diubah ke skala mirip cosine
+            codes = np.asarray(self._codes[rows])
+            query_bits = np.packbits(queries > 0, axis=1)
+            scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+            for i, bits in enumerate(query_bits):
+                scores[i] = 1.0 - 2.0 * _hamming(codes, bits) / self.meta['dim']
+            return scores
+
+        return queries @ np.asarray(self._vectors[rows], dtype=np.float32).T
+
+    def _n_candidates(self, k):
+        return k * RESCORE_FACTOR[self.quantization] if self.quantization else k
+
+    def _rescore(self, queries, candidate_rows, k):
+        """Hitung ulang skor kandidat dengan vector float (hanya baris kandidat yang dibaca dari disk)"""
+        results_rows, results_scores = [], []
+        for query, rows in zip(queries, candidate_rows):
+            rows = np.unique(rows)
+            rows = rows[np.isin(rows, self._dead_rows, invert=True)]
+            scores = np.asarray(self._vectors[rows], dtype=np.float32) @ query
+            positions, best = top_k(scores[None, :], k)
+            results_rows.append(rows[positions[0]])
+            results_scores.append(best[0])
+        return results_rows, results_scores
+
+    def _search_exact(self, queries, k):
+        n = self._n_candidates(k)
+        all_rows, all_scores = [], []
+        for start in range(0, self.rows, BLOCK_ROWS):
+            scores = self._scores(queries, slice(start, min(start + BLOCK_ROWS, self.rows)))
+            dead = self._dead_rows[(self._dead_rows >= start) & (self._dead_rows < start + scores.shape[1])]
+            scores[:, dead - start] = -np.inf
+            rows, block_scores = top_k(scores, n)
+            all_rows.append(rows + start)
+            all_scores.append(block_scores)
+
+        rows = np.hstack(all_rows)
+        positions, scores = top_k(np.hstack(all_scores), n)
+        rows = np.take_along_axis(rows, positions, axis=1)
+        if self.quantization:
+            return self._rescore(queries, rows, k)
+        return rows, scores
+
+    def _search_ivf(self, queries, k, nprobe):
+        centroids, order, offsets = self._ivf['centroids'], self._ivf['order'], self._ivf['offsets']
+        probes, _ = top_k(queries @ np.asarray(centroids).T, nprobe)
+        # baris yang ditambahkan setelah IVF dibangun selalu dicek secara exact
+        tail = np.arange(self.meta['ivf']['rows'], self.rows)
+
+        n = self._n_candidates(k)
+        results_rows, results_scores = [], []
+        for query, lists in zip(queries, probes):
+            candidates = np.unique(np.concatenate([order[offsets[l]:offsets[l + 1]] for l in lists] + [tail]))
+            candidates = candidates[np.isin(candidates, self._dead_rows, invert=True)]
+            scores = self._scores(query[None, :], candidates)
+            positions, best = top_k(scores, n)
+            results_rows.append(candidates[positions[0]])
+            results_scores.append(best[0])
+
+        if self.quantization:
+            return self._rescore(queries, results_rows, k)
+        return results_rows, results_scores
+
+    def query(self, query_embeddings, n_results=10, nprobe=IVF_NPROBE, include=None):
+        """Cari tetangga terdekat, hasil dalam format collection.query() Chroma (distance = 1 - cosine)"""
+        queries = normalize(query_embeddings)
+        result = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+
+        if self.count() == 0:
+            for key in result:
+                result[key] = [[] for _ in queries]
+            return result
+
+        k = min(n_results, self.count())
+        if self._ivf is not None:
+            rows_per_query, scores_per_query = self._search_ivf(queries, k, nprobe)
+        else:
+            rows_per_query, scores_per_query = self._search_exact(queries, k)
+
+        for rows, scores in zip(rows_per_query, scores_per_query):
+            result['ids'].append([self.meta['ids'][row] for row in rows])
+            result['documents'].append([self._document(row) for row in rows])
+            result['metadatas'].append([self.meta['metadatas'][row] for row in rows])
+            result['distances'].append([1.0 - float(score) for score in scores])
+
+        return result
+
+    def get(self, ids=None, include=('documents', 'metadatas')):
+        rows = list(self._row_of.values()) if ids is None else [self._row_of[i] for i in ids if i in self._row_of]
+        result = {'ids': [self.meta['ids'][row] for row in rows]}
+        if 'documents' in include:
+            result['documents'] = [self._document(row) for row in rows]
+        if 'metadatas' in include:
+            result['metadatas'] = [self.meta['metadatas'][row] for row in rows]
+        if 'embeddings' in include:
+            result['embeddings'] = np.asarray(self._vectors[rows], dtype=np.float32) if rows else np.empty((0, 0))
+        return result
+
+
+def open_collection(name, backend='chroma', path=None, metadata=None,
+                    embedding_model='text-embedding-3-small', dtype='float32', quantization=None,
+                    dimensions=None, embedding_provider=None):
+    """
+    Buka collection dengan backend pilihan ('chroma' atau 'local').
+
+    `embedding_model=None` membuka collection Chroma tanpa embedding function
+    (embedding selalu dikirim sendiri, tidak butuh API key).
+    `quantization` ('int8' / 'binary') hanya berlaku untuk backend 'local'.
+    `dimensions` (mis. 512) dicatat di metadata collection sebagai 'embedding_dimensions',
+    `embedding_provider` (mis. 'local') sebagai 'embedding_provider'.
+    """
+    settings = {}
+    if dimensions:
+        settings['embedding_dimensions'] = dimensions
+    if embedding_provider:
+        settings['embedding_provider'] = embedding_provider
+
+    if backend == 'local':
+        store = LocalVectorStore(os.path.join(path or './vector_db', name), dtype=dtype, quantization=quantization)
+        if any(store.meta.get(key) != value for key, value in settings.items()):
+            store.meta.update(settings)
+            store._save_meta()
+        return store
+
+    if backend != 'chroma':
+        raise ValueError(f'Backend tidak dikenal: {backend}')
+
+    # import berat, hanya kalau memang pakai Chroma
+    import chromadb
+    from chromadb.utils import embedding_functions
+
+    openai_em_func = None
+    if embedding_model is not None:
+        openai_em_func = embedding_functions.OpenAIEmbeddingFunction(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            model_name=embedding_model,
+            dimensions=dimensions
+        )
+    if settings:
+        metadata = {**(metadata or {}), **settings}
+    chroma_client = chromadb.PersistentClient(path or './chroma_db')
+    return chroma_client.get_or_create_collection(
+        name=name,
+        metadata=metadata,
+        embedding_function=openai_em_func
+    )
+
+
+def collection_dimensions(collection):
+    """Dimensi embedding sebuah collection (setting di metadata, atau dari vector yang tersimpan)"""
+    if isinstance(collection, LocalVectorStore):
+        return collection.meta.get('embedding_dimensions') or collection.meta['dim']
+
+    configured = (collection.metadata or {}).get('embedding_dimensions')
+    if configured:
+        return configured
+    sample = collection.get(limit=1, include=['embeddings'])
+    return len(sample['embeddings'][0]) if len(sample['embeddings']) else None
+
+
+def collection_provider(collection):
+    """Provider embedding sebuah collection (default 'openai' untuk collection lama)"""
+    if isinstance(collection, LocalVectorStore):
+        return collection.meta.get('embedding_provider') or 'openai'
+    return (collection.metadata or {}).get('embedding_provider') or 'openai'
+
+
+def migrate_collection(source, target, dimensions, embed_fn=None, batch_size=512):
+    """
+    Salin semua chunk (id, dokumen, metadata) dari `source` ke `target` dengan embedding `dimensions`.
+
+    Tanpa `embed_fn`, vector lama dipendekkan lalu dinormalisasi ulang (tanpa API call,
+    hanya bisa untuk menurunkan dimensi model text-embedding-3-*). Dengan `embed_fn`,
+    dokumen di-embed ulang (untuk menaikkan dimensi atau ganti model).
+
+    Returns:
+        dict: rows, mode ('project' / 'embed'), source_dim, target_dim, seconds
+    """
+    from common.embeddings import reduce_dimensions
+
+    start = time.perf_counter()
+    ids = source.get(include=[])['ids']
+    include = ['documents', 'metadatas'] if embed_fn else ['documents', 'metadatas', 'embeddings']
+    source_dim = collection_dimensions(source) if ids else None
+
+    for i in range(0, len(ids), batch_size):
+        batch = source.get(ids=ids[i:i + batch_size], include=include)
+        if embed_fn:
+            vectors = embed_fn(batch['documents'])
+        else:
+            vectors = reduce_dimensions(batch['embeddings'], dimensions).tolist()
+        target.upsert(
+            ids=batch['ids'],
+            embeddings=vectors,
+            documents=batch['documents'],
+            metadatas=batch['metadatas']
+        )
+
+    return {
+        'rows': len(ids),
+        'mode': 'embed' if embed_fn else 'project',
+        'source_dim': source_dim,
+        'target_dim': dimensions,
+        'seconds': time.perf_counter() - start,
+    }
@@ -0,0 +1,26 @@
+import os
+import json
+
+from common.benchmark import load_documents, run_config, recall_at_k, mean_reciprocal_rank
+from common.embeddings import HashingEmbedder
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_metrics():
+    ranks = [1, 3, None, 2]
+    assert recall_at_k(ranks, 1) == 0.25
+    assert recall_at_k(ranks, 3) == 0.75
+    assert mean_reciprocal_rank(ranks) == (1 + 1 / 3 + 1 / 2) / 4
+
+
+def test_knowledge_base_retrieval_quality_gate():
+    documents = load_documents(os.path.join(ROOT, 'knowledge_base'))
+    with open(os.path.join(ROOT, 'DAY3', 'benchmark_questions.json'), 'r', encoding='utf-8') as f:
+        questions = json.load(f)
+
+    rows = run_config(documents, questions, HashingEmbedder(), backend='local', modes=('dense', 'rerank'))
+    by_mode = {row['mode']: row for row in rows}
+    assert by_mode['rerank']['recall@3'] >= 0.85
+    assert by_mode['rerank']['mrr'] >= by_mode['dense']['mrr']
@@ -0,0 +1,65 @@
+from common.bm25 import BM25Index, tokenize, is_decisive
+from common.retrieval import reciprocal_rank_fusion
+
+
+def test_tokenize_keeps_compound_tokens():
+    assert tokenize('Versi v2.3.1, SKU-4471') == ['versi', 'v2.3.1', 'v2', '3', '1', 'sku-4471', 'sku', '4471']
+
+
+def test_bm25_exact_token_is_decisive(tmp_path):
+    index = BM25Index(str(tmp_path / 'bm25'))
+    index.add('a', 'Laptop TechBook Pro SKU-4471 dengan garansi 2 tahun')
+    index.add('b', 'Laptop TechBook Air dengan garansi 1 tahun')
+    index.add('c', 'Kebijakan cuti tahunan karyawan')
+    hits = index.search('sku-4471')
+    assert hits[0][0] == 'a' and is_decisive(hits, index.coverage('sku-4471', 'a'))
+    hits = index.search('laptop garansi')
+    assert not is_decisive(hits, index.coverage('laptop garansi', hits[0][0]))
+
+    index.remove(['a'])
+    index.save()
+    reopened = BM25Index(str(tmp_path / 'bm25'))
+    assert len(reopened) == 2
+    assert reopened.search('sku-4471') == []
+    assert reopened.search('cuti')[0][0] == 'c'
+
+
+def test_crash_during_save_keeps_previous_index(tmp_path, monkeypatch):
+    import json
+    import pytest
+
+    path = str(tmp_path / 'bm25')
+    index = BM25Index(path)
+    index.add('a', 'kebijakan cuti tahunan')
+    index.save()
+
+    index.add('b', 'garansi laptop dua tahun')
+    # crash setelah postings baru ditulis, sebelum JSON diganti
+    monkeypatch.setattr(json, 'dump', lambda *args, **kwargs: (_ for _ in ()).throw(OSError('disk penuh')))
+    with pytest.raises(OSError):
+        index.save()
+    monkeypatch.undo()
+
+    reopened = BM25Index(path)
+    assert len(reopened) == 1
+    assert reopened.search('cuti')[0][0] == 'a' and reopened.search('garansi') == []
+
+    reopened.add('b', 'garansi laptop dua tahun')
+    reopened.save()
+    assert BM25Index(path).search('garansi')[0][0] == 'b'
+
+
+def test_single_incidental_hit_is_not_decisive():
+    index = BM25Index()
+    index.add('a', 'Kebijakan cuti tahunan karyawan')
+    index.add('b', 'Laptop TechBook Air dengan garansi 1 tahun')
+    query = 'bagaimana prosedur klaim asuransi kesehatan untuk karyawan baru'
+    hits = index.search(query)
+    assert [doc_id for doc_id, _ in hits] == ['a']
+    assert index.coverage(query, 'a') < 0.2
+    assert not is_decisive(hits, index.coverage(query, 'a'))
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion(['a', 'b', 'c'], ['c', 'a'])
+    assert [doc_id for doc_id, _ in fused] == ['a', 'c', 'b']
@@ -0,0 +1,100 @@
+import json
+import time
+import asyncio
+
+import aiohttp
+
+from common.chat_server import ChatServer, start_server
+from common.fake_openai import FakeOpenAI
+
+
+async def read_events(response):
+    events = []
+    event = None
+    async for raw in response.content:
+        line = raw.decode('utf-8').rstrip('\n')
+        if line.startswith('event: '):
+            event = line[len('event: '):]
+        elif line.startswith('data: '):
+            events.append((event, json.loads(line[len('data: '):])))
+            event = None
+    return events
+
+
+async def with_server(scenario, **fake_options):
+    fake = FakeOpenAI(**{'first_token_seconds': 0.01, 'token_seconds': 0.001, 'reply_tokens': 5, **fake_options})
+    upstream = await fake.start()
+    runner, url = await start_server(ChatServer('fake-model', 'system', base_url=upstream))
+    try:
+        async with aiohttp.ClientSession() as http:
+            return await scenario(http, url, fake)
+    finally:
+        await runner.cleanup()
+        await fake.stop()
+
+
+async def send(http, url, session_id, content):
+    async with http.post(f'{url}/sessions/{session_id}/messages', json={'content': content}) as response:
+        assert response.status == 200
+        return await read_events(response)
+
+
+def test_concurrent_sessions_keep_separate_history():
+    async def scenario(http, url, fake):
+        async def conversation(i):
+            async with http.post(f'{url}/sessions') as response:
+                session_id = (await response.json())['session_id']
+            first = await send(http, url, session_id, f'halo dari sesi {i}')
+            await send(http, url, session_id, 'pertanyaan kedua')
+            return first
+
+        results = await asyncio.gather(*(conversation(i) for i in range(30)))
+        async with http.get(f'{url}/stats') as response:
+            return results, await response.json(), fake
+
+    results, stats, fake = asyncio.run(with_server(scenario))
+
+    for events in results:
+        assert [event for event, _ in events][-1] == 'done'
+        assert ''.join(data['delta'] for event, data in events if event is None).startswith('[')
+    assert stats['sessions'] == 30 and stats['errors'] == 0
+    assert fake.max_active > 1
+
+    # request kedua tiap sesi membawa history sesinya sendiri saja
+    second_turns = [body['messages'] for body in fake.requests if body['messages'][-1]['content'] == 'pertanyaan kedua']
+    assert len(second_turns) == 30
+    assert all(len(messages) == 4 for messages in second_turns)
+    assert len({messages[1]['content'] for messages in second_turns}) == 30
+
+
+def test_session_concurrency_limit_and_unknown_session():
+    async def scenario(http, url, fake):
+        async with http.post(f'{url}/sessions') as response:
+            session_id = (await response.json())['session_id']
+
+        running = asyncio.create_task(send(http, url, session_id, 'jawaban panjang'))
+        await asyncio.sleep(0.05)
+        async with http.post(f'{url}/sessions/{session_id}/messages', json={'content': 'lagi'}) as response:
+            busy = response.status
+        await running
+        async with http.post(f'{url}/sessions/tidak-ada/messages', json={'content': 'halo'}) as response:
+            missing = response.status
+        return busy, missing
+
+    busy, missing = asyncio.run(with_server(scenario, first_token_seconds=0.2))
+    assert busy == 429
+    assert missing == 404
+
+
+def test_eviction_skips_active_sessions():
+    server = ChatServer('fake-model', 'system', max_sessions=3, session_ttl=60)
+    streaming, idle, recent = (server.create_session() for _ in range(3))
+    streaming.active = 1
+    streaming.last_used = idle.last_used = time.monotonic() - 120
+
+    newest = server.create_session()
+    # sesi yang sedang stream tetap, sesi kedaluwarsa di belakangnya tetap dibuang
+    assert list(server.sessions) == [streaming.id, recent.id, newest.id]
+
+    extra = [server.create_session() for _ in range(2)]
+    assert list(server.sessions) == [streaming.id, extra[0].id, extra[1].id]
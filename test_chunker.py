@@ -0,0 +1,39 @@
+from common.chunker import chunk_text, iter_blocks
+from common.tokens import count_tokens
+
+
+HANDBOOK = """TECHVISION INDONESIA
+
+==========
+1. WELCOME
+==========
+
+Welcome to TechVision. We build AI products.
+
+==========
+2. LEAVE POLICIES
+==========
+
+Annual leave is 12 days. Sick leave needs a doctor's note.
+"""
+
+
+def test_banner_titles_become_headers():
+    blocks = list(iter_blocks(HANDBOOK.splitlines()))
+    assert ('header', '1. WELCOME') in blocks
+    assert ('header', '2. LEAVE POLICIES') in blocks
+
+
+def test_chunks_do_not_cross_sections():
+    chunks = chunk_text(HANDBOOK)
+    assert chunks[1].startswith('1. WELCOME\n')
+    assert 'Annual leave' not in chunks[1]
+    assert chunks[2].startswith('2. LEAVE POLICIES\n')
+
+
+def test_long_paragraph_split_on_sentences_within_budget():
+    text = ' '.join(f'Sentence number {i} talks about policy.' for i in range(200))
+    chunks = chunk_text(text, max_tokens=50, overlap_tokens=10)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 50 for chunk in chunks)
+    assert all(chunk.endswith('.') for chunk in chunks)
@@ -0,0 +1,47 @@
+import os
+
+from common.collection_registry import CollectionRegistry
+
+
+def test_resolve_reuses_identical_content_and_updates_changed_files(tmp_path):
+    registry = CollectionRegistry(str(tmp_path / 'registry.json'))
+    folder_a, folder_b = str(tmp_path / 'a'), str(tmp_path / 'b')
+
+    name, to_ingest, to_delete = registry.resolve(folder_a, {'x.pdf': '1', 'y.pdf': '2'})
+    assert sorted(to_ingest) == ['x.pdf', 'y.pdf'] and to_delete == []
+    registry.record(name, folder_a, {'x.pdf': '1', 'y.pdf': '2'}, chunk_count=10)
+
+    # folder lain dengan isi identik: collection yang sama, tanpa ingest, folder asal tetap
+    assert CollectionRegistry(registry.path).resolve(folder_b, {'x.pdf': '1', 'y.pdf': '2'}) == (name, [], [])
+    registry.touch(name)
+    assert registry.collections[name]['folder'] == os.path.abspath(folder_a)
+
+    # folder asal berubah: x diubah, y dihapus, z baru
+    same, to_ingest, to_delete = registry.resolve(folder_a, {'x.pdf': '9', 'z.pdf': '3'})
+    assert same == name
+    assert sorted(to_ingest) == ['x.pdf', 'z.pdf']
+    assert sorted(to_delete) == ['x.pdf', 'y.pdf']
+
+
+def test_resolve_never_mixes_embedding_dimensions(tmp_path):
+    registry = CollectionRegistry(str(tmp_path / 'registry.json'))
+    name, _, _ = registry.resolve(str(tmp_path), {'x.pdf': '1'})
+    registry.record(name, str(tmp_path), {'x.pdf': '1'}, chunk_count=5)
+
+    other, to_ingest, _ = registry.resolve(str(tmp_path), {'x.pdf': '1'}, dimensions=256)
+    assert other != name and other.endswith('_d256')
+    assert to_ingest == ['x.pdf']
+
+
+def test_evict_drops_least_recently_used_but_keeps_current(tmp_path):
+    registry = CollectionRegistry(str(tmp_path / 'registry.json'))
+    for i in range(4):
+        registry.record(f'c{i}', str(tmp_path / str(i)), {f'{i}.pdf': str(i)}, chunk_count=100)
+        registry.collections[f'c{i}']['last_used'] = i
+    registry.collections['c0']['last_used'] = 10
+
+    assert registry.evict(keep='c1', max_collections=2) == ['c2', 'c3']
+    assert sorted(CollectionRegistry(registry.path).collections) == ['c0', 'c1']
+
+    # batas total chunk: c0 lebih baru tapi bukan yang sedang dipakai
+    assert registry.evict(keep='c1', max_chunks=150) == ['c0']
@@ -0,0 +1,36 @@
+from common.context import pack_context
+from common.tokens import count_tokens
+
+
+def _chunk(chunk_id, text, source='handbook.txt', **extra):
+    return {'id': f'{source}:{chunk_id}', 'text': text, 'source': source, 'chunk_id': chunk_id, **extra}
+
+
+def test_adjacent_overlapping_chunks_are_merged_once():
+    first = _chunk(1, '4. LEAVE\nAnnual leave is 15 days. It accrues monthly. Carry-over is 5 days.')
+    second = _chunk(2, '4. LEAVE\nCarry-over is 5 days. Sick leave needs a note.')
+    packed = pack_context([second, first])
+
+    assert len(packed['citations']) == 1
+    assert packed['citations'][0]['ids'] == [first['id'], second['id']]
+    assert packed['text'].count('Carry-over is 5 days.') == 1
+    assert packed['text'].count('4. LEAVE') == 1
+    assert packed['text'].index('Annual leave') < packed['text'].index('Sick leave')
+
+
+def test_blocks_follow_relevance_and_keep_page_citations():
+    pdf = _chunk(0, 'Parking is free for employees.', source='facilities.pdf', page=3)
+    leave = _chunk(7, 'Annual leave is 15 days.')
+    packed = pack_context([pdf, leave])
+
+    assert packed['text'].startswith('[1] Source: facilities.pdf, page 3\n')
+    assert '[2] Source: handbook.txt\nAnnual leave' in packed['text']
+
+
+def test_budget_is_respected():
+    chunks = [_chunk(i * 10, ' '.join(f'Rule {i}.{j} applies to everyone.' for j in range(40))) for i in range(5)]
+    packed = pack_context(chunks, max_tokens=300)
+
+    assert 0 < packed['tokens'] <= 300
+    assert packed['citations'][0]['ids'] == [chunks[0]['id']]
+    assert packed['tokens'] < packed['input_tokens']
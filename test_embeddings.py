@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from common.embeddings import Embedder, EmbeddingCache, HashingEmbedder, reduce_dimensions
+
+
+class FakeEmbeddingsAPI:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, model, input, **params):
+        self.calls.append(list(input))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(t)), 0.5]) for t in input])
+
+
+def make_embedder(tmp_path):
+    api = FakeEmbeddingsAPI()
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'), memory_size=2)
+    return Embedder(client=SimpleNamespace(embeddings=api), cache=cache), api
+
+
+def test_embed_hits_api_once_per_text(tmp_path):
+    embedder, api = make_embedder(tmp_path)
+    first = embedder.embed(['halo', 'dunia', 'halo'])
+    second = embedder.embed(['dunia', 'halo'])
+    assert api.calls == [['halo', 'dunia']]
+    assert first[0] == first[2] == second[1] == [4.0, 0.5]
+
+
+def test_cache_survives_restart(tmp_path):
+    embedder, _ = make_embedder(tmp_path)
+    embedder.embed(['a', 'b', 'c'])
+
+    reopened, api = make_embedder(tmp_path)
+    reopened.embed(['a', 'b', 'c'])
+    stats = reopened.cache.stats()
+    assert api.calls == []
+    assert stats['disk_hits'] == 3
+    assert stats['bytes_stored'] == 3 * 2 * 4
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    first = HashingEmbedder(64).embed(['annual leave policy', ''])
+    second = HashingEmbedder(64).embed_one('annual leave policy')
+    assert first[0] == second
+    assert abs(sum(value * value for value in second) - 1.0) < 1e-5
+    assert first[1] == [0.0] * 64
+
+
+def test_reduced_dimensions_reuse_cached_full_vectors(tmp_path):
+    api = FakeEmbeddingsAPI()
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'))
+    client = SimpleNamespace(embeddings=api)
+    Embedder(client=client, cache=cache).embed(['halo'])  # full: [4.0, 0.5]
+
+    short = Embedder(client=client, dimensions=1, cache=cache).embed(['halo', 'dunia'])
+    assert api.calls == [['halo'], ['dunia']]
+    assert short[0] == [1.0]
+
+
+def test_reduce_dimensions_renormalizes():
+    reduced = reduce_dimensions([[3.0, 4.0, 12.0], [0.0, 0.0, 1.0]], 2)
+    assert np.allclose(reduced, [[0.6, 0.8], [0.0, 0.0]])
@@ -0,0 +1,72 @@
+from common.ingest import make_record, pack_batches, ingest_records
+
+
+class FakeCollection:
+    def __init__(self):
+        self.rows = {}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        for i, doc, meta, emb in zip(ids, documents, metadatas, embeddings):
+            self.rows[i] = (doc, meta, emb)
+
+
+def fake_embed(texts):
+    return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_pack_batches_respects_token_limit():
+    records = [make_record(f'c{i}', 'kata ' * 50, {}) for i in range(10)]
+    batches = list(pack_batches(records, max_tokens=120))
+    assert sum(len(b) for b in batches) == 10
+    assert all(sum(r['tokens'] for r in b) <= 120 for b in batches)
+
+
+def test_ingest_records_upserts_everything():
+    records = [make_record(f'c{i}', f'chunk nomor {i}', {'chunk_id': i}) for i in range(50)]
+    collection = FakeCollection()
+    stats = ingest_records(collection, records, fake_embed, max_items=7, max_workers=3)
+    assert stats['chunks'] == 50
+    assert stats['batches'] == 8
+    assert collection.rows['c3'][1] == {'chunk_id': 3}
+
+
+class FakeChroma(FakeCollection):
+    def get(self, include):
+        return {'ids': list(self.rows)}
+
+    def delete(self, ids):
+        for i in ids:
+            self.rows.pop(i, None)
+
+    def update(self, ids, metadatas):
+        for i, meta in zip(ids, metadatas):
+            doc, _, emb = self.rows[i]
+            self.rows[i] = (doc, meta, emb)
+
+
+def test_reindex_only_embeds_changed_chunks(tmp_path):
+    from common.reindex import reindex
+
+    def chunker(text):
+        return [p for p in text.split('\n\n') if p]
+
+    embedded = []
+
+    def counting_embed(texts):
+        embedded.extend(texts)
+        return fake_embed(texts)
+
+    manifest = str(tmp_path / 'manifest.json')
+    collection = FakeChroma()
+    collection.rows['chunk_0'] = ('lama', {}, [0.0])
+    docs = [{'filename': 'a.txt', 'content': 'satu\n\ndua\n\ntiga'},
+            {'filename': 'b.txt', 'content': 'empat'}]
+    stats = reindex(collection, docs, chunker, counting_embed, manifest)
+    assert stats['added'] == 4 and 'chunk_0' not in collection.rows
+
+    embedded.clear()
+    docs[0]['content'] = 'satu\n\ndua diubah\n\ntiga'
+    stats = reindex(collection, docs, chunker, counting_embed, manifest)
+    assert embedded == ['dua diubah']
+    assert stats['deleted'] == 1 and stats['unchanged_files'] == 1
+    assert len(collection.rows) == 4
@@ -0,0 +1,104 @@
+import os
+
+from common.journal import ChatJournal, iter_lines_reversed, read_tail
+from common.memory import ConversationMemory
+
+
+def test_reversed_lines_across_blocks(tmp_path):
+    path = tmp_path / 'lines.txt'
+    lines = [f'baris {i} ' + 'x' * (i % 7) for i in range(100)]
+    path.write_text('\n'.join(lines) + '\n')
+    assert [line.decode() for line in iter_lines_reversed(str(path), block_size=16)] == lines[::-1]
+
+
+def test_resume_after_crash_skips_torn_line(tmp_path):
+    path = str(tmp_path / 'sesi.jsonl')
+    journal = ChatJournal(path, fsync_every=1)
+    journal.add_message('user', 'halo')
+    journal.add_message('assistant', 'halo juga')
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "message", "n": 2, "ro')
+
+    state = read_tail(path)
+    assert state['messages'] == [{'role': 'user', 'content': 'halo'}, {'role': 'assistant', 'content': 'halo juga'}]
+
+    journal = ChatJournal(path)
+    assert journal.next_n == 2
+    journal.add_message('user', 'pesan setelah crash')
+    journal.close()
+    assert read_tail(path)['messages'][-1] == {'role': 'user', 'content': 'pesan setelah crash'}
+    with open(path, encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 3
+
+
+def test_resume_reads_only_after_latest_summary(tmp_path):
+    path = str(tmp_path / 'sesi.jsonl')
+    journal = ChatJournal(path)
+    for n in range(6):
+        journal.add_message('user', f'pesan {n}')
+    journal.add_summary('ringkasan pesan 0-3', folded=4)
+    journal.add_message('assistant', 'pesan 6')
+
+    state = journal.resume()
+    assert state['summary'] == 'ringkasan pesan 0-3'
+    assert [m['content'] for m in state['messages']] == ['pesan 4', 'pesan 5', 'pesan 6']
+    assert state['next_n'] == 7
+
+
+def test_compaction_keeps_file_bounded(tmp_path):
+    path = str(tmp_path / 'sesi.jsonl')
+    journal = ChatJournal(path, fsync_every=0, max_bytes=20_000, max_messages=50)
+    for n in range(2000):
+        journal.add_message('user', f'pesan nomor {n} ' + 'isi ' * 10)
+        if n % 100 == 99:
+            journal.add_summary(f'ringkasan sampai {n - 20}', folded=n - 20)
+    journal.close()
+
+    assert journal.compactions > 0
+    assert os.path.getsize(path) <= 2 * 20_000
+    state = read_tail(path)
+    assert state['next_n'] == 2000
+    assert state['messages'][-1]['content'].startswith('pesan nomor 1999')
+
+
+def test_memory_summary_round_trip(tmp_path):
+    path = str(tmp_path / 'sesi.jsonl')
+    journal = ChatJournal(path)
+    memory = ConversationMemory('system', lambda summary, messages: f'{len(messages)} pesan lama',
+                                recent_tokens=40, on_summary=journal.add_summary)
+    for n in range(20):
+        journal.add_message('user', f'pertanyaan ke {n} tentang jadwal kereta')
+        memory.add('user', f'pertanyaan ke {n} tentang jadwal kereta')
+    memory.wait()
+    expected = memory.messages()
+    journal.close()
+
+    resumed = ConversationMemory('system')
+    state = read_tail(path)
+    resumed.restore(state['summary'], state['first_n'], state['messages'])
+    assert resumed.messages() == expected
+
+
+def test_fold_after_truncated_resume_keeps_journal_numbering(tmp_path):
+    path = str(tmp_path / 'sesi.jsonl')
+    journal = ChatJournal(path, max_messages=5)
+    for n in range(12):
+        journal.add_message('user', f'pertanyaan ke {n} tentang jadwal kereta')
+
+    # hanya 5 pesan terakhir (7..11) yang dibaca balik
+    state = journal.resume()
+    assert (state['first_n'], state['folded']) == (7, 0)
+    memory = ConversationMemory('system', lambda summary, messages: f'{len(messages)} pesan lama',
+                                recent_tokens=40, on_summary=journal.add_summary)
+    memory.restore(state['summary'], state['first_n'], state['messages'])
+    memory.wait()
+    assert memory.folded > 7
+    expected = memory.messages()
+
+    state = journal.resume()
+    assert state['folded'] == memory.folded == state['first_n']
+    resumed = ConversationMemory('system')
+    resumed.restore(state['summary'], state['first_n'], state['messages'])
+    assert resumed.messages() == expected
+    journal.close()
@@ -0,0 +1,57 @@
+import pytest
+
+from common.language import TranslationCache, detect_language, is_indonesian
+
+
+def test_detects_indonesian_english_and_mixed_queries():
+    assert detect_language('Berapa hari cuti tahunan yang saya dapat?') == 'id'
+    assert detect_language('How many days of annual leave do I get?') == 'en'
+    # istilah Inggris di kalimat Indonesia tetap terdeteksi Indonesia
+    assert detect_language('apa itu machine learning dan bagaimana cara kerjanya') == 'id'
+    assert detect_language('what is the refund policy untuk laptop') == 'en'
+    # "di" tidak boleh cocok sebagai substring "did"/"media"
+    assert detect_language('did the media report it') == 'en'
+    assert detect_language('SKU-4471') == 'unknown'
+    assert is_indonesian('jelaskan kebijakannya') and not is_indonesian('explain the policy')
+
+
+def test_cache_key_ignores_case_and_whitespace(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.sqlite3'))
+    calls = []
+
+    def translate(text):
+        calls.append(text)
+        return 'how many days of leave?'
+
+    assert cache.translate('Berapa hari  cuti?', translate) == 'how many days of leave?'
+    assert cache.translate('  berapa HARI cuti? ', translate) == 'how many days of leave?'
+    assert cache.get('berapa hari cuti?', target='de') is None
+    assert calls == ['Berapa hari  cuti?']
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_translations_persist_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    TranslationCache(path).put('jadwal kereta', 'train schedule')
+
+    reopened = TranslationCache(path, memory_size=1)
+    assert reopened.translate('jadwal kereta', lambda text: pytest.fail('harus dari cache')) == 'train schedule'
+    assert reopened.hits == 1
+
+
+def test_failed_or_unchanged_translation_is_not_cached(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.sqlite3'))
+
+    def failing(text):
+        raise RuntimeError('LLM down')
+
+    with pytest.raises(RuntimeError):
+        cache.translate('jadwal kereta', failing)
+    assert cache.get('jadwal kereta') is None
+
+    # terjemahan sama dengan input (mis. query sudah bahasa Inggris) tidak disimpan
+    assert cache.translate('SKU-4471', lambda text: text) == 'SKU-4471'
+    assert cache.get('SKU-4471') is None
+
+    assert cache.translate('jadwal kereta', lambda text: 'train schedule') == 'train schedule'
+    assert cache.get('jadwal kereta') == 'train schedule'
@@ -0,0 +1,55 @@
+import httpx
+import pytest
+
+from common import llm_clients
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """get_client dengan MockTransport; request pertama berpura-pura membuka koneksi TCP baru"""
+    seen = []
+
+    def handler(request):
+        if not seen:
+            request.extensions['trace']('connection.connect_tcp.started', {})
+        seen.append(request)
+        return httpx.Response(200, json={'object': 'list', 'data': []})
+
+    make_http_client = llm_clients._make_http_client
+    monkeypatch.setattr(llm_clients, '_make_http_client',
+                        lambda provider: make_http_client(provider, transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(llm_clients, '_clients', {})
+    monkeypatch.setattr(llm_clients, '_stats', {})
+    monkeypatch.setenv('OPENAI_API_KEY', 'test')
+    return seen
+
+
+def test_clients_are_reused_per_provider_and_call_type(sent):
+    chat = llm_clients.get_client('openai', 'chat')
+    assert llm_clients.get_client('openai', 'chat') is chat
+
+    rewrite = llm_clients.get_client('openai', 'rewrite')
+    assert rewrite is not chat
+    # semua varian berbagi satu connection pool
+    assert rewrite._client is chat._client is llm_clients.get_client('openai')._client
+
+
+def test_timeout_of_one_call_type_does_not_leak_into_another(sent):
+    chat = llm_clients.get_client('openai', 'chat')
+    llm_clients.get_client('openai', 'rewrite').models.list()
+    chat.models.list()
+    llm_clients.get_client('openai').models.list()
+
+    assert [request.extensions['timeout']['read'] for request in sent] == [15.0, 60.0, 60.0]
+    assert chat.timeout == llm_clients.TIMEOUTS['chat']
+
+
+def test_connection_stats_count_requests_and_reuse(sent):
+    client = llm_clients.get_client('openai', 'chat')
+    for _ in range(4):
+        client.models.list()
+
+    stats = llm_clients.connection_stats()['openai']
+    assert (stats['requests'], stats['new_connections']) == (4, 1)
+    assert stats['reuse_rate'] == 0.75
+    assert stats['avg_latency_new'] is not None and stats['avg_latency_reused'] is not None
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from common import embeddings
+from common.embeddings import EmbeddingCache, get_provider
+from common.local_embeddings import LocalEmbedder, LOCAL_DIMENSIONS
+
+
+WORDS = ['[PAD]', '[UNK]', 'kucing', 'anjing', 'makan', 'ikan', 'tidur']
+
+
+class FakeSession:
+    """Pengganti InferenceSession: hidden state = embedding per token id"""
+
+    def __init__(self):
+        self.table = np.random.default_rng(0).standard_normal((len(WORDS), LOCAL_DIMENSIONS)).astype(np.float32)
+        self.batches = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name='input_ids'), SimpleNamespace(name='attention_mask')]
+
+    def run(self, outputs, feeds):
+        self.batches.append(feeds['input_ids'].shape)
+        return [self.table[feeds['input_ids']]]
+
+
+def make_embedder(**kwargs):
+    tokenizer = Tokenizer(WordLevel({word: i for i, word in enumerate(WORDS)}, unk_token='[UNK]'))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.enable_padding(pad_id=0, pad_token='[PAD]')
+    session = FakeSession()
+    return LocalEmbedder(session=session, tokenizer=tokenizer, workers=2, **kwargs), session
+
+
+def test_padding_does_not_change_vector():
+    embedder, _ = make_embedder()
+    alone = embedder.embed_one('kucing')
+    batched = embedder.embed(['kucing makan ikan lalu tidur', 'kucing'])
+    assert np.allclose(alone, batched[1], atol=1e-6)
+    assert np.isclose(np.linalg.norm(alone), 1.0)
+
+
+def test_batches_keep_input_order():
+    embedder, session = make_embedder(batch_size=2)
+    texts = ['kucing makan ikan', 'anjing', 'tidur', 'kucing makan']
+    vectors = embedder.embed(texts)
+    assert len(session.batches) == 2
+    for text, vector in zip(texts, vectors):
+        assert np.allclose(vector, embedder.embed_one(text), atol=1e-6)
+
+
+def test_cache_skips_known_texts(tmp_path):
+    embedder, session = make_embedder(cache=EmbeddingCache(str(tmp_path / 'cache.sqlite3')))
+    embedder.embed(['kucing', 'anjing'])
+    embedder.embed(['anjing', 'kucing'])
+    assert len(session.batches) == 1
+
+
+def test_local_provider_shares_the_embedding_cache(tmp_path, monkeypatch):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(embeddings, '_default_cache', cache)
+    monkeypatch.setattr(embeddings, '_providers', {})
+    assert get_provider('local').cache is cache
+
+
+def test_missing_model_explains_download(tmp_path):
+    with pytest.raises(FileNotFoundError, match='download_model'):
+        LocalEmbedder(model_dir=str(tmp_path)).embed_one('halo')
+
+
+def test_unknown_provider():
+    with pytest.raises(ValueError):
+        get_provider('tidak-ada')
+    assert get_provider('hashing', 64).dimensions == 64
@@ -0,0 +1,78 @@
+import threading
+
+from common.memory import ConversationMemory
+
+
+def fake_summarizer(calls):
+    def summarize(summary, messages):
+        calls.append(len(messages))
+        return (summary + ' ' if summary else '') + f'{len(messages)} pesan'
+    return summarize
+
+
+def test_prompt_stays_bounded_in_long_session():
+    calls = []
+    memory = ConversationMemory('system', fake_summarizer(calls), max_tokens=300, recent_tokens=120)
+    for turn in range(200):
+        memory.add('user', f'pertanyaan nomor {turn} tentang pengiriman paket ke kota lain')
+        memory.add('assistant', f'jawaban nomor {turn}: paket dikirim dalam dua sampai tiga hari kerja')
+        assert memory.prompt_tokens() <= 300
+    memory.wait()
+
+    assert calls and memory.stats()['errors'] == 0
+    assert memory.summary in memory.messages()[0]['content']
+    # pesan terbaru tetap utuh
+    assert memory.messages()[-1]['content'].startswith('jawaban nomor 199')
+
+
+def test_messages_do_not_wait_for_summary():
+    started, release = threading.Event(), threading.Event()
+
+    def slow_summarizer(summary, messages):
+        started.set()
+        release.wait(5)
+        return 'ringkasan'
+
+    memory = ConversationMemory('system', slow_summarizer, max_tokens=200, recent_tokens=40)
+    for turn in range(10):
+        memory.add('user', f'pesan panjang nomor {turn} dengan beberapa kata tambahan')
+    assert started.wait(5)
+
+    # worker masih jalan: prompt tetap tersedia dan tetap dalam batas
+    assert memory.stats()['folding']
+    assert memory.prompt_tokens() <= 200
+    release.set()
+    memory.wait()
+    assert memory.summary == 'ringkasan'
+
+
+def test_failed_summary_keeps_messages():
+    def broken(summary, messages):
+        raise RuntimeError('API down')
+
+    memory = ConversationMemory('system', broken, max_tokens=1000, recent_tokens=10)
+    memory.add('user', 'halo apa kabar semuanya')
+    memory.add('assistant', 'baik, terima kasih sudah bertanya')
+    memory.wait()
+
+    assert memory.stats()['errors'] == 1
+    assert [m['role'] for m in memory.messages()] == ['system', 'user', 'assistant']
+
+
+def test_extra_messages_are_not_stored():
+    memory = ConversationMemory('system')
+    memory.add('user', 'halo')
+    messages = memory.messages([{'role': 'user', 'content': 'context RAG'}])
+    assert messages[-1]['content'] == 'context RAG'
+    assert len(memory.messages()) == 2
+
+
+def test_without_summarizer_old_turns_are_dropped():
+    memory = ConversationMemory('system', max_tokens=100)
+    for n in range(200):
+        memory.add('user', f'pesan nomor {n} tentang jadwal kereta')
+
+    stats = memory.stats()
+    assert stats['turns'] < 20 and stats['dropped'] == 200 - stats['turns']
+    assert memory.messages()[-1]['content'] == 'pesan nomor 199 tentang jadwal kereta'
+    assert memory.prompt_tokens() <= 100
@@ -0,0 +1,43 @@
+from common.pdf_extract import iter_pdf_pages
+
+
+def make_pdf(texts):
+    """PDF minimal dengan satu baris teks per halaman"""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    kids = []
+    for text in texts:
+        stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>')
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{i} 0 obj\n{body}\nendobj\n'.encode()
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return out
+
+
+def test_pages_are_extracted_and_corrupt_files_reported(tmp_path):
+    good = tmp_path / 'panduan.pdf'
+    good.write_bytes(make_pdf(['Halaman satu', 'Halaman dua', 'Halaman tiga']))
+    corrupt = tmp_path / 'rusak.pdf'
+    corrupt.write_bytes(b'%PDF-1.4\nbukan pdf sungguhan')
+
+    stats = {}
+    pages = list(iter_pdf_pages([good, corrupt], max_workers=2, pages_per_task=2, stats=stats))
+
+    assert sorted((p['filename'], p['page'], p['text']) for p in pages) == [
+        ('panduan.pdf', 1, 'Halaman satu'),
+        ('panduan.pdf', 2, 'Halaman dua'),
+        ('panduan.pdf', 3, 'Halaman tiga'),
+    ]
+    assert stats['pages'] == 3 and stats['files'] == 1
+    assert list(stats['failed']) == ['rusak.pdf']
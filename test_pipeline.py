@@ -0,0 +1,77 @@
+import time
+import threading
+
+from common.pipeline import Pipeline
+
+
+def test_all_items_pass_through_every_stage():
+    results = []
+    stats = (
+        Pipeline(range(50), queue_size=2)
+        .stream('double', lambda items: (item * 2 for item in items))
+        .map('square', lambda item: [item * item], workers=4)
+        .map('collect', lambda item: results.append(item))
+        .run(progress_every=0)
+    )
+
+    assert sorted(results) == [(i * 2) ** 2 for i in range(50)]
+    assert stats['stages']['square']['items_in'] == 50
+    assert stats['stages']['collect']['items_in'] == 50
+
+
+def test_bounded_queue_holds_back_source():
+    produced = []
+    slow_started = threading.Event()
+
+    def source():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    def slow(item):
+        slow_started.set()
+        time.sleep(0.01)
+
+    pipeline = Pipeline(source(), queue_size=2).map('slow', slow)
+    thread = threading.Thread(target=pipeline.run, kwargs={'progress_every': 0})
+    thread.start()
+    slow_started.wait(1)
+    # source hanya bisa maju sebatas queue + item yang sedang diproses
+    assert len(produced) <= 5
+    thread.join(5)
+    assert len(produced) == 20
+    assert pipeline.stages[0].blocked > 0
+
+
+def test_failing_downstream_stage_raises_and_stops_source():
+    produced = []
+
+    def source():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    def upsert(item):
+        raise ValueError('database penuh')
+
+    pipeline = (
+        Pipeline(source(), queue_size=2)
+        .map('embed', lambda item: [item], workers=4)
+        .map('upsert', upsert)
+    )
+    errors = []
+
+    def run():
+        try:
+            pipeline.run(progress_every=0)
+        except RuntimeError as error:
+            errors.append(error)
+
+    # dijalankan di thread supaya test gagal (bukan hang) kalau run() tidak pernah kembali
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1 and "'upsert'" in str(errors[0])
+    assert len(produced) < 1000
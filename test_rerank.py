@@ -0,0 +1,34 @@
+import numpy as np
+
+from common.rerank import lexical_scores, mmr, rerank
+
+
+def test_mmr_skips_near_duplicates():
+    query = [1.0, 0.0, 0.0]
+    candidates = np.array([
+        [0.95, 0.31, 0.0],
+        [0.95, 0.30, 0.01],  # hampir sama dengan kandidat 0
+        [0.80, 0.0, 0.60],
+    ])
+    assert mmr(query, candidates, 2, lambda_mult=1.0) == [1, 0]
+    assert mmr(query, candidates, 2, lambda_mult=0.5) == [1, 2]
+
+
+def test_lexical_scores_prefer_query_terms():
+    scores = lexical_scores('annual leave carry-over', [
+        'Sick leave requires a doctor note.',
+        'Annual leave carry-over is limited to 5 days.',
+        'Parking is free.',
+    ])
+    assert int(np.argmax(scores)) == 1
+    assert scores[2] == 0.0
+
+
+def test_rerank_promotes_exact_section_and_keeps_n_results():
+    chunks = [{'id': str(i), 'text': text} for i, text in enumerate([
+        'Leave policy overview.', 'Leave policy overview!', 'Maternity leave is 3 months.', 'Parking rules.',
+    ])]
+    vectors = [[1.0, 0.1, 0.0], [1.0, 0.1, 0.0], [0.7, 0.0, 0.7], [0.0, 1.0, 0.0]]
+    selected = rerank('maternity leave', [1.0, 0.0, 0.3], chunks, vectors, n_results=2)
+    assert [chunk['id'] for chunk in selected] == ['2', '0']
+    assert all('rerank_score' in chunk for chunk in selected)
@@ -0,0 +1,129 @@
+import time
+from types import SimpleNamespace
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from common.response_cache import CachedClient, ResponseCache, cache_key
+
+
+MESSAGES = [{'role': 'user', 'content': 'Jelaskan quantum computing.'}]
+
+
+def completion(text):
+    return ChatCompletion.model_validate({
+        'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+        'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': text}}],
+    })
+
+
+def chunk(text):
+    return ChatCompletionChunk.model_validate({
+        'id': 'c1', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'gpt-4o-mini',
+        'choices': [{'index': 0, 'delta': {'content': text}, 'finish_reason': None}],
+    })
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.response = 'httpx response'
+        self.closed = False
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+        self.streams = []
+        self.with_raw_response = 'raw completions'
+
+    def create(self, **params):
+        self.calls += 1
+        if params.get('stream'):
+            self.streams.append(FakeStream([chunk('Halo'), chunk(' dunia')]))
+            return self.streams[-1]
+        return completion(f'jawaban {self.calls}')
+
+
+def cached_client(tmp_path, **options):
+    fake = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=fake, with_raw_response='raw chat'), models='models')
+    return CachedClient(client, 'openai', ResponseCache(str(tmp_path / 'llm.sqlite3'), **options)), fake
+
+
+def test_deterministic_calls_hit_cache_and_others_pass_through(tmp_path):
+    client, fake = cached_client(tmp_path)
+
+    first = client.chat.completions.create(model='gpt-4o-mini', messages=MESSAGES, temperature=0)
+    second = client.chat.completions.create(temperature=0, messages=MESSAGES, model='gpt-4o-mini')
+    assert second.choices[0].message.content == first.choices[0].message.content == 'jawaban 1'
+
+    client.chat.completions.create(model='gpt-4o-mini', messages=MESSAGES, temperature=0.7)
+    client.chat.completions.create(model='gpt-4o-mini', messages=MESSAGES, temperature=0.7)
+    assert fake.calls == 3
+
+    stats = client.cache.stats()
+    assert (stats['hits'], stats['misses'], stats['skipped'], stats['entries']) == (1, 1, 2, 1)
+
+
+def test_stream_is_replayed_from_cache(tmp_path):
+    client, fake = cached_client(tmp_path)
+    params = {'model': 'gpt-4o-mini', 'messages': MESSAGES, 'seed': 7, 'stream': True}
+
+    with client.chat.completions.create(**params) as stream:
+        first = [c.choices[0].delta.content for c in stream]
+        assert stream.response == 'httpx response'
+    assert fake.streams[0].closed
+
+    with client.chat.completions.create(**params) as stream:
+        replay = [c.choices[0].delta.content for c in stream]
+    assert first == replay == ['Halo', ' dunia']
+    assert fake.calls == 1
+
+
+def test_stream_closed_early_is_not_stored(tmp_path):
+    client, fake = cached_client(tmp_path)
+    params = {'model': 'gpt-4o-mini', 'messages': MESSAGES, 'temperature': 0, 'stream': True}
+
+    stream = client.chat.completions.create(**params)
+    assert next(stream).choices[0].delta.content == 'Halo'
+    stream.close()
+    assert fake.streams[0].closed
+
+    list(client.chat.completions.create(**params))
+    assert fake.calls == 2 and client.cache.stats()['entries'] == 1
+
+
+def test_unhandled_attributes_reach_the_real_client(tmp_path):
+    client, _ = cached_client(tmp_path)
+    assert client.chat.with_raw_response == 'raw chat'
+    assert client.chat.completions.with_raw_response == 'raw completions'
+    assert client.models == 'models'
+
+
+def test_key_covers_params_but_not_timeout():
+    base = {'model': 'gpt-4o-mini', 'messages': MESSAGES, 'temperature': 0}
+    assert cache_key('openai', base) == cache_key('openai', dict(base, timeout=5))
+    assert cache_key('openai', base) != cache_key('openrouter', base)
+    assert cache_key('openai', base) != cache_key('openai', dict(base, tools=[{'type': 'function'}]))
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'llm.sqlite3'), ttl=60, max_entries=2)
+    cache.put('a', {'v': 1})
+    cache.put('b', {'v': 2})
+    time.sleep(0.01)
+    assert cache.get('a') == {'v': 1}
+    cache.put('c', {'v': 3})
+    # 'b' paling lama tidak dipakai
+    assert cache.get('b') is None
+    assert cache.get('a') and cache.get('c')
+
+    cache.ttl = 0
+    assert cache.get('a') is None
+    assert cache.stats()['entries'] == 1
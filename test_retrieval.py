@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+
+from common.bm25 import BM25Index
+from common.retrieval import hybrid_search, speculative_search
+
+
+DOCS = {
+    'a': 'Laptop TechBook Pro SKU-4471 dengan garansi 2 tahun',
+    'b': 'Laptop TechBook Air dengan garansi 1 tahun',
+    'c': 'Kebijakan cuti tahunan karyawan',
+    'd': 'Prosedur klaim garansi lewat service center',
+}
+
+
+def make_index():
+    index = BM25Index()
+    for doc_id, text in DOCS.items():
+        index.add(doc_id, text)
+    return index
+
+
+def fetch(ids, missing=()):
+    return [{'id': doc_id, 'text': DOCS[doc_id]} for doc_id in ids if doc_id not in missing]
+
+
+def test_hybrid_merges_dense_and_lexical_with_rrf():
+    dense_calls = []
+
+    def dense(query, n):
+        dense_calls.append(query)
+        return [{'id': 'c', 'distance': 0.2}, {'id': 'b', 'distance': 0.3}]
+
+    chunks = hybrid_search('laptop garansi', make_index(), dense, fetch, n_results=3)
+
+    assert dense_calls == ['laptop garansi']
+    # b ada di kedua ranking jadi paling atas; a hanya dari BM25 dan diambil lewat fetch_fn
+    assert [chunk['id'] for chunk in chunks][0] == 'b'
+    assert {'a', 'c'} <= {chunk['id'] for chunk in chunks}
+
+
+def test_decisive_lexical_hit_skips_dense_search():
+    def dense(query, n):
+        raise AssertionError('dense search tidak boleh dipanggil')
+
+    index = make_index()
+    chunks = hybrid_search('sku-4471', index, dense, fetch, n_results=3)
+
+    assert [chunk['id'] for chunk in chunks] == ['a']
+    assert chunks[0]['bm25'] == index.search('sku-4471')[0][1]
+
+
+def test_decisive_scores_follow_ids_when_fetch_drops_chunks():
+    index = make_index()
+    hits = dict(index.search('sku-4471 garansi'))
+    assert list(hits)[0] == 'a'
+
+    def dense(query, n):
+        raise AssertionError('dense search tidak boleh dipanggil')
+
+    # 'a' sudah terhapus dari vector store, urutan hasil fetch juga terbalik
+    chunks = hybrid_search('sku-4471 garansi', index, dense,
+                           lambda ids: fetch(ids, missing={'a'})[::-1], n_results=3)
+    assert [chunk['id'] for chunk in chunks] == ['b', 'd']
+    assert all(chunk['bm25'] == pytest.approx(hits[chunk['id']]) for chunk in chunks)
+
+
+def test_decisive_path_falls_back_to_dense_when_nothing_is_fetched():
+    chunks = hybrid_search('sku-4471', make_index(), lambda query, n: [{'id': 'b', 'distance': 0.4}],
+                           lambda ids: fetch(ids, missing=set(ids)), n_results=3)
+    assert [chunk['id'] for chunk in chunks] == ['b']
+
+
+def make_search(results_by_query, calls):
+    def search(query, n):
+        calls.append(query)
+        return results_by_query[query]
+    return search
+
+
+def test_confident_raw_result_skips_rewrite():
+    calls = []
+    # distance terkecil tidak harus di urutan pertama; hasil tanpa distance diabaikan
+    raw = [{'id': 'b', 'distance': 0.5}, {'id': 'x'}, {'id': 'a', 'distance': 0.1}]
+    query, chunks = speculative_search('cuti?', lambda q: 'jumlah cuti tahunan', make_search({'cuti?': raw}, calls),
+                                       skip_distance=0.2)
+    assert (query, chunks) == ('cuti?', raw)
+    assert calls == ['cuti?']
+
+
+def test_results_without_distance_wait_for_rewrite_and_merge():
+    calls = []
+    search = make_search({
+        'cuti?': [{'id': 'a'}, {'id': 'b'}],
+        'jumlah cuti tahunan': [{'id': 'c'}, {'id': 'a'}],
+    }, calls)
+    query, chunks = speculative_search('cuti?', lambda q: 'jumlah cuti tahunan', search, skip_distance=0.2)
+
+    assert query == 'jumlah cuti tahunan'
+    assert sorted(calls) == ['cuti?', 'jumlah cuti tahunan']
+    assert [chunk['id'] for chunk in chunks][0] == 'a' and len(chunks) == 3
+
+
+def test_failing_or_slow_rewrite_falls_back_to_raw_results():
+    raw = [{'id': 'a', 'distance': 0.6}]
+
+    def failing(query):
+        raise RuntimeError('LLM down')
+
+    calls = []
+    assert speculative_search('cuti?', failing, make_search({'cuti?': raw}, calls),
+                              skip_distance=0.2) == ('cuti?', raw)
+    assert calls == ['cuti?']
+
+    release = threading.Event()
+
+    def slow(query):
+        release.wait(5)
+        return 'jumlah cuti tahunan'
+
+    calls = []
+    try:
+        assert speculative_search('cuti?', slow, make_search({'cuti?': raw}, calls),
+                                  skip_distance=0.2, rewrite_timeout=0.05) == ('cuti?', raw)
+    finally:
+        release.set()
+    assert calls == ['cuti?']
@@ -0,0 +1,53 @@
+import os
+
+import numpy as np
+
+from common.semantic_cache import SemanticCache
+
+
+def vector(*values):
+    return np.array(values, dtype=np.float32)
+
+
+CHUNKS = [{'id': 'a:0', 'source': 'a.txt'}]
+
+
+def test_similar_question_hits_and_different_question_misses(tmp_path):
+    cache = SemanticCache(str(tmp_path / 'cache'), threshold=0.9)
+    cache.store('berapa hari cuti?', vector(1, 0, 0), 'Cuti 12 hari.', CHUNKS)
+
+    hit = cache.lookup(vector(0.95, 0.1, 0))
+    assert hit['answer'] == 'Cuti 12 hari.' and hit['similarity'] >= 0.9
+    assert cache.lookup(vector(0, 1, 0)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert SemanticCache(str(tmp_path / 'cache')).lookup(vector(1, 0, 0))['answer'] == 'Cuti 12 hari.'
+
+
+def test_least_recently_used_is_evicted_after_restart(tmp_path):
+    path = str(tmp_path / 'cache')
+    cache = SemanticCache(path, max_entries=2)
+    cache.store('q1', vector(1, 0, 0), 'a1', CHUNKS)
+    cache.store('q2', vector(0, 1, 0), 'a2', CHUNKS)
+    with open(path + '.json', encoding='utf-8') as f:
+        saved = f.read()
+    assert cache.lookup(vector(1, 0, 0))['answer'] == 'a1'
+    # hit tidak menulis ulang JSON; last_used baru ditulis saat save()
+    with open(path + '.json', encoding='utf-8') as f:
+        assert f.read() == saved
+    cache.save()
+
+    # last_used dari lookup ikut tersimpan, jadi q2 yang dibuang
+    reopened = SemanticCache(path, max_entries=2)
+    reopened.store('q3', vector(0, 0, 1), 'a3', CHUNKS)
+    assert [entry['query'] for entry in reopened.entries] == ['q1', 'q3']
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.npy')] == ['cache.3.npy']
+
+
+def test_invalidate_removes_entries_using_changed_source(tmp_path):
+    cache = SemanticCache(str(tmp_path / 'cache'))
+    cache.store('q1', vector(1, 0, 0), 'a1', CHUNKS)
+    cache.store('q2', vector(0, 1, 0), 'a2', [{'id': 'b:0', 'source': 'b.txt'}])
+
+    assert cache.invalidate(sources=['a.txt']) == 1
+    assert SemanticCache(str(tmp_path / 'cache')).lookup(vector(1, 0, 0)) is None
@@ -0,0 +1,27 @@
+import numpy as np
+
+from common.similarity import SimilarityIndex, cosine_similarity, normalize
+
+
+def test_cosine_similarity_pair():
+    assert abs(cosine_similarity([1, 0], [1, 0]) - 1.0) < 1e-6
+    assert abs(cosine_similarity([1, 0], [0, 2])) < 1e-6
+
+
+def test_index_matches_brute_force():
+    rng = np.random.default_rng(1)
+    corpus = rng.standard_normal((500, 32))
+    queries = rng.standard_normal((20, 32))
+    index = SimilarityIndex()
+    index.add([f'doc{i}' for i in range(250)], corpus[:250])
+    index.add([f'doc{i}' for i in range(250, 500)], corpus[250:])
+
+    results = index.search(queries, k=5, batch_size=7)
+    expected = np.argsort(-(normalize(queries) @ normalize(corpus).T), axis=1)[:, :5]
+    assert [[doc_id for doc_id, _ in row] for row in results] == [[f'doc{i}' for i in row] for row in expected]
+
+
+def test_search_k_larger_than_corpus():
+    index = SimilarityIndex()
+    index.add(['a', 'b'], [[1, 0], [0, 1]])
+    assert [doc_id for doc_id, _ in index.search([[1, 0.1]], k=10)[0]] == ['a', 'b']
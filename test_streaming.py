@@ -0,0 +1,93 @@
+import io
+import json
+import asyncio
+from types import SimpleNamespace
+
+from common import streaming
+from common.streaming import TerminalWriter, run_sync, stream_chat
+
+
+def sse_line(payload):
+    return f'data: {json.dumps(payload)}'
+
+
+class FakeCompletions:
+    """Meniru client.chat.completions.with_streaming_response.create (baris SSE mentah)"""
+
+    def __init__(self, deltas, delay=0.0):
+        self.deltas = deltas
+        self.delay = delay
+        self.params = None
+        self.with_streaming_response = self
+
+    def create(self, **params):
+        self.params = params
+        return FakeResponse(self.deltas, self.delay)
+
+
+class FakeResponse:
+    def __init__(self, deltas, delay):
+        self.deltas = deltas
+        self.delay = delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def iter_lines(self):
+        yield ': keep-alive'
+        for delta in self.deltas:
+            await asyncio.sleep(self.delay)
+            yield sse_line({'choices': [{'index': 0, 'delta': {'content': delta}}]})
+            yield ''
+        yield sse_line({'choices': [], 'usage': {'completion_tokens': len(self.deltas)}})
+        yield 'data: [DONE]'
+
+
+def fake_client(deltas, delay=0.0):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(deltas, delay)))
+
+
+def test_stream_chat_joins_deltas_and_records_metrics():
+    client = fake_client(['Halo', ', ', 'apa', ' kabar', '?'], delay=0.002)
+    text, metrics = asyncio.run(stream_chat(client, [{'role': 'user', 'content': 'hai'}], 'gpt-4o-mini'))
+
+    assert text == 'Halo, apa kabar?'
+    assert client.chat.completions.params['stream'] is True
+    assert metrics['tokens'] == 5
+    assert metrics['ttft_ms'] > 0
+    assert metrics['inter_token_ms']['p50'] > 0
+    assert metrics['tokens_per_sec'] > 0
+    assert streaming.stream_stats()['responses'] >= 1
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_terminal_writer_batches_per_frame():
+    output = CountingStream()
+
+    async def run():
+        writer = TerminalWriter(output, frame_seconds=60)
+        return await stream_chat(fake_client([f'{i} ' for i in range(50)]), [], 'gpt-4o-mini', writer)
+
+    text, _ = asyncio.run(run())
+    # delta pertama langsung tampil, sisanya sekali flush di akhir
+    assert output.getvalue() == text
+    assert output.writes == 2
+
+
+def test_run_sync_reuses_background_loop():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    assert run_sync(current_loop()) is run_sync(current_loop())
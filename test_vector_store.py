@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pytest
+
+from common.vector_store import LocalVectorStore, migrate_collection, collection_dimensions
+
+
+def test_local_vector_store_roundtrip(tmp_path):
+    store = LocalVectorStore(str(tmp_path / 'kb'), dtype='float16')
+    store.upsert(['a', 'b', 'c'], [[1, 0, 0], [0, 1, 0], [0, 0, 1]], ['satu', 'dua', 'tiga'],
+                 [{'source': 'x'}, {'source': 'y'}, {'source': 'z'}])
+    store.upsert(['b'], [[1, 0.1, 0]], ['dua baru'], [{'source': 'y2'}])
+    store.delete(['c'])
+
+    reopened = LocalVectorStore(str(tmp_path / 'kb'))
+    result = reopened.query(query_embeddings=[[1, 0, 0]], n_results=5)
+    assert result['ids'] == [['a', 'b']]
+    assert result['documents'][0][1] == 'dua baru'
+    assert result['metadatas'][0][1] == {'source': 'y2'}
+    assert reopened.count() == 2
+
+
+def test_quantized_store_rescores_with_float_vectors(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((30, 64))
+    vectors = (centers[np.arange(300) % 30] + 0.5 * rng.standard_normal((300, 64))).astype(np.float32)
+    ids = [f'doc-{i}' for i in range(300)]
+    plain = LocalVectorStore(str(tmp_path / 'float'))
+    plain.upsert(ids, vectors)
+    expected = plain.query(query_embeddings=vectors[:5], n_results=5)
+
+    for mode in ('int8', 'binary'):
+        store = LocalVectorStore(str(tmp_path / mode), quantization=mode)
+        store.upsert(ids, vectors)
+        store.delete(['doc-299'])
+        result = store.query(query_embeddings=vectors[:5], n_results=5)
+        assert result['ids'] == expected['ids']
+        assert np.allclose(result['distances'], expected['distances'], atol=1e-5)
+        assert store.index_bytes() < plain.index_bytes() / 3
+
+    # store lama bisa dikuantisasi belakangan tanpa ingest ulang
+    converted = LocalVectorStore(str(tmp_path / 'float'), quantization='binary')
+    assert converted.query(query_embeddings=vectors[:5], n_results=5)['ids'] == expected['ids']
+    assert LocalVectorStore(str(tmp_path / 'float')).quantization == 'binary'
+
+
+def test_migrate_collection_to_fewer_dimensions(tmp_path):
+    rng = np.random.default_rng(2)
+    source = LocalVectorStore(str(tmp_path / 'full'))
+    source.upsert(['a', 'b', 'c'], rng.standard_normal((3, 16)), ['satu', 'dua', 'tiga'],
+                  [{'source': 'x'}, {'source': 'y'}, {'source': 'z'}])
+    target = LocalVectorStore(str(tmp_path / 'd4'))
+
+    stats = migrate_collection(source, target, 4)
+    assert stats['rows'] == 3 and stats['mode'] == 'project'
+    assert collection_dimensions(target) == 4
+
+    migrated = target.get(ids=['b'], include=['documents', 'metadatas', 'embeddings'])
+    assert migrated['documents'] == ['dua'] and migrated['metadatas'] == [{'source': 'y'}]
+    expected = source.get(ids=['b'], include=['embeddings'])['embeddings'][0][:4]
+    assert np.allclose(migrated['embeddings'][0], expected / np.linalg.norm(expected), atol=1e-6)
+
+
+def test_reingest_keeps_files_bounded_and_survives_torn_append(tmp_path):
+    path = str(tmp_path / 'kb')
+    store = LocalVectorStore(path)
+    ids = [f'doc-{i}' for i in range(40)]
+    vectors = np.eye(40, dtype=np.float32)
+    for round_ in range(5):
+        store.upsert(ids, vectors, [f'teks {i} versi {round_}' for i in range(40)])
+    sizes = {name: os.path.getsize(store._data(name)) for name in ('vectors.bin', 'documents.bin')}
+    assert sizes['vectors.bin'] <= 2 * 40 * 40 * 4
+    assert sizes['documents.bin'] <= 2 * sum(len(f'teks {i} versi 4') for i in range(40))
+
+    # crash setelah data di-append tapi sebelum meta.json ditulis
+    for name in ('vectors.bin', 'doc_index.bin', 'documents.bin'):
+        with open(store._data(name), 'ab') as f:
+            f.write(b'\x01' * 100)
+
+    reopened = LocalVectorStore(path)
+    reopened.upsert(['baru'], [[1] + [0] * 39], ['dokumen baru'])
+    result = LocalVectorStore(path).query(query_embeddings=[[1] + [0] * 39], n_results=2)
+    assert sorted(result['ids'][0]) == ['baru', 'doc-0']
+    assert sorted(result['documents'][0]) == ['dokumen baru', 'teks 0 versi 4']
+
+
+def test_ivf_search_recall(tmp_path):
+    rng = np.random.default_rng(2)
+    centers = rng.standard_normal((40, 32))
+    vectors = (centers[np.arange(4000) % 40] + 0.3 * rng.standard_normal((4000, 32))).astype(np.float32)
+    ids = [f'doc-{i}' for i in range(4000)]
+    store = LocalVectorStore(str(tmp_path / 'kb'))
+    store.upsert(ids, vectors)
+    queries = vectors[rng.choice(4000, 20, replace=False)] + 0.1 * rng.standard_normal((20, 32)).astype(np.float32)
+    exact = store.query(query_embeddings=queries, n_results=10)['ids']
+
+    store.build_ivf(n_lists=40)
+    # baris yang ditambahkan setelah IVF dibangun tetap ditemukan
+    store.upsert(['tail'], queries[:1])
+    reopened = LocalVectorStore(str(tmp_path / 'kb'))
+    approx = reopened.query(query_embeddings=queries, n_results=10)['ids']
+
+    assert approx[0][0] == 'tail'
+    recall = np.mean([len(set(a) & set(e)) / 10 for a, e in zip(approx[1:], exact[1:])])
+    assert recall >= 0.9
+
+
+def test_crash_during_compaction_keeps_old_files(tmp_path):
+    path = str(tmp_path / 'kb')
+    store = LocalVectorStore(path, quantization='int8')
+    ids = [f'doc-{i}' for i in range(20)]
+    vectors = np.eye(20, dtype=np.float32)
+    store.upsert(ids, vectors, [f'teks {i}' for i in range(20)])
+    expected = store.query(query_embeddings=vectors[:3], n_results=2)
+
+    # crash setelah file generasi baru ditulis, sebelum meta.json ikut ditulis
+    def crash():
+        raise OSError('disk penuh')
+    store._save_meta = crash
+    with pytest.raises(OSError):
+        store.delete(ids[10:])
+
+    reopened = LocalVectorStore(path)
+    assert reopened.count() == 20
+    assert reopened.query(query_embeddings=vectors[:3], n_results=2) == expected
+
+    reopened.delete(ids[10:])
+    assert LocalVectorStore(path).query(query_embeddings=vectors[:3], n_results=2) == expected
+    # file generasi yang tertinggal dari crash ditimpa, file lama dihapus setelah commit
+    assert sorted(os.listdir(path)) == ['codes.1.bin', 'doc_index.1.bin', 'documents.1.bin',
+                                        'meta.json', 'scales.1.bin', 'vectors.1.bin']